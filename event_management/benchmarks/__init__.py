@@ -0,0 +1,16 @@
+"""Performance benchmarks for EventManagement project.
+
+Run a benchmark from the event_management directory, e.g. ``python -m benchmarks.uuid_keys``.
+``benchmarks.seed`` fills a database with realistic data and ``benchmarks.run`` runs the
+request scenarios of ``benchmarks.scenarios`` and records their results.
+"""
+
+import os
+
+
+def setup_django():
+    """Configure Django for benchmarks that use the project's models."""
+    import django
+
+    os.environ.setdefault("DJANGO_SETTINGS_MODULE", "event_management.settings")
+    django.setup()
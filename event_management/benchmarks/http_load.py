@@ -0,0 +1,112 @@
+"""Load benchmark comparing event creation under WSGI and ASGI servers.
+
+Opens ``--concurrency`` keep-alive connections and sends ``--requests`` POST requests
+creating events, then reports throughput and latency percentiles. Start the server
+to measure first, for example, with a worker class keeping connections alive:
+
+    gunicorn -w 4 -k gthread --threads 4 event_management.wsgi    # sync view on WSGI
+    uvicorn --workers 4 event_management.asgi:application         # async view on ASGI
+
+Usage:
+    python -m benchmarks.http_load --url http://127.0.0.1:8000/api/events/create/ --token KEY
+    python -m benchmarks.http_load --url http://127.0.0.1:8000/api/events/async/create/ --token KEY
+"""
+
+import argparse
+import asyncio
+import json
+import statistics
+import time
+from datetime import datetime, timedelta, timezone
+from urllib.parse import urlsplit
+
+
+def build_request(url, token, body):
+    """bytes: Returns raw HTTP/1.1 request creating one event."""
+    parts = urlsplit(url)
+    head = (
+        f"POST {parts.path or '/'} HTTP/1.1\r\n"
+        f"Host: {parts.netloc}\r\n"
+        f"Authorization: Token {token}\r\n"
+        "Content-Type: application/json\r\n"
+        f"Content-Length: {len(body)}\r\n"
+        "\r\n"
+    )
+    return head.encode("latin1") + body
+
+
+async def read_response(reader):
+    """int: Returns status code after reading one response from the connection."""
+    status_line = await reader.readline()
+    if not status_line:
+        raise ConnectionError("Connection closed by server")
+    length = 0
+    while True:
+        line = await reader.readline()
+        if line in (b"\r\n", b""):
+            break
+        name, _, value = line.decode("latin1").partition(":")
+        if name.lower() == "content-length":
+            length = int(value)
+    await reader.readexactly(length)
+    return int(status_line.split()[1])
+
+
+async def client(url, request, queue, latencies, errors):
+    """Send requests taken from the queue over one keep-alive connection."""
+    parts = urlsplit(url)
+    reader, writer = await asyncio.open_connection(parts.hostname, parts.port or 80)
+    try:
+        while not queue.empty():
+            queue.get_nowait()
+            started = time.perf_counter()
+            writer.write(request)
+            await writer.drain()
+            status = await read_response(reader)
+            latencies.append(time.perf_counter() - started)
+            if status >= 400:
+                errors[status] = errors.get(status, 0) + 1
+    finally:
+        writer.close()
+
+
+async def run(url, token, concurrency, requests):
+    """dict: Returns throughput and latency of the load run."""
+    timestamp = (datetime.now(timezone.utc) + timedelta(days=30)).isoformat()
+    body = json.dumps({"event_type": "benchmark", "info": {"source": "load"}, "timestamp": timestamp}).encode()
+    request = build_request(url, token, body)
+    queue = asyncio.Queue()
+    for number in range(requests):
+        queue.put_nowait(number)
+    latencies, errors = [], {}
+
+    started = time.perf_counter()
+    await asyncio.gather(*(client(url, request, queue, latencies, errors) for _ in range(concurrency)))
+    elapsed = time.perf_counter() - started
+
+    percentiles = statistics.quantiles(latencies, n=100)
+    return {
+        "url": url,
+        "concurrency": concurrency,
+        "requests": len(latencies),
+        "errors": errors,
+        "seconds": round(elapsed, 3),
+        "requests_per_second": round(len(latencies) / elapsed, 1),
+        "p50_ms": round(percentiles[49] * 1000, 2),
+        "p99_ms": round(percentiles[98] * 1000, 2),
+    }
+
+
+def main():
+    """Run load benchmark and print results as JSON."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--url", required=True, help="Event create endpoint")
+    parser.add_argument("--token", required=True, help="Auth token key")
+    parser.add_argument("--concurrency", type=int, default=100)
+    parser.add_argument("--requests", type=int, default=10_000)
+    options = parser.parse_args()
+    print(json.dumps(asyncio.run(run(options.url, options.token, options.concurrency, options.requests)), indent=2))
+
+
+if __name__ == "__main__":
+    main()
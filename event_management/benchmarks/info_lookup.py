@@ -0,0 +1,109 @@
+"""Benchmark of lookups by a key of Event.info with and without an expression index.
+
+Fills a SQLite file with rows shaped like the ``event_event`` table, then times
+``info__username`` lookups before and after creating the index that sync_info_indexes
+creates. The lookup SQL is the one InfoKeyText compiles to on SQLite.
+
+Usage:
+    python -m benchmarks.info_lookup --rows 1000000 --output info_lookup.json
+"""
+
+import argparse
+import json
+import os
+import random
+import sqlite3
+import statistics
+import tempfile
+import time
+
+from event.identifiers import uuid7
+
+SCHEMA = """
+CREATE TABLE event_event (
+    id char(32) NOT NULL PRIMARY KEY,
+    user_id bigint NOT NULL,
+    event_type_id bigint NOT NULL,
+    info text NOT NULL,
+    timestamp datetime NOT NULL,
+    created_at datetime NOT NULL
+)
+"""
+
+INDEX = """CREATE INDEX event_info_username ON event_event ((CAST(JSON_EXTRACT("info", '$.username') AS TEXT)))"""
+
+LOOKUP = (
+    """SELECT id FROM event_event WHERE CAST(JSON_EXTRACT("info", '$.username') AS TEXT) = ? """
+    "ORDER BY timestamp LIMIT 100"
+)
+
+
+def fill(connection, rows, batch_size, users):
+    """Insert rows whose info holds one of users usernames."""
+    connection.execute(SCHEMA)
+    for offset in range(0, rows, batch_size):
+        batch = [
+            (
+                uuid7().hex,
+                number % users,
+                number % 50,
+                json.dumps({"username": f"user{number % users}", "source": "web"}),
+                "2030-01-01",
+                "2023-01-01",
+            )
+            for number in range(offset, min(offset + batch_size, rows))
+        ]
+        with connection:
+            connection.executemany("INSERT INTO event_event VALUES (?, ?, ?, ?, ?, ?)", batch)
+
+
+def measure(connection, lookups, users):
+    """dict: Returns latency of random username lookups and the query plan."""
+    latencies = []
+    for _ in range(lookups):
+        username = f"user{random.randrange(users)}"
+        started = time.perf_counter()
+        connection.execute(LOOKUP, (username,)).fetchall()
+        latencies.append(time.perf_counter() - started)
+    plan = " ".join(row[-1] for row in connection.execute(f"EXPLAIN QUERY PLAN {LOOKUP}", ("user0",)))
+    return {
+        "plan": plan,
+        "p50_ms": round(statistics.median(latencies) * 1000, 3),
+        "max_ms": round(max(latencies) * 1000, 3),
+    }
+
+
+def main():
+    """Run benchmark and print results as JSON."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    parser.add_argument("--batch-size", type=int, default=10_000)
+    parser.add_argument("--users", type=int, default=10_000, help="Number of distinct usernames")
+    parser.add_argument("--lookups", type=int, default=20)
+    parser.add_argument("--output", help="File to write JSON results to")
+    options = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as directory:
+        connection = sqlite3.connect(os.path.join(directory, "events.sqlite3"))
+        fill(connection, options.rows, options.batch_size, options.users)
+        without_index = measure(connection, options.lookups, options.users)
+        started = time.perf_counter()
+        connection.execute(INDEX)
+        index_seconds = time.perf_counter() - started
+        with_index = measure(connection, options.lookups, options.users)
+        connection.close()
+    results = {
+        "rows": options.rows,
+        "without_index": without_index,
+        "with_index": with_index,
+        "index_build_seconds": round(index_seconds, 3),
+    }
+    report = json.dumps(results, indent=2)
+    print(report)
+    if options.output:
+        with open(options.output, "w") as output:
+            output.write(report)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,137 @@
+"""Benchmark of storing Event.info as JSON text against packing it with an info schema.
+
+Fills two SQLite files with the info columns of the ``event_event`` table, one with info
+as the JSON text JSONField writes and one with info packed as ``Event.info_packed``
+stores it, next to the JSON projection of the indexed keys, and reports bytes per row
+after VACUUM and rows per second of encoding and inserting and of selecting and decoding.
+Payloads look like the ones of benchmarks.seed, ``--note-length`` adds a free text key
+to exercise compression.
+
+Usage:
+    python -m benchmarks.info_storage --rows 200000 --output info_storage.json
+"""
+
+import argparse
+import json
+import os
+import random
+import sqlite3
+import tempfile
+import time
+
+from event.identifiers import uuid7
+from event.info_schemas import pack_info, project_info, unpack_info
+
+SCHEMA = """
+CREATE TABLE event_event (
+    id char(32) NOT NULL PRIMARY KEY,
+    info text NULL,
+    info_schema_id bigint NULL,
+    info_packed blob NULL
+)
+"""
+
+NAMES = ("username", "source", "path", "duration_ms", "ip", "note")
+
+SOURCES = ("web", "ios", "android", "api")
+
+WORDS = ("order", "cart", "checkout", "payment", "failed", "retry", "customer", "item", "shipping", "address")
+
+
+def make_infos(rows, note_length, rng):
+    """list: Returns info payloads shaped like the seeded ones."""
+    infos = []
+    for _ in range(rows):
+        info = {
+            "username": f"user{rng.randrange(10_000)}",
+            "source": rng.choice(SOURCES),
+            "path": f"/products/{rng.randrange(10_000)}",
+            "duration_ms": int(rng.lognormvariate(5, 1)),
+            "ip": f"10.{rng.randrange(256)}.{rng.randrange(256)}.{rng.randrange(256)}",
+        }
+        if note_length:
+            note = " ".join(rng.choice(WORDS) for _ in range(note_length // 6))
+            info["note"] = note[:note_length]
+        infos.append(info)
+    return infos
+
+
+def write(connection, infos, batch_size, encode):
+    """float: Returns seconds spent encoding and inserting infos."""
+    connection.execute(SCHEMA)
+    started = time.perf_counter()
+    for offset in range(0, len(infos), batch_size):
+        batch = [(uuid7().hex, *encode(info)) for info in infos[offset:offset + batch_size]]
+        with connection:
+            connection.executemany("INSERT INTO event_event VALUES (?, ?, ?, ?)", batch)
+    return time.perf_counter() - started
+
+
+def read(connection, decode):
+    """float: Returns seconds spent selecting and decoding all infos."""
+    started = time.perf_counter()
+    for row in connection.execute("SELECT info, info_schema_id, info_packed FROM event_event"):
+        decode(*row)
+    return time.perf_counter() - started
+
+
+def measure(path, infos, batch_size, encode, decode):
+    """dict: Returns bytes per row and read and write throughput of one storage."""
+    connection = sqlite3.connect(path)
+    write_seconds = write(connection, infos, batch_size, encode)
+    connection.execute("VACUUM")
+    page_count = connection.execute("PRAGMA page_count").fetchone()[0]
+    page_size = connection.execute("PRAGMA page_size").fetchone()[0]
+    payload = connection.execute(
+        "SELECT sum(coalesce(length(CAST(info AS blob)), 0) + coalesce(length(info_packed), 0)) FROM event_event"
+    ).fetchone()[0]
+    read_seconds = min(read(connection, decode) for _ in range(3))
+    connection.close()
+    return {
+        "bytes_per_row": round(page_count * page_size / len(infos), 1),
+        "info_bytes_per_row": round(payload / len(infos), 1),
+        "write_rows_per_second": round(len(infos) / write_seconds),
+        "read_rows_per_second": round(len(infos) / read_seconds),
+    }
+
+
+def main():
+    """Run benchmark and print results as JSON."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", type=int, default=200_000)
+    parser.add_argument("--batch-size", type=int, default=10_000)
+    parser.add_argument("--note-length", type=int, default=0, help="Length of a free text key, 0 leaves it out")
+    parser.add_argument("--threshold", type=int, default=256, help="EVENT_INFO_COMPRESS_THRESHOLD")
+    parser.add_argument("--indexed-keys", default="username,source", help="EVENT_INFO_INDEXED_KEYS")
+    parser.add_argument("--output", help="File to write JSON results to")
+    options = parser.parse_args()
+
+    infos = make_infos(options.rows, options.note_length, random.Random(0))
+    keys = options.indexed_keys.split(",") if options.indexed_keys else []
+    storages = {
+        "json": (
+            lambda info: (json.dumps(info), None, None),
+            lambda info, schema_id, packed: json.loads(info),
+        ),
+        "packed": (
+            lambda info: (
+                json.dumps(project_info(info, keys)), 1, pack_info(NAMES, info, options.threshold)
+            ),
+            lambda info, schema_id, packed: unpack_info(NAMES, packed),
+        ),
+    }
+    results = {"rows": options.rows, "note_length": options.note_length}
+    with tempfile.TemporaryDirectory() as directory:
+        for name, (encode, decode) in storages.items():
+            path = os.path.join(directory, f"{name}.sqlite3")
+            results[name] = measure(path, infos, options.batch_size, encode, decode)
+    results["size_ratio"] = round(results["packed"]["bytes_per_row"] / results["json"]["bytes_per_row"], 3)
+    report = json.dumps(results, indent=2)
+    print(report)
+    if options.output:
+        with open(options.output, "w") as output:
+            output.write(report)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,142 @@
+"""Run benchmark scenarios and record their results.
+
+Creates a separate benchmark database, seeds it and runs every scenario for a number of
+iterations after a warm-up. Throughput, p50/p99 latency and queries per request are
+written with the current commit to a JSON file. With --keepdb the database and its
+dataset are reused by later runs, --baseline compares the results with an earlier file.
+
+Usage:
+    python -m benchmarks.run --events 1000000 --keepdb --output results/base.json
+    python -m benchmarks.run --keepdb --baseline results/base.json --output results/new.json
+"""
+
+import argparse
+import json
+import os
+import random
+import statistics
+import subprocess
+import time
+
+from . import setup_django
+
+setup_django()
+
+from django.db import connection  # noqa: E402
+from django.test.utils import CaptureQueriesContext, setup_test_environment  # noqa: E402
+from django.utils import timezone  # noqa: E402
+
+from event.models import Event  # noqa: E402
+
+from .scenarios import SCENARIOS, Context  # noqa: E402
+from .seed import seed  # noqa: E402
+
+
+def get_commit():
+    """str: Returns hash of the checked out commit or None outside a git checkout."""
+    result = subprocess.run(["git", "rev-parse", "HEAD"], capture_output=True, text=True)
+    return result.stdout.strip() or None
+
+
+def measure(name, request, iterations, warmup):
+    """dict: Returns throughput, latency and query count of iterations of a scenario request."""
+    for _ in range(warmup):
+        request()
+    latencies, queries, errors = [], 0, {}
+    started = time.perf_counter()
+    for _ in range(iterations):
+        with CaptureQueriesContext(connection) as captured:
+            request_started = time.perf_counter()
+            response = request()
+            latencies.append(time.perf_counter() - request_started)
+        queries += len(captured)
+        if response.status_code >= 400:
+            errors[response.status_code] = errors.get(response.status_code, 0) + 1
+    elapsed = time.perf_counter() - started
+    percentiles = statistics.quantiles(latencies, n=100) if len(latencies) > 1 else latencies * 99
+    return {
+        "scenario": name,
+        "iterations": iterations,
+        "errors": errors,
+        "requests_per_second": round(iterations / elapsed, 1),
+        "p50_ms": round(percentiles[49] * 1000, 3),
+        "p99_ms": round(percentiles[98] * 1000, 3),
+        "queries_per_request": round(queries / iterations, 2),
+    }
+
+
+def compare(baseline, results):
+    """list: Returns lines describing changes of every scenario against the baseline."""
+    previous = {result["scenario"]: result for result in baseline["scenarios"]}
+    lines = []
+    for result in results["scenarios"]:
+        before = previous.get(result["scenario"])
+        if before is None:
+            continue
+        changes = []
+        for metric in ("requests_per_second", "p50_ms", "p99_ms", "queries_per_request"):
+            change = (result[metric] - before[metric]) / before[metric] * 100 if before[metric] else 0.0
+            changes.append(f"{metric} {before[metric]} -> {result[metric]} ({change:+.1f}%)")
+        lines.append(f"{result['scenario']}: {', '.join(changes)}")
+    return lines
+
+
+def run(options):
+    """dict: Returns results of the selected scenarios on a seeded benchmark database."""
+    existing = Event.objects.count()
+    dataset = None
+    if existing < options.events:
+        dataset = seed(options.events - existing, options.users, options.days, random_seed=options.seed)
+    context = Context(random.Random(options.seed), options.bulk_size)
+    scenarios = [
+        measure(name, SCENARIOS[name](context), options.iterations, options.warmup)
+        for name in options.scenarios or SCENARIOS
+    ]
+    return {
+        "commit": get_commit(),
+        "created_at": timezone.now().isoformat(),
+        "database": connection.vendor,
+        "dataset": {"events": Event.objects.count(), "seeded": dataset},
+        "scenarios": scenarios,
+    }
+
+
+def main():
+    """Run benchmark and write results as JSON."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--events", type=int, default=100_000, help="Events in the dataset")
+    parser.add_argument("--users", type=int, default=10_000)
+    parser.add_argument("--days", type=int, default=30)
+    parser.add_argument("--seed", type=int, default=0, help="Random seed of the dataset and requests")
+    parser.add_argument("--scenarios", nargs="*", choices=SCENARIOS, help="Scenarios to run, all by default")
+    parser.add_argument("--iterations", type=int, default=200)
+    parser.add_argument("--warmup", type=int, default=10)
+    parser.add_argument("--bulk-size", type=int, default=500, help="Events per bulk create request")
+    parser.add_argument("--database-name", default="benchmark.sqlite3", help="Name of the benchmark database")
+    parser.add_argument("--keepdb", action="store_true", help="Reuse the benchmark database and its dataset")
+    parser.add_argument("--baseline", help="Results file to compare with")
+    parser.add_argument("--output", help="File to write JSON results to")
+    options = parser.parse_args()
+
+    setup_test_environment()
+    connection.settings_dict["TEST"]["NAME"] = options.database_name
+    old_name = connection.settings_dict["NAME"]
+    connection.creation.create_test_db(verbosity=0, autoclobber=True, keepdb=options.keepdb)
+    try:
+        results = run(options)
+    finally:
+        connection.creation.destroy_test_db(old_name, verbosity=0, keepdb=options.keepdb)
+
+    report = json.dumps(results, indent=2)
+    print(report)
+    if options.output:
+        os.makedirs(os.path.dirname(options.output) or ".", exist_ok=True)
+        with open(options.output, "w") as output:
+            output.write(report)
+    if options.baseline:
+        with open(options.baseline) as baseline:
+            print("\n".join(compare(json.load(baseline), results)))
+
+
+if __name__ == "__main__":
+    main()
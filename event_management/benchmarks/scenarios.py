@@ -0,0 +1,148 @@
+"""Request scenarios of the benchmark suite.
+
+A scenario takes the shared Context and returns a function that sends one request and
+returns its response. Requests go through the whole Django stack in-process with
+django.test.Client, so results measure the application and the database without
+a web server in between.
+"""
+
+from datetime import timedelta
+
+from . import setup_django
+
+setup_django()
+
+from django.contrib.auth import get_user_model  # noqa: E402
+from django.test import Client  # noqa: E402
+from django.urls import reverse  # noqa: E402
+from django.utils import timezone  # noqa: E402
+
+from rest_framework.authtoken.models import Token  # noqa: E402
+
+from .seed import EVENT_TYPE_NAMES, SOURCES, USERNAME_PREFIX  # noqa: E402
+
+SCENARIOS = {}
+
+
+def scenario(name):
+    """Register decorated function as scenario name."""
+
+    def register(function):
+        SCENARIOS[name] = function
+        return function
+
+    return register
+
+
+class Context:
+    """Clients and data shared by scenarios.
+
+    Attributes:
+        rng (random.Random): Source of request data, seeded for repeatable runs
+        client (Client): Client authenticated with a token
+        admin_client (Client): Client logged in as a superuser
+        active_user (str): Username of the most active seeded user
+        bulk_size (int): Events per bulk create request
+    """
+
+    def __init__(self, rng, bulk_size=500):
+        """Create benchmark users and clients."""
+        user_model = get_user_model()
+        user, _ = user_model.objects.get_or_create(username="bench_client")
+        token, _ = Token.objects.get_or_create(user=user)
+        admin = user_model.objects.filter(username="bench_admin").first()
+        if admin is None:
+            admin = user_model.objects.create_superuser("bench_admin", password="benchmark")
+        self.rng = rng
+        self.client = Client(HTTP_AUTHORIZATION=f"Token {token.key}")
+        self.admin_client = Client()
+        self.admin_client.force_login(admin)
+        self.active_user = (
+            user_model.objects.filter(username__startswith=USERNAME_PREFIX).order_by("id")
+            .values_list("username", flat=True).first()
+        )
+        self.bulk_size = bulk_size
+
+    def new_event(self):
+        """dict: Returns request data of a new event."""
+        timestamp = timezone.now() + timedelta(days=1, seconds=self.rng.random() * 86400)
+        return {
+            "event_type": self.rng.choice(EVENT_TYPE_NAMES),
+            "info": {"username": "bench_client", "source": self.rng.choice(SOURCES)},
+            "timestamp": timestamp.isoformat(),
+        }
+
+
+@scenario("single_create")
+def single_create(context):
+    """Create one event per request."""
+    url = reverse("event:create-event")
+    return lambda: context.client.post(url, context.new_event(), content_type="application/json")
+
+
+@scenario("bulk_create")
+def bulk_create(context):
+    """Create bulk_size events per request."""
+    url = reverse("event:bulk-create-event")
+
+    def request():
+        items = [context.new_event() for _ in range(context.bulk_size)]
+        return context.client.post(url, items, content_type="application/json")
+
+    return request
+
+
+@scenario("list_pages")
+def list_pages(context):
+    """Walk listing pages by their cursors, starting over after the last page."""
+    first_page = f"{reverse('event:list-events')}?page_size=100"
+    state = {"url": first_page}
+
+    def request():
+        response = context.client.get(state["url"])
+        state["url"] = response.json()["next"] or first_page
+        return response
+
+    return request
+
+
+@scenario("list_filtered")
+def list_filtered(context):
+    """List the first page of events of the most active user and one event type."""
+    url = reverse("event:list-events")
+    params = {"user": context.active_user, "event_type": EVENT_TYPE_NAMES[0], "page_size": 100}
+    return lambda: context.client.get(url, params)
+
+
+@scenario("export")
+def export(context):
+    """Stream all events of the most active user as NDJSON."""
+    url = reverse("event:export-events")
+
+    def request():
+        response = context.client.get(url, {"user": context.active_user})
+        b"".join(response.streaming_content)
+        return response
+
+    return request
+
+
+@scenario("stats")
+def stats(context):
+    """Count events per day and event type from rollups."""
+    url = reverse("event:event-stats")
+    return lambda: context.client.get(url, {"period": "day"})
+
+
+@scenario("upcoming")
+def upcoming(context):
+    """Poll the cached feed of the next events of the active user."""
+    url = reverse("event:upcoming-events")
+    return lambda: context.client.get(url)
+
+
+@scenario("admin_changelist")
+def admin_changelist(context):
+    """Render the first page of the Event changelist in the admin."""
+    url = reverse("admin:event_event_changelist")
+    return lambda: context.admin_client.get(url)
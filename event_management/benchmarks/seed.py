@@ -0,0 +1,143 @@
+"""Fast bulk seeder of users, event types and events for benchmarks.
+
+event.factories saves one object per query and a new user per event, which takes hours
+for millions of rows. The seeder creates users and event types up front and inserts
+events with bulk_create in large batches. Activity follows a Zipf-like distribution
+over users and event types, timestamps follow a daily cycle and info payloads look like
+the ones clients send. A fixed random seed makes datasets repeatable.
+
+Usage:
+    python -m benchmarks.seed --events 10000000 --users 50000
+"""
+
+import argparse
+import itertools
+import json
+import random
+import time
+from datetime import timedelta
+
+from . import setup_django
+
+setup_django()
+
+from django.contrib.auth.hashers import make_password  # noqa: E402
+from django.db import transaction  # noqa: E402
+from django.utils import timezone  # noqa: E402
+
+from event.models import Event, EventType, User  # noqa: E402
+from event.rollups import reconcile_rollups  # noqa: E402
+
+EVENT_TYPE_NAMES = [
+    "page_view", "click", "search", "login", "logout", "signup", "add_to_cart", "remove_from_cart",
+    "checkout", "purchase", "refund", "share", "comment", "like", "follow", "upload", "download",
+    "error", "notification_open", "settings_change",
+]
+
+SOURCES = ["web", "ios", "android", "api"]
+
+PATHS = ["/", "/search", "/products", "/products/{n}", "/cart", "/checkout", "/account", "/help"]
+
+# Relative activity per UTC hour, low at night with an evening peak
+HOURLY_WEIGHTS = [2, 1, 1, 1, 1, 2, 4, 7, 9, 10, 10, 10, 10, 10, 10, 10, 11, 12, 13, 13, 11, 8, 5, 3]
+
+USERNAME_PREFIX = "bench_user_"
+
+
+def zipf_cum_weights(count, exponent=1.1):
+    """list: Returns cumulative weights where the n-th item is 1 / n ** exponent as likely as the first."""
+    return list(itertools.accumulate(1 / rank**exponent for rank in range(1, count + 1)))
+
+
+def seed_users(count):
+    """list: Returns ``(id, username)`` of count benchmark users, creating the missing ones."""
+    password = make_password("benchmark")
+    users = [User(username=f"{USERNAME_PREFIX}{number}", password=password) for number in range(count)]
+    User.objects.bulk_create(users, batch_size=5000, ignore_conflicts=True)
+    return list(
+        User.objects.filter(username__startswith=USERNAME_PREFIX).order_by("id").values_list("id", "username")[:count]
+    )
+
+
+def seed_event_types(names=EVENT_TYPE_NAMES):
+    """list: Returns ids of event types with given names, creating the missing ones."""
+    event_types = EventType.objects.resolve_names(names)
+    return [event_types[name].pk for name in names]
+
+
+def generate_events(count, users, event_type_ids, days, rng, now):
+    """Yield unsaved events with realistic user, type, timestamp and info distributions.
+
+    Timestamps are spread over ``days`` days before and after now.
+    """
+    user_weights = zipf_cum_weights(len(users))
+    type_weights = zipf_cum_weights(len(event_type_ids), 1.3)
+    hour_weights = list(itertools.accumulate(HOURLY_WEIGHTS))
+    start = (now - timedelta(days=days)).replace(hour=0, minute=0, second=0, microsecond=0)
+    for _ in range(count):
+        hour = rng.choices(range(24), cum_weights=hour_weights)[0]
+        timestamp = start + timedelta(days=rng.randrange(2 * days), hours=hour, seconds=rng.random() * 3600)
+        user_id, username = rng.choices(users, cum_weights=user_weights)[0]
+        info = {
+            "username": username,
+            "source": rng.choice(SOURCES),
+            "path": rng.choice(PATHS).format(n=rng.randrange(10_000)),
+            "duration_ms": int(rng.lognormvariate(5, 1)),
+            "ip": f"10.{rng.randrange(256)}.{rng.randrange(256)}.{rng.randrange(256)}",
+        }
+        yield Event(
+            user_id=user_id,
+            event_type_id=rng.choices(event_type_ids, cum_weights=type_weights)[0],
+            info=info,
+            timestamp=timestamp,
+        )
+
+
+def seed(events, users=10_000, days=30, batch_size=10_000, random_seed=0, rebuild_rollups=True):
+    """dict: Returns dataset description after inserting events and the users and types they need.
+
+    Events are inserted with bulk_create, which bypasses the rollup signals, so rollups
+    are rebuilt at the end unless rebuild_rollups is False.
+    """
+    rng = random.Random(random_seed)
+    seeded_users, event_type_ids = seed_users(users), seed_event_types()
+    generated = generate_events(events, seeded_users, event_type_ids, days, rng, timezone.now())
+    started = time.perf_counter()
+    while True:
+        batch = list(itertools.islice(generated, batch_size))
+        if not batch:
+            break
+        with transaction.atomic():
+            Event.objects.bulk_create(batch)
+    elapsed = time.perf_counter() - started
+    if rebuild_rollups:
+        reconcile_rollups()
+    return {
+        "events": events,
+        "users": len(seeded_users),
+        "event_types": len(event_type_ids),
+        "days": days,
+        "random_seed": random_seed,
+        "seconds": round(elapsed, 3),
+        "events_per_second": round(events / elapsed) if elapsed else None,
+    }
+
+
+def main():
+    """Seed the configured database and print the dataset description as JSON."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--events", type=int, default=1_000_000)
+    parser.add_argument("--users", type=int, default=10_000)
+    parser.add_argument("--days", type=int, default=30, help="Timestamps spread this many days around now")
+    parser.add_argument("--batch-size", type=int, default=10_000)
+    parser.add_argument("--seed", type=int, default=0, help="Random seed")
+    parser.add_argument("--skip-rollups", action="store_true", help="Don't rebuild rollups after seeding")
+    options = parser.parse_args()
+    result = seed(
+        options.events, options.users, options.days, options.batch_size, options.seed, not options.skip_rollups
+    )
+    print(json.dumps(result, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,108 @@
+"""Microbenchmark of Event serialization: ModelSerializer and json against the declared path.
+
+Measures the cost per 1k events of representing events and rendering them as JSON,
+and of parsing a JSON array and validating every item, for EventSerializer with DRF's
+JSON renderer and parser against FastEventSerializer with the orjson based ones. Event
+types are cached up front, so no database is needed.
+
+Usage:
+    python -m benchmarks.serialization --events 1000 --repeat 20
+"""
+
+import argparse
+import io
+import json
+import time
+from datetime import timedelta
+
+from . import setup_django
+
+setup_django()
+
+from django.utils import timezone  # noqa: E402
+
+from rest_framework.parsers import JSONParser  # noqa: E402
+from rest_framework.renderers import JSONRenderer  # noqa: E402
+
+from event.cache import event_type_cache  # noqa: E402
+from event.models import Event, EventType, User  # noqa: E402
+from event.parsers import ORJSONParser  # noqa: E402
+from event.renderers import ORJSONRenderer  # noqa: E402
+from event.serializers import EventSerializer, FastEventSerializer  # noqa: E402
+
+PATHS = {
+    "model_serializer": (EventSerializer, JSONRenderer, JSONParser),
+    "declared_serializer": (FastEventSerializer, ORJSONRenderer, ORJSONParser),
+}
+
+
+def make_events(count):
+    """list: Returns unsaved events with their users and event types set."""
+    event_types = [EventType(id=number, name=f"type{number}") for number in range(20)]
+    users = [User(id=number, username=f"user{number}") for number in range(100)]
+    now = timezone.now()
+    return [
+        Event(
+            user=users[number % len(users)],
+            event_type=event_types[number % len(event_types)],
+            info={"username": f"user{number % len(users)}", "source": "web", "path": f"/products/{number}"},
+            timestamp=now + timedelta(days=1, seconds=number),
+            created_at=now,
+        )
+        for number in range(count)
+    ]
+
+
+def best_of(repeat, function):
+    """float: Returns the fastest of repeat runs of function in seconds."""
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        function()
+        timings.append(time.perf_counter() - started)
+    return min(timings)
+
+
+def run(name, events, repeat):
+    """dict: Returns serialize and deserialize cost of a path per 1k events."""
+    serializer_class, renderer_class, parser_class = PATHS[name]
+    renderer, parser = renderer_class(), parser_class()
+    payload = json.dumps(
+        [{"event_type": e.event_type.name, "info": e.info, "timestamp": e.timestamp.isoformat()} for e in events]
+    ).encode()
+
+    def serialize():
+        renderer.render(serializer_class(events, many=True).data)
+
+    def deserialize():
+        for item in parser.parse(io.BytesIO(payload)):
+            serializer_class(data=item).is_valid(raise_exception=True)
+
+    per_1k = 1000 / len(events) * 1000
+    return {
+        "path": name,
+        "serialize_ms_per_1k": round(best_of(repeat, serialize) * per_1k, 3),
+        "deserialize_ms_per_1k": round(best_of(repeat, deserialize) * per_1k, 3),
+    }
+
+
+def main():
+    """Run benchmark for every path and print results as JSON."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--events", type=int, default=1000)
+    parser.add_argument("--repeat", type=int, default=20)
+    parser.add_argument("--output", help="File to write JSON results to")
+    options = parser.parse_args()
+
+    events = make_events(options.events)
+    event_type_cache.set_many({event.event_type.name: event.event_type.pk for event in events})
+    results = [run(name, events, options.repeat) for name in PATHS]
+    report = json.dumps(results, indent=2)
+    print(report)
+    if options.output:
+        with open(options.output, "w") as output:
+            output.write(report)
+
+
+if __name__ == "__main__":
+    main()
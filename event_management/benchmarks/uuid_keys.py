@@ -0,0 +1,82 @@
+"""Benchmark of Event primary keys: random uuid4 against time-ordered uuid7.
+
+Inserts rows shaped like the ``event_event`` table into a fresh SQLite file for each
+generator and reports insert throughput, primary key index size and file size.
+
+Usage:
+    python -m benchmarks.uuid_keys --rows 1000000 --output uuid_keys.json
+"""
+
+import argparse
+import json
+import os
+import sqlite3
+import tempfile
+import time
+import uuid
+
+from event.identifiers import uuid7
+
+GENERATORS = {"uuid4": uuid.uuid4, "uuid7": uuid7}
+
+SCHEMA = """
+CREATE TABLE event_event (
+    id char(32) NOT NULL PRIMARY KEY,
+    user_id bigint NOT NULL,
+    event_type_id bigint NOT NULL,
+    info text NOT NULL,
+    timestamp datetime NOT NULL,
+    created_at datetime NOT NULL
+)
+"""
+
+
+def run(name, rows, batch_size, directory):
+    """dict: Returns measurements of inserting rows with the named id generator."""
+    generate = GENERATORS[name]
+    path = os.path.join(directory, f"{name}.sqlite3")
+    connection = sqlite3.connect(path)
+    connection.execute(SCHEMA)
+    started = time.perf_counter()
+    for offset in range(0, rows, batch_size):
+        batch = [
+            (generate().hex, number % 1000, number % 50, '{"username": "user"}', "2030-01-01", "2023-01-01")
+            for number in range(offset, min(offset + batch_size, rows))
+        ]
+        with connection:
+            connection.executemany("INSERT INTO event_event VALUES (?, ?, ?, ?, ?, ?)", batch)
+    elapsed = time.perf_counter() - started
+    index_pages, index_bytes = connection.execute(
+        "SELECT count(*), sum(pgsize) FROM dbstat WHERE name = 'sqlite_autoindex_event_event_1'"
+    ).fetchone()
+    connection.close()
+    return {
+        "generator": name,
+        "rows": rows,
+        "seconds": round(elapsed, 3),
+        "rows_per_second": round(rows / elapsed),
+        "pk_index_pages": index_pages,
+        "pk_index_bytes": index_bytes,
+        "file_bytes": os.path.getsize(path),
+    }
+
+
+def main():
+    """Run benchmark for every generator and print results as JSON."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    parser.add_argument("--batch-size", type=int, default=10_000)
+    parser.add_argument("--output", help="File to write JSON results to")
+    options = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as directory:
+        results = [run(name, options.rows, options.batch_size, directory) for name in GENERATORS]
+    report = json.dumps(results, indent=2)
+    print(report)
+    if options.output:
+        with open(options.output, "w") as output:
+            output.write(report)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,8 +1,134 @@
 """Configuration for admin."""
 
+from django.conf import settings
 from django.contrib import admin
+from django.contrib.admin.helpers import ACTION_CHECKBOX_NAME
+from django.contrib.admin.options import IncorrectLookupParameters
+from django.contrib.admin.views.main import PAGE_VAR, ChangeList
+from django.db import connections
+from django.db.models import Q
+from django.utils.html import format_html
+from django.utils.safestring import mark_safe
+from django.utils.translation import gettext_lazy as _
 
-from .models import Event, EventType
+from .models import ArchivedEvent, DispatcherCheckpoint, Event, EventInfoSchema, EventRollup, EventType
+from .pagination import encode_cursor, parse_cursor
+
+CURSOR_VAR = "cursor"
+
+
+def estimate_count(queryset, limit):
+    """tuple: Returns number of rows and whether it is exact.
+
+    Counting stops after limit rows. A larger unfiltered PostgreSQL table is estimated
+    from planner statistics, anything else is reported as limit.
+    """
+    count = queryset.order_by()[: limit + 1].count()
+    if count <= limit:
+        return count, True
+    connection = connections[queryset.db]
+    if connection.vendor == "postgresql" and not queryset.query.where:
+        with connection.cursor() as cursor:
+            cursor.execute(
+                "SELECT reltuples::bigint FROM pg_class WHERE oid = %s::regclass", [queryset.model._meta.db_table]
+            )
+            row = cursor.fetchone()
+        if row and row[0] > limit:
+            return row[0], False
+    return limit, False
+
+
+class EventTypeNameFilter(admin.SimpleListFilter):
+    """Filter by event type name typed in, without listing all event types."""
+
+    title = _("event type")
+    parameter_name = "event_type__name"
+    template = "admin/event/input_filter.html"
+
+    def lookups(self, request, model_admin):
+        """list: Returns no choices, the name is typed in."""
+        return []
+
+    def has_output(self):
+        """bool: Returns True, the input is always shown."""
+        return True
+
+    def queryset(self, request, queryset):
+        """QuerySet: Returns events of the typed event type."""
+        return queryset.filter(event_type__name=self.value()) if self.value() else queryset
+
+    def choices(self, changelist):
+        """Yield the single choice rendered as an input with the other parameters kept as hidden fields."""
+        yield {
+            "selected": bool(self.value()),
+            "value": self.value() or "",
+            "parameter_name": self.parameter_name,
+            "hidden": [
+                (name, value) for name, value in changelist.params.items()
+                if name not in (self.parameter_name, CURSOR_VAR, PAGE_VAR)
+            ],
+            "clear_query_string": changelist.get_query_string(remove=[self.parameter_name, CURSOR_VAR]),
+        }
+
+
+class KeysetChangeList(ChangeList):
+    """Changelist paged by ``(timestamp, id)`` keyset, newest first, with a bounded count.
+
+    A page is a seek on the ``(..., timestamp, id)`` indexes instead of an OFFSET scan and
+    the result count stops at EVENT_ADMIN_COUNT_LIMIT rows.
+    """
+
+    def get_filters_params(self, params=None):
+        """dict: Returns lookup parameters without the cursor."""
+        lookup_params = super().get_filters_params(params)
+        lookup_params.pop(CURSOR_VAR, None)
+        return lookup_params
+
+    def get_results(self, request):
+        """Load one page of results after the cursor."""
+        queryset = self.queryset.order_by("-timestamp", "-id")
+        encoded = self.params.get(CURSOR_VAR)
+        if encoded:
+            try:
+                timestamp, pk = parse_cursor(encoded)
+            except ValueError:
+                raise IncorrectLookupParameters
+            queryset = queryset.filter(Q(timestamp__lt=timestamp) | Q(id__lt=pk), timestamp__lte=timestamp)
+        results = list(queryset[: self.list_per_page + 1])
+
+        self.count_limit = settings.EVENT_ADMIN_COUNT_LIMIT
+        self.result_count, self.result_count_exact = estimate_count(self.queryset, self.count_limit)
+        self.show_full_result_count = False
+        self.show_admin_actions = True
+        self.full_result_count = None
+        self.result_list = results[: self.list_per_page]
+        self.can_show_all = False
+        self.multi_page = False
+        self.paginator = None
+        self.first_url = self.get_query_string(remove=[CURSOR_VAR, PAGE_VAR]) if encoded else None
+        self.next_url = (
+            self.get_query_string({CURSOR_VAR: encode_cursor(self.result_list[-1])}, [PAGE_VAR])
+            if len(results) > self.list_per_page else None
+        )
+
+
+class KeysetAdminMixin:
+    """Admin of a model with ``timestamp`` and ``id`` fields listed with KeysetChangeList."""
+
+    change_list_template = "admin/event/keyset_change_list.html"
+    show_full_result_count = False
+    sortable_by = ()
+
+    def get_changelist(self, request, **kwargs):
+        """Return KeysetChangeList class."""
+        return KeysetChangeList
+
+    @admin.display(description=mark_safe('<input type="checkbox" id="action-toggle">'))
+    def action_checkbox(self, obj):
+        """Return the checkbox markup of CheckboxInput without rendering a widget template for every row."""
+        return format_html(
+            '<input type="checkbox" name="{}" value="{}" class="action-select">', ACTION_CHECKBOX_NAME, obj.pk
+        )
 
 
 @admin.register(EventType)
@@ -10,13 +136,87 @@ class EventTypeAdmin(admin.ModelAdmin):
     """Class for specifying EventType fields in admin."""
 
     model = EventType
-    list_display = ("name", "id")
+    list_display = ("name", "id", "info_schema")
+    list_select_related = ("info_schema",)
+    search_fields = ("name",)
+
+
+@admin.register(EventInfoSchema)
+class EventInfoSchemaAdmin(admin.ModelAdmin):
+    """Class for specifying EventInfoSchema fields in admin, schemas can be added but not changed."""
+
+    model = EventInfoSchema
+    list_display = ("event_type", "version", "created_at")
+    list_select_related = ("event_type",)
+    autocomplete_fields = ("event_type",)
+
+    def has_change_permission(self, request, obj=None):
+        """Events packed with a schema are unpacked with it, so it never changes."""
+        return False
 
 
 @admin.register(Event)
-class EventAdmin(admin.ModelAdmin):
-    """Class for specifying Event fields in admin."""
+class EventAdmin(KeysetAdminMixin, admin.ModelAdmin):
+    """Class for specifying Event fields in admin.
 
-    model = EventType
+    Users and event types are joined into the page query and picked with autocomplete
+    widgets, so no page loads all of them.
+    """
+
+    model = Event
     list_display = ("id", "user", "event_type", "timestamp")
-    list_filter = ("event_type", "timestamp")
+    list_filter = (EventTypeNameFilter, "timestamp")
+    list_select_related = ("user", "event_type")
+    autocomplete_fields = ("user", "event_type")
+
+
+@admin.register(ArchivedEvent)
+class ArchivedEventAdmin(KeysetAdminMixin, admin.ModelAdmin):
+    """Class for specifying read-only ArchivedEvent fields in admin."""
+
+    model = ArchivedEvent
+    list_display = ("id", "user", "event_type", "timestamp", "archived_at")
+    list_filter = (EventTypeNameFilter,)
+    list_select_related = ("user", "event_type")
+
+    def has_add_permission(self, request):
+        """Events are archived by the archive_events command only."""
+        return False
+
+    def has_change_permission(self, request, obj=None):
+        """Events are archived by the archive_events command only."""
+        return False
+
+
+@admin.register(EventRollup)
+class EventRollupAdmin(admin.ModelAdmin):
+    """Class for specifying read-only EventRollup fields in admin."""
+
+    model = EventRollup
+    list_display = ("period", "bucket", "event_type", "user", "count")
+    list_filter = ("period", EventTypeNameFilter)
+    list_select_related = ("user", "event_type")
+
+    def has_add_permission(self, request):
+        """Rollups are maintained from events only."""
+        return False
+
+    def has_change_permission(self, request, obj=None):
+        """Rollups are maintained from events only."""
+        return False
+
+
+@admin.register(DispatcherCheckpoint)
+class DispatcherCheckpointAdmin(admin.ModelAdmin):
+    """Class for specifying read-only DispatcherCheckpoint fields in admin."""
+
+    model = DispatcherCheckpoint
+    list_display = ("shard", "shards", "timestamp", "event_id", "owner", "lease_expires")
+
+    def has_add_permission(self, request):
+        """Checkpoints are maintained by run_dispatcher only."""
+        return False
+
+    def has_change_permission(self, request, obj=None):
+        """Checkpoints are maintained by run_dispatcher only."""
+        return False
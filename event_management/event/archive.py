@@ -0,0 +1,70 @@
+"""The module includes archival of past events.
+
+Single events with a timestamp older than EVENT_ARCHIVE_AFTER_DAYS are moved from the hot
+Event table to ArchivedEvent by ``archive_events``, one short transaction per batch.
+Recurring events stay in the Event table and are expanded from there. The cutoff only
+moves forward, so every archived event is older than the current cutoff and a requested
+range starting at or after it can't contain archived events. Listing and export read
+the archive only for ranges that start before the cutoff.
+"""
+
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import transaction
+from django.utils import timezone
+
+from .filters import filter_events, parse_timestamp
+from .models import ArchivedEvent, Event
+from .rollups import suppress_rollups
+
+ARCHIVE_FIELDS = ("id", "user_id", "event_type_id", "info", "timestamp", "created_at")
+
+
+def archive_cutoff():
+    """datetime: Returns time before which events may be archived."""
+    return timezone.now() - timedelta(days=settings.EVENT_ARCHIVE_AFTER_DAYS)
+
+
+def reaches_archive(params):
+    """bool: Returns whether the time range requested by query parameters may contain archived events."""
+    after = params.get("timestamp_after")
+    return not after or parse_timestamp("timestamp_after", after) < archive_cutoff()
+
+
+def archived_events(queryset, params):
+    """QuerySet: Returns archived events filtered by query parameters, None when the range doesn't reach them."""
+    return filter_events(queryset, params) if reaches_archive(params) else None
+
+
+def archive_events(cutoff=None, batch_size=None, using="default", dry_run=False):
+    """int: Returns number of events moved to the archive.
+
+    Args:
+        cutoff (datetime): Archive events older than this, at most archive_cutoff()
+        batch_size (int): Number of events moved in one transaction
+        using (str): Database alias
+        dry_run (bool): Only count events to archive
+
+    Every batch is copied and deleted in its own transaction, so rows are locked only
+    briefly and an interrupted run resumes where it stopped.
+    """
+    cutoff = min(cutoff or archive_cutoff(), archive_cutoff())
+    batch_size = batch_size or settings.EVENT_ARCHIVE_BATCH_SIZE
+    events = Event.objects.using(using).filter(recurrence="", timestamp__lt=cutoff)
+    if dry_run:
+        return events.count()
+
+    archived = 0
+    while True:
+        # Archived events stay counted in their rollups
+        with transaction.atomic(using=using), suppress_rollups():
+            # Events are loaded as instances, so packed info is archived unpacked
+            rows = list(events.order_by("timestamp", "id")[:batch_size])
+            if not rows:
+                return archived
+            ArchivedEvent.objects.using(using).bulk_create(
+                [ArchivedEvent(**{field: getattr(event, field) for field in ARCHIVE_FIELDS}) for event in rows]
+            )
+            Event.objects.using(using).filter(pk__in=[event.pk for event in rows]).delete()
+        archived += len(rows)
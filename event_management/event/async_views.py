@@ -0,0 +1,88 @@
+"""This module provides native async Event views for ASGI deployments.
+
+The token and the event type are resolved with the async ORM and validation runs
+without database access. Every middleware of MIDDLEWARE is async capable, so under ASGI
+requests reach the views on the event loop, but the async ORM still runs every query in
+a thread. The views let a worker wait on many requests at once, they don't make a single
+request faster: on SQLite, event creation under ASGI had lower throughput than the sync
+view under WSGI, measure with ``benchmarks.http_load`` before switching.
+"""
+
+from django.http import JsonResponse
+from django.views import View
+
+from rest_framework import status
+from rest_framework.exceptions import APIException
+
+from user.authentication import aauthenticate_token
+
+from .cache import event_type_cache, info_schema_cache
+from .models import Event
+from .parsers import json_loads
+from .serializers import FastEventIngestSerializer, FastEventSerializer
+
+
+class AsyncAPIView(View):
+    """Base async view with DRF-like authentication, parsing and error responses."""
+
+    http_method_names = ["post", "options"]
+
+    @classmethod
+    def as_view(cls, **initkwargs):
+        """Return view exempt from CSRF checks as token authenticated API views are."""
+        view = super().as_view(**initkwargs)
+        view.csrf_exempt = True
+        return view
+
+    async def dispatch(self, request, *args, **kwargs):
+        """Turn API exceptions into JSON responses."""
+        try:
+            return await super().dispatch(request, *args, **kwargs)
+        except APIException as exc:
+            response = JsonResponse({"detail": exc.detail}, status=exc.status_code)
+            if exc.status_code == status.HTTP_401_UNAUTHORIZED:
+                response["WWW-Authenticate"] = "Token"
+            return response
+
+    async def http_method_not_allowed(self, request, *args, **kwargs):
+        """Return JSON response for unsupported methods."""
+        return JsonResponse(
+            {"detail": f'Method "{request.method}" not allowed.'}, status=status.HTTP_405_METHOD_NOT_ALLOWED
+        )
+
+    async def options(self, request, *args, **kwargs):
+        """Return allowed methods."""
+        response = JsonResponse({})
+        response["Allow"] = ", ".join(method.upper() for method in self._allowed_methods())
+        return response
+
+    @staticmethod
+    def parse_json(request):
+        """Return decoded JSON body or None if it is malformed."""
+        try:
+            return json_loads(request.body or b"{}")
+        except ValueError:
+            return None
+
+
+class EventCreateAsyncView(AsyncAPIView):
+    """This view is used for creating new event on the ASGI application."""
+
+    async def post(self, request, *args, **kwargs):
+        """Post method for creating events."""
+        user = await aauthenticate_token(request)
+        data = self.parse_json(request)
+        if data is None:
+            return JsonResponse({"detail": "JSON parse error."}, status=status.HTTP_400_BAD_REQUEST)
+
+        # Checking info needs the event type, which is resolved without blocking the event loop below
+        serializer = FastEventIngestSerializer(data=data, context={"check_info": False})
+        if not serializer.is_valid():
+            return JsonResponse(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+        event_type = await event_type_cache.aresolve(serializer.validated_data["event_type"])
+        schema = await info_schema_cache.aactive(event_type.pk)
+        errors = schema.errors(serializer.validated_data["info"]) if schema is not None else None
+        if errors:
+            return JsonResponse({"info": errors}, status=status.HTTP_400_BAD_REQUEST)
+        event = await Event.objects.acreate(**{**serializer.validated_data, "event_type": event_type}, user=user)
+        return JsonResponse(FastEventSerializer(event).data, status=status.HTTP_201_CREATED)
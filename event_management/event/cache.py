@@ -0,0 +1,320 @@
+"""The module includes caches for frequently resolved objects."""
+
+import threading
+import time
+import uuid
+from collections import OrderedDict
+
+from django.apps import apps
+from django.conf import settings
+from django.core.cache import caches
+
+from asgiref.sync import sync_to_async
+
+from event_management.metrics import CACHE_LOOKUPS
+
+# Marks a key missing from an LRUCache whose cached values may be None
+MISSING = object()
+
+
+class LRUCache:
+    """Thread-safe bounded in-process cache with least recently used eviction.
+
+    Attributes:
+        maxsize (int): Maximum number of entries
+        ttl (float): Seconds an entry stays valid, None keeps it until it is evicted
+        hits (int): Number of lookups that found a value
+        misses (int): Number of lookups that found nothing
+    """
+
+    def __init__(self, maxsize=1024, ttl=None):
+        """Create an empty cache."""
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        """int: Returns number of entries."""
+        return len(self._data)
+
+    def get(self, key, default=None):
+        """Return cached value for key and mark it as recently used."""
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is not None and (entry[1] is None or entry[1] > time.monotonic()):
+                self._data.move_to_end(key)
+                self.hits += 1
+                return entry[0]
+            if entry is not None:
+                del self._data[key]
+            self.misses += 1
+            return default
+
+    def set(self, key, value):  # noqa: A003
+        """Store value for key, evicting the least recently used entry when full."""
+        expires = time.monotonic() + self.ttl if self.ttl is not None else None
+        with self._lock:
+            self._data[key] = (value, expires)
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+    def delete(self, key):
+        """Remove key from the cache if present."""
+        with self._lock:
+            self._data.pop(key, None)
+
+    def purge(self):
+        """Remove all entries, keeping the counters."""
+        with self._lock:
+            self._data.clear()
+
+    def clear(self):
+        """Remove all entries and reset counters."""
+        with self._lock:
+            self._data.clear()
+            self.hits = self.misses = 0
+
+
+class TwoTierCache:
+    """Two-tier cache with a process-local LRUCache and an optional shared Django cache.
+
+    Every invalidation stores a new generation token in the shared tier, which is read
+    with every lookup, together with the keys missing locally, and a process that sees a
+    token it didn't store drops its local entries. Without a shared tier local entries
+    expire after a short TTL, which bounds how long a process can serve a value that was
+    invalidated by another process.
+    """
+
+    name = "cache"
+    key_prefix = ""
+
+    def __init__(self, maxsize=1024, ttl=60, alias=None, timeout=3600):
+        """Create the cache; alias names the Django cache used as the shared tier."""
+        self.local = LRUCache(maxsize, ttl)
+        self.alias = alias
+        self.timeout = timeout
+        self.shared_hits = 0
+        self.generation = None
+        self.lookups = {result: CACHE_LOOKUPS.labels(self.name, result) for result in ("local", "shared", "miss")}
+
+    @classmethod
+    def from_settings(cls, options):
+        """TwoTierCache: Returns cache configured with MAX_SIZE, TTL, ALIAS and TIMEOUT options."""
+        return cls(options["MAX_SIZE"], options["TTL"], options["ALIAS"] or None, options["TIMEOUT"])
+
+    @property
+    def shared(self):
+        """BaseCache: Returns Django cache used as the shared tier or None."""
+        return caches[self.alias] if self.alias else None
+
+    @property
+    def misses(self):
+        """int: Returns number of lookups answered by neither tier."""
+        return self.local.misses - self.shared_hits
+
+    @property
+    def generation_key(self):
+        """str: Returns key of the generation token in the shared tier, outside the keys of the entries."""
+        return f"generation:{self.key_prefix}"
+
+    def make_key(self, key):
+        """str: Returns key used in the shared tier."""
+        return f"{self.key_prefix}{key}"
+
+    def get(self, key, default=None):
+        """Return value cached in either tier."""
+        return self.get_many([key]).get(key, default)
+
+    def get_many(self, keys):
+        """dict: Returns cached values for the keys found in either tier."""
+        found = {}
+        for key in keys:
+            value = self.local.get(key)
+            if value is not None:
+                found[key] = value
+        if self.shared is None:
+            self.lookups["local"].inc(len(found))
+            self.lookups["miss"].inc(len(keys) - len(found))
+            return found
+        missing = [key for key in keys if key not in found]
+        shared = self.shared.get_many([self.generation_key, *(self.make_key(key) for key in missing)])
+        generation = shared.get(self.generation_key)
+        if generation != self.generation:
+            # Another process invalidated entries since the last lookup, the local ones may be stale
+            self.generation = generation
+            self.local.purge()
+            if found:
+                shared.update(self.shared.get_many([self.make_key(key) for key in found]))
+            found, missing = {}, list(keys)
+        self.lookups["local"].inc(len(found))
+        for key in missing:
+            value = shared.get(self.make_key(key))
+            if value is not None:
+                self.shared_hits += 1
+                self.lookups["shared"].inc()
+                self.local.set(key, value)
+                found[key] = value
+        self.lookups["miss"].inc(len(keys) - len(found))
+        return found
+
+    def set(self, key, value):  # noqa: A003
+        """Store value in both tiers."""
+        self.set_many({key: value})
+
+    def set_many(self, values):
+        """Store values in both tiers."""
+        for key, value in values.items():
+            self.local.set(key, value)
+        if values and self.shared is not None:
+            self.shared.set_many({self.make_key(key): value for key, value in values.items()}, self.timeout)
+
+    def invalidate(self, key):
+        """Remove key from both tiers and make the other processes drop their local entries."""
+        self.local.delete(key)
+        if self.shared is not None:
+            self.shared.delete(self.make_key(key))
+            self.generation = uuid.uuid4().hex
+            self.shared.set(self.generation_key, self.generation, None)
+
+    def clear(self):
+        """Remove all local entries and reset counters."""
+        self.local.clear()
+        self.shared_hits = 0
+
+    def stats(self):
+        """dict: Returns hit and miss counters."""
+        return {
+            "local_hits": self.local.hits,
+            "shared_hits": self.shared_hits,
+            "misses": self.misses,
+            "size": len(self.local),
+        }
+
+
+class EventTypeCache(TwoTierCache):
+    """Two-tier cache for event type name to id resolution."""
+
+    name = "event_type"
+    key_prefix = "event:event_type:"
+
+    def resolve(self, name):
+        """EventType: Returns event type with given name, creating it if it doesn't exist."""
+        return self.resolve_many([name])[name]
+
+    async def aresolve(self, name):
+        """EventType: Async variant of resolve, only a cache miss leaves the event loop."""
+        ids = self.get_many([name])
+        if name in ids:
+            return apps.get_model("event", "EventType").from_db(None, ["id", "name"], [ids[name], name])
+        return await sync_to_async(self.resolve)(name)
+
+    def resolve_many(self, names):
+        """dict: Map every name to its event type, creating missing types together."""
+        event_type_model = apps.get_model("event", "EventType")
+        names = set(names)
+        ids = self.get_many(names)
+        event_types = {name: event_type_model.from_db(None, ["id", "name"], [pk, name]) for name, pk in ids.items()}
+        missing = names - ids.keys()
+        if missing:
+            resolved = event_type_model.objects.resolve_names(missing)
+            self.set_many({name: event_type.pk for name, event_type in resolved.items()})
+            event_types.update(resolved)
+        return event_types
+
+    def lookup(self, name):
+        """int: Returns id of the event type with given name, None when it doesn't exist."""
+        pk = self.get(name)
+        if pk is None:
+            pk = apps.get_model("event", "EventType").objects.filter(name=name).values_list("pk", flat=True).first()
+            if pk is not None:
+                self.set(name, pk)
+        return pk
+
+
+class InfoSchemaCache:
+    """Process-local cache of info schemas and of the active schema of every event type.
+
+    Schemas are never changed, so they stay cached until they are evicted. Active schema
+    ids expire after TTL seconds, which bounds how long a process packs info with a
+    schema that another process replaced.
+    """
+
+    def __init__(self, maxsize=1024, ttl=60):
+        """Create an empty cache."""
+        self.schemas = LRUCache(maxsize)
+        self.active_ids = LRUCache(maxsize, ttl)
+
+    @classmethod
+    def from_settings(cls, options):
+        """InfoSchemaCache: Returns cache configured with MAX_SIZE and TTL options."""
+        return cls(options["MAX_SIZE"], options["TTL"])
+
+    def get(self, pk):
+        """EventInfoSchema: Returns schema with given id."""
+        schema = self.schemas.get(pk)
+        if schema is None:
+            schema = apps.get_model("event", "EventInfoSchema").objects.get(pk=pk)
+            self.schemas.set(pk, schema)
+        return schema
+
+    def active(self, event_type_id):
+        """EventInfoSchema: Returns schema info of the event type is packed with, None when it is stored as JSON."""
+        pk = self.active_ids.get(event_type_id, MISSING)
+        if pk is MISSING:
+            event_type_model = apps.get_model("event", "EventType")
+            pk = event_type_model.objects.filter(pk=event_type_id).values_list("info_schema", flat=True).first()
+            self.active_ids.set(event_type_id, pk)
+        return self.get(pk) if pk is not None else None
+
+    def active_by_names(self, names, ids=None):
+        """dict: Map names of existing event types with an active schema to it.
+
+        Args:
+            names (iterable): Event type names
+            ids (dict): Cached event type ids by name, the active schemas of these come from the cache
+
+        The other names are looked up in one query for all of them.
+        """
+        ids = ids or {}
+        schemas, missing = {}, set()
+        for name in names:
+            pk = self.active_ids.get(ids[name], MISSING) if name in ids else MISSING
+            if pk is MISSING:
+                missing.add(name)
+            elif pk is not None:
+                schemas[name] = self.get(pk)
+        if not missing:
+            return schemas
+        event_type_model = apps.get_model("event", "EventType")
+        rows = event_type_model.objects.filter(name__in=missing).values_list("name", "pk", "info_schema")
+        for name, event_type_id, pk in rows:
+            self.active_ids.set(event_type_id, pk)
+            if pk is not None:
+                schemas[name] = self.get(pk)
+        return schemas
+
+    async def aactive(self, event_type_id):
+        """EventInfoSchema: Async variant of active, only a cache miss leaves the event loop."""
+        pk = self.active_ids.get(event_type_id, MISSING)
+        if pk is None:
+            return None
+        schema = self.schemas.get(pk) if pk is not MISSING else None
+        return schema if schema is not None else await sync_to_async(self.active)(event_type_id)
+
+    def invalidate(self, event_type_id):
+        """Drop the cached active schema of the event type."""
+        self.active_ids.delete(event_type_id)
+
+    def clear(self):
+        """Remove all entries."""
+        self.schemas.clear()
+        self.active_ids.clear()
+
+
+event_type_cache = EventTypeCache.from_settings(settings.EVENT_TYPE_CACHE)
+
+info_schema_cache = InfoSchemaCache.from_settings(settings.EVENT_INFO_SCHEMA_CACHE)
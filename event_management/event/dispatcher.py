@@ -0,0 +1,242 @@
+"""The module includes the due-event dispatcher.
+
+``run_dispatcher`` calls handlers with every event when its timestamp arrives. Events due
+within EVENT_DISPATCHER["LOOKAHEAD"] seconds are kept in a heap ordered by
+``(timestamp, id)``. Every poll reads the keys of the events in that window again with a
+range query on the event_timestamp_id_idx index, so no query scans events that aren't due
+soon: events written after the window was loaded are added, whenever they were queued and
+whatever their id, and events that were deleted or moved since are dropped. Only the
+events that weren't in the heap yet are loaded whole. The window starts CREATE_MARGIN
+seconds in the past, so events written shortly after they were due are still fired, late.
+Occurrences of recurring events are expanded into the heap the same way.
+
+Events are changed by other processes, whose save and delete signals don't reach the
+dispatcher, so a change is seen at the next poll, at most POLL_INTERVAL seconds later.
+
+Events are split into shards by ``user_id % shards``. Each shard has a
+DispatcherCheckpoint row holding the ``(timestamp, id)`` key of its last fired event and
+a lease, so only one process fires the events of a shard and a restarted process
+resumes after the checkpoint. The checkpoint is saved, renewing the lease, at the start
+of every tick and when the process stops. Events fired since the last saved checkpoint
+are fired again when a process crashes.
+"""
+
+import heapq
+import logging
+import os
+import socket
+import threading
+import time
+import uuid
+from datetime import timedelta
+
+from django.conf import settings
+from django.db.models import Q
+from django.db.models.functions import Mod
+from django.utils import timezone
+from django.utils.module_loading import import_string
+
+from event_management.metrics import DISPATCH_LATENESS, EVENTS_DISPATCHED
+
+from .models import DispatcherCheckpoint, Event
+from .recurrence import expand_series
+
+logger = logging.getLogger(__name__)
+
+
+class LeaseLostError(Exception):
+    """Raised when another dispatcher process holds the shard."""
+
+
+def log_due_event(event):
+    """Log a due event, the default handler."""
+    logger.info("Event %s of type %s is due at %s", event.id, event.event_type.name, event.timestamp.isoformat())
+
+
+def get_handlers():
+    """list: Returns handlers listed in EVENT_DISPATCHER["HANDLERS"] setting."""
+    return [import_string(path) for path in settings.EVENT_DISPATCHER["HANDLERS"]]
+
+
+class EventDispatcher:
+    """Fires handlers for the due events of one shard.
+
+    Attributes:
+        handlers (list): Callables called with every due event
+        shard (int): Shard number
+        shards (int): Number of shards
+        owner (str): Name of this process in the shard lease
+        position (tuple): ``(timestamp, id)`` key of the last fired event
+        resumed_from (tuple): Checkpoint loaded with the lease, events up to it may have been fired before
+        loaded_until (datetime): End of the time window loaded into the heap
+        fired (int): Number of events passed to the handlers
+    """
+
+    def __init__(self, handlers=None, shard=0, shards=1, owner=None, clock=timezone.now):
+        """Create dispatcher of the shard."""
+        if not 0 <= shard < shards:
+            raise ValueError("Shard must be between 0 and shards - 1.")
+        options = settings.EVENT_DISPATCHER
+        self.handlers = get_handlers() if handlers is None else handlers
+        self.shard = shard
+        self.shards = shards
+        self.owner = owner or f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:8]}"
+        self.clock = clock
+        self.lookahead = timedelta(seconds=options["LOOKAHEAD"])
+        self.poll_interval = options["POLL_INTERVAL"]
+        self.create_margin = timedelta(seconds=options["CREATE_MARGIN"])
+        self.lease_timeout = timedelta(seconds=options["LEASE_TIMEOUT"])
+        self.position = None
+        self.resumed_from = None
+        self.loaded_until = None
+        self.lease_expires = None
+        self.fired = 0
+        self.failed = 0
+        self._heap = []
+        self._fired = set()
+
+    def get_queryset(self):
+        """QuerySet: Returns events of the shard joined with their users and event types."""
+        queryset = Event.objects.select_related("user", "event_type")
+        if self.shards > 1:
+            queryset = queryset.alias(shard=Mod("user_id", self.shards)).filter(shard=self.shard)
+        return queryset
+
+    def acquire(self):
+        """Take the lease of the shard and load its checkpoint, raise LeaseLostError when another process holds it."""
+        now = self.clock()
+        # A new shard starts at the current time, events that were due before aren't fired
+        DispatcherCheckpoint.objects.get_or_create(
+            shard=self.shard, shards=self.shards, defaults={"timestamp": now, "event_id": uuid.UUID(int=0)}
+        )
+        acquired = (
+            DispatcherCheckpoint.objects.filter(shard=self.shard, shards=self.shards)
+            .filter(Q(owner=self.owner) | Q(lease_expires__isnull=True) | Q(lease_expires__lt=now))
+            .update(owner=self.owner, lease_expires=now + self.lease_timeout)
+        )
+        if not acquired:
+            raise LeaseLostError(f"Shard {self.shard}/{self.shards} is held by another dispatcher.")
+        checkpoint = DispatcherCheckpoint.objects.get(shard=self.shard, shards=self.shards)
+        self.lease_expires = now + self.lease_timeout
+        self.position = self.resumed_from = (checkpoint.timestamp, checkpoint.event_id)
+        self._heap, self._fired = [], set()
+        self.loaded_until = now
+        self.load_window(now)
+
+    def save_checkpoint(self):
+        """Store the position and renew the lease, raise LeaseLostError when another process took the shard."""
+        now = self.clock()
+        timestamp, pk = self.position
+        renewed = DispatcherCheckpoint.objects.filter(shard=self.shard, shards=self.shards, owner=self.owner).update(
+            timestamp=timestamp, event_id=pk, lease_expires=now + self.lease_timeout
+        )
+        if not renewed:
+            raise LeaseLostError(f"Shard {self.shard}/{self.shards} was taken over by another dispatcher.")
+        self.lease_expires = now + self.lease_timeout
+
+    def release(self):
+        """Store the position and give up the lease."""
+        timestamp, pk = self.position
+        DispatcherCheckpoint.objects.filter(shard=self.shard, shards=self.shards, owner=self.owner).update(
+            timestamp=timestamp, event_id=pk, lease_expires=None
+        )
+
+    def load_window(self, now):
+        """Make the heap hold the events due up to now + lookahead that weren't fired yet.
+
+        The window starts at the position or CREATE_MARGIN seconds ago, whichever is
+        earlier, but never before the loaded checkpoint. Events in it that aren't past the
+        position or were written late and weren't fired are kept or added, the others are
+        dropped.
+        """
+        self.loaded_until = max(self.loaded_until, now + self.lookahead)
+        start = max(min(self.position[0], now - self.create_margin), self.resumed_from[0])
+        # Events before the start are never loaded again, so their keys can be forgotten
+        self._fired = {key for key in self._fired if key[0] >= start}
+        queryset = self.get_queryset()
+        single = queryset.filter(recurrence="", timestamp__gte=start, timestamp__lt=self.loaded_until)
+        keys = {key for key in single.values_list("timestamp", "id") if self.is_pending(key)}
+        events = {
+            (event.timestamp, event.id): event
+            for _, _, event in self._heap
+            if not event.recurrence and (event.timestamp, event.id) in keys
+        }
+        missing = [pk for timestamp, pk in keys - events.keys()]
+        if missing:
+            events.update(((event.timestamp, event.id), event) for event in single.filter(id__in=missing))
+        for occurrence in expand_series(queryset, start, self.loaded_until):
+            key = (occurrence.timestamp, occurrence.id)
+            if self.is_pending(key):
+                events[key] = occurrence
+        self._heap = [(timestamp, pk, event) for (timestamp, pk), event in events.items()]
+        heapq.heapify(self._heap)
+
+    def is_pending(self, key):
+        """bool: Returns whether the event with the ``(timestamp, id)`` key is still to be fired."""
+        return key > self.resumed_from and key not in self._fired
+
+    def fire_due(self, now):
+        """int: Returns number of events passed to the handlers because their time has come."""
+        fired = 0
+        while self._heap and self._heap[0][0] <= now:
+            # Stop before the lease may run out, the next checkpoint renews it
+            if self.clock() >= self.lease_expires - timedelta(seconds=self.poll_interval):
+                break
+            timestamp, pk, event = heapq.heappop(self._heap)
+            self.dispatch(event)
+            self._fired.add((timestamp, pk))
+            self.position = max(self.position, (timestamp, pk))
+            fired += 1
+        self.fired += fired
+        return fired
+
+    def dispatch(self, event):
+        """Call every handler with the event, a failing handler doesn't stop the others."""
+        DISPATCH_LATENESS.observe(max((self.clock() - event.timestamp).total_seconds(), 0))
+        for handler in self.handlers:
+            try:
+                handler(event)
+            except Exception:
+                logger.exception("Handler %s failed for event %s at %s", handler, event.id, event.timestamp)
+                EVENTS_DISPATCHED.labels("error").inc()
+                self.failed += 1
+            else:
+                EVENTS_DISPATCHED.labels("ok").inc()
+
+    def tick(self):
+        """int: Returns number of events fired after reading the window again."""
+        self.save_checkpoint()
+        now = self.clock()
+        self.load_window(now)
+        return self.fire_due(now)
+
+    def seconds_to_wait(self):
+        """float: Returns time until the next event is due, at most the poll interval."""
+        if not self._heap:
+            return self.poll_interval
+        return min(max((self._heap[0][0] - self.clock()).total_seconds(), 0), self.poll_interval)
+
+    def run(self, stop=None):
+        """Fire due events until stop is set, polling for new events every poll interval."""
+        stop = stop or threading.Event()
+        self.acquire()
+        try:
+            while not stop.is_set():
+                self.tick()
+                # Sleep until the next event is due and fire it without waiting for the next poll
+                next_poll = time.monotonic() + self.poll_interval
+                while not stop.wait(min(self.seconds_to_wait(), max(next_poll - time.monotonic(), 0))):
+                    if time.monotonic() >= next_poll or not self.fire_due(self.clock()):
+                        break
+        finally:
+            self.release()
+
+    def stats(self):
+        """dict: Returns shard, position and dispatch counters."""
+        return {
+            "shard": f"{self.shard}/{self.shards}",
+            "position": [self.position[0].isoformat(), str(self.position[1])] if self.position else None,
+            "scheduled": len(self._heap),
+            "fired": self.fired,
+            "failed": self.failed,
+        }
@@ -0,0 +1,110 @@
+"""The module includes streaming exporters of events.
+
+Rows are read with ``QuerySet.iterator`` and encoded one by one, so memory use does
+not depend on the number of exported events.
+"""
+
+import csv
+import heapq
+import json
+import zlib
+
+from django.conf import settings
+
+from .cache import info_schema_cache
+
+EXPORT_FIELDS = ("id", "user", "event_type", "info", "timestamp", "created_at")
+
+EXPORT_FORMATS = {
+    "ndjson": ("application/x-ndjson", "ndjson"),
+    "csv": ("text/csv", "csv"),
+}
+
+
+def unpack_rows(rows):
+    """Yield event rows ending with info schema id and packed info as tuples of EXPORT_FIELDS with info unpacked."""
+    for *row, schema_id, packed in rows:
+        if packed is not None:
+            row[3] = info_schema_cache.get(schema_id).unpack(packed)
+        yield tuple(row)
+
+
+def iter_rows(queryset, chunk_size=None, archive=None, occurrences=None):
+    """Yield events as tuples of EXPORT_FIELDS joined with user and event type in one query per table.
+
+    Archived events passed as ``archive`` and occurrences of recurring events passed as
+    ``occurrences``, with their users and event types loaded, are merged in ``(timestamp, id)`` order.
+    """
+    chunk_size = chunk_size or settings.EVENT_EXPORT_CHUNK_SIZE
+    fields = ("id", "user__username", "event_type__name", "info", "timestamp", "created_at")
+    iterators = [
+        unpack_rows(
+            queryset.order_by("timestamp", "id")
+            .values_list(*fields, "info_schema", "info_packed")
+            .iterator(chunk_size=chunk_size)
+        )
+    ]
+    if archive is not None:
+        iterators.append(archive.order_by("timestamp", "id").values_list(*fields).iterator(chunk_size=chunk_size))
+    if occurrences is not None:
+        iterators.append(
+            (event.id, event.user.username, event.event_type.name, event.info, event.timestamp, event.created_at)
+            for event in occurrences
+        )
+    return heapq.merge(*iterators, key=lambda row: (row[4], row[0]))
+
+
+def iter_ndjson(rows):
+    """Yield rows encoded as JSON lines, with full precision ISO 8601 datetimes."""
+    for pk, user, event_type, info, timestamp, created_at in rows:
+        values = (str(pk), user, event_type, info, timestamp.isoformat(), created_at.isoformat())
+        yield json.dumps(dict(zip(EXPORT_FIELDS, values))) + "\n"
+
+
+class _Echo:
+    """File-like object returning what is written, used to stream csv.writer output."""
+
+    def write(self, value):
+        """Return value instead of storing it."""
+        return value
+
+
+def iter_csv(rows):
+    """Yield header and rows encoded as CSV lines, with info as a JSON string."""
+    writer = csv.writer(_Echo())
+    yield writer.writerow(EXPORT_FIELDS)
+    for pk, user, event_type, info, timestamp, created_at in rows:
+        yield writer.writerow(
+            (pk, user, event_type, json.dumps(info), timestamp.isoformat(), created_at.isoformat())
+        )
+
+
+def iter_bytes(lines, buffer_size=64 * 1024):
+    """Yield encoded lines joined into chunks of about buffer_size bytes."""
+    buffer, size = [], 0
+    for line in lines:
+        data = line.encode()
+        buffer.append(data)
+        size += len(data)
+        if size >= buffer_size:
+            yield b"".join(buffer)
+            buffer, size = [], 0
+    if buffer:
+        yield b"".join(buffer)
+
+
+def iter_gzip(chunks):
+    """Yield chunks compressed on the fly as a gzip stream."""
+    compressor = zlib.compressobj(wbits=16 + zlib.MAX_WBITS)
+    for chunk in chunks:
+        compressed = compressor.compress(chunk)
+        if compressed:
+            yield compressed
+    yield compressor.flush()
+
+
+def export_events(queryset, export_format="ndjson", compress=False, chunk_size=None, archive=None, occurrences=None):
+    """Yield bytes of exported events, archived events and occurrences in the given format, maybe gzip compressed."""
+    encode = iter_csv if export_format == "csv" else iter_ndjson
+    chunks = iter_bytes(encode(iter_rows(queryset, chunk_size, archive, occurrences)))
+    return iter_gzip(chunks) if compress else chunks
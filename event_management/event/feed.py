@@ -0,0 +1,229 @@
+"""The module includes the change feed of created events.
+
+Created events are appended, already represented, to a feed in a separate SQLite file
+when their transaction commits. The file has a single writer at a time, so sequence
+numbers follow commit order and a subscriber that reconnects with the last sequence
+number it received resumes without gaps. The feed keeps the last EVENT_FEED["MAX_ROWS"]
+events.
+
+Every event loop serving subscribers runs one FeedHub. The hub reads new rows once and
+fans them out to the queues of all matching subscribers, so N subscribers cost one read
+per batch instead of N queries. Appends made by this process wake the hub at once,
+appends of other processes are picked up every EVENT_FEED["POLL_INTERVAL"] seconds.
+"""
+
+import asyncio
+import json
+import sqlite3
+import threading
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import prefetch_related_objects
+
+from .serializers import FastEventSerializer
+
+
+class ChangeFeed:
+    """Append-only feed of represented events stored in a SQLite file.
+
+    Attributes:
+        path (str): Path of the feed database file
+        max_rows (int): Number of latest events kept
+    """
+
+    def __init__(self, path, max_rows):
+        """Create the feed file and table if they don't exist."""
+        self.path = str(path)
+        self.max_rows = max_rows
+        self._local = threading.local()
+        with self.connection:
+            self.connection.execute(
+                "CREATE TABLE IF NOT EXISTS feed_event (seq INTEGER PRIMARY KEY AUTOINCREMENT, "
+                "user TEXT NOT NULL, event_type TEXT NOT NULL, payload TEXT NOT NULL)"
+            )
+
+    @property
+    def connection(self):
+        """sqlite3.Connection: Returns connection of the current thread."""
+        connection = getattr(self._local, "connection", None)
+        if connection is None:
+            connection = sqlite3.connect(self.path, timeout=30)
+            connection.execute("PRAGMA journal_mode=WAL")
+            # The feed can be rebuilt from the events, a lost last commit on power failure is acceptable
+            connection.execute("PRAGMA synchronous=NORMAL")
+            self._local.connection = connection
+        return connection
+
+    def append_many(self, items):
+        """int: Returns sequence number of the last of the represented events appended in one transaction."""
+        with self.connection:
+            self.connection.executemany(
+                "INSERT INTO feed_event (user, event_type, payload) VALUES (?, ?, ?)",
+                [(item["user"], item["event_type"], json.dumps(item)) for item in items],
+            )
+            last_seq = self.last_seq()
+            self.connection.execute("DELETE FROM feed_event WHERE seq <= ?", (last_seq - self.max_rows,))
+        return last_seq
+
+    def read(self, after, limit, until=None):
+        """list: Returns up to limit ``(seq, user, event_type, payload)`` rows after the sequence number."""
+        if until is None:
+            return self.connection.execute(
+                "SELECT seq, user, event_type, payload FROM feed_event WHERE seq > ? ORDER BY seq LIMIT ?",
+                (after, limit),
+            ).fetchall()
+        return self.connection.execute(
+            "SELECT seq, user, event_type, payload FROM feed_event WHERE seq > ? AND seq <= ? ORDER BY seq LIMIT ?",
+            (after, until, limit),
+        ).fetchall()
+
+    def last_seq(self):
+        """int: Returns sequence number of the last appended event, 0 for an empty feed."""
+        row = self.connection.execute("SELECT seq FROM sqlite_sequence WHERE name = 'feed_event'").fetchone()
+        return row[0] if row else 0
+
+
+_feeds = {}
+_feeds_lock = threading.Lock()
+
+
+def get_change_feed():
+    """ChangeFeed: Returns the feed configured by EVENT_FEED setting."""
+    options = settings.EVENT_FEED
+    path = str(options["PATH"])
+    with _feeds_lock:
+        if path not in _feeds:
+            _feeds[path] = ChangeFeed(path, options["MAX_ROWS"])
+        return _feeds[path]
+
+
+def publish_events(events, using="default"):
+    """Append created events to the change feed when the transaction commits.
+
+    Users and event types that aren't loaded yet, e.g. of events flushed by the write-behind
+    buffer with only ``user_id``, are loaded with one query each for all events.
+    """
+    if not settings.EVENT_FEED["ENABLED"] or not events:
+        return
+    prefetch_related_objects(events, "user", "event_type")
+    serializer = FastEventSerializer()
+    items = [serializer.to_representation(event) for event in events]
+
+    def append():
+        get_change_feed().append_many(items)
+        FeedHub.notify_all()
+
+    transaction.on_commit(append, using)
+
+
+class Subscription:
+    """Queue of feed rows matching the filters of one subscriber.
+
+    Attributes:
+        user (str): Username to filter by, all users when empty
+        event_type (str): Event type name to filter by, all event types when empty
+        position (int): Sequence number after which the hub delivers rows
+        overflowed (bool): The subscriber fell behind by more than the queue size
+    """
+
+    def __init__(self, user=None, event_type=None, position=0):
+        """Create subscription with a bounded queue."""
+        self.user = user
+        self.event_type = event_type
+        self.position = position
+        self.overflowed = False
+        self.queue = asyncio.Queue(settings.EVENT_FEED["QUEUE_SIZE"])
+
+    def matches(self, user, event_type):
+        """bool: Returns whether a row of the user and event type passes the filters."""
+        return (not self.user or user == self.user) and (not self.event_type or event_type == self.event_type)
+
+    def deliver(self, row):
+        """Queue a row, marking the subscription overflowed when its queue is full."""
+        try:
+            self.queue.put_nowait(row)
+        except asyncio.QueueFull:
+            self.overflowed = True
+
+
+class FeedHub:
+    """Reads the change feed once for all subscribers of an event loop.
+
+    Attributes:
+        feed (ChangeFeed): Feed to read
+        position (int): Sequence number of the last row read
+        subscriptions (set): Active subscriptions
+        reads (int): Number of reads of the feed
+    """
+
+    _hubs = {}
+    _hubs_lock = threading.Lock()
+
+    def __init__(self, feed, loop):
+        """Create hub of the event loop."""
+        self.feed = feed
+        self.loop = loop
+        self.position = None
+        self.subscriptions = set()
+        self.reads = 0
+        self.wake = asyncio.Event()
+        self._task = None
+
+    @classmethod
+    def get(cls):
+        """FeedHub: Returns hub of the running event loop."""
+        loop = asyncio.get_running_loop()
+        with cls._hubs_lock:
+            for hub_loop in [hub_loop for hub_loop in cls._hubs if hub_loop.is_closed()]:
+                del cls._hubs[hub_loop]
+            if loop not in cls._hubs:
+                cls._hubs[loop] = cls(get_change_feed(), loop)
+            return cls._hubs[loop]
+
+    @classmethod
+    def notify_all(cls):
+        """Wake the hubs of all event loops of this process, from any thread."""
+        with cls._hubs_lock:
+            hubs = list(cls._hubs.values())
+        for hub in hubs:
+            try:
+                hub.loop.call_soon_threadsafe(hub.wake.set)
+            except RuntimeError:
+                # The event loop was closed, the hub is dropped by the next get()
+                pass
+
+    async def subscribe(self, user=None, event_type=None):
+        """Subscription: Returns subscription receiving rows appended from now on."""
+        if self.position is None:
+            self.position = await asyncio.to_thread(self.feed.last_seq)
+        subscription = Subscription(user, event_type, self.position)
+        self.subscriptions.add(subscription)
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self.run())
+        return subscription
+
+    def unsubscribe(self, subscription):
+        """Stop delivering rows to the subscription."""
+        self.subscriptions.discard(subscription)
+
+    async def run(self):
+        """Read new rows and deliver them while there are subscriptions."""
+        options = settings.EVENT_FEED
+        while self.subscriptions:
+            self.wake.clear()
+            rows = await asyncio.to_thread(self.feed.read, self.position, options["BATCH_SIZE"])
+            self.reads += 1
+            for row in rows:
+                for subscription in self.subscriptions:
+                    if subscription.matches(row[1], row[2]):
+                        subscription.deliver(row)
+            if rows:
+                self.position = rows[-1][0]
+            if len(rows) < options["BATCH_SIZE"]:
+                try:
+                    await asyncio.wait_for(self.wake.wait(), options["POLL_INTERVAL"])
+                except asyncio.TimeoutError:
+                    pass
+        # The next subscription starts from the end of the feed again
+        self.position = None
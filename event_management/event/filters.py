@@ -0,0 +1,69 @@
+"""The module includes filters for Event querysets."""
+
+from datetime import timedelta
+
+from django.conf import settings
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+
+from rest_framework.exceptions import ValidationError
+
+from .info_indexes import filter_info
+from .recurrence import expand_series
+
+
+def parse_timestamp(name, value):
+    """datetime: Returns aware datetime parsed from a query parameter."""
+    try:
+        parsed = parse_datetime(value)
+    except ValueError:
+        parsed = None
+    if parsed is None:
+        raise ValidationError({name: ["Enter a valid datetime."]})
+    if timezone.is_naive(parsed):
+        parsed = timezone.make_aware(parsed)
+    return parsed
+
+
+def requested_window(params):
+    """tuple: Returns ``(after, before)`` of the range parameters, before capped by the recurrence horizon.
+
+    Unbounded recurring events are expanded only up to EVENT_RECURRENCE_HORIZON_DAYS from now.
+    """
+    after = parse_timestamp("timestamp_after", params["timestamp_after"]) if params.get("timestamp_after") else None
+    horizon = timezone.now() + timedelta(days=settings.EVENT_RECURRENCE_HORIZON_DAYS)
+    if not params.get("timestamp_before"):
+        return after, horizon
+    return after, min(parse_timestamp("timestamp_before", params["timestamp_before"]), horizon)
+
+
+def filter_events(queryset, params, time_range=True):
+    """QuerySet: Returns events filtered by query parameters.
+
+    Args:
+        queryset (QuerySet): Events to filter
+        params (dict): May contain ``user`` (username), ``event_type`` (name),
+            ``timestamp_after`` and ``timestamp_before`` (ISO 8601 datetimes)
+            and ``info__<key>`` for keys listed in EVENT_INFO_INDEXED_KEYS
+        time_range (bool): Filter by timestamp range, series are filtered by their occurrences instead
+    """
+    if params.get("user"):
+        queryset = queryset.filter(user__username=params["user"])
+    if params.get("event_type"):
+        queryset = queryset.filter(event_type__name=params["event_type"])
+    if time_range and params.get("timestamp_after"):
+        queryset = queryset.filter(timestamp__gte=parse_timestamp("timestamp_after", params["timestamp_after"]))
+    if time_range and params.get("timestamp_before"):
+        queryset = queryset.filter(timestamp__lt=parse_timestamp("timestamp_before", params["timestamp_before"]))
+    return filter_info(queryset, params)
+
+
+def filter_occurrences(queryset, params, position=None):
+    """iterator: Returns occurrences of recurring events filtered by query parameters in ``(timestamp, id)`` order.
+
+    Args:
+        queryset (QuerySet): Events whose series are expanded
+        params (dict): Query parameters accepted by filter_events
+        position (tuple): Keyset ``(timestamp, id)``, only occurrences sorting after it are returned
+    """
+    return expand_series(filter_events(queryset, params, time_range=False), *requested_window(params), position)
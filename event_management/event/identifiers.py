@@ -0,0 +1,41 @@
+"""Generators of identifiers for EventManagement project."""
+
+import os
+import time
+import uuid
+
+
+def uuid7(timestamp=None):
+    """uuid.UUID: Returns time-ordered UUID (version 7 layout).
+
+    The 48 most significant bits hold Unix time in milliseconds and the next 12 bits the
+    fraction of the millisecond, the rest is random. New ids therefore sort after older
+    ones and inserts append to the right edge of the primary key index instead of
+    landing on random pages.
+
+    Args:
+        timestamp (datetime): Time to encode, current time by default
+    """
+    if timestamp is None:
+        nanoseconds = time.time_ns()
+    else:
+        nanoseconds = int(timestamp.timestamp()) * 1_000_000_000 + timestamp.microsecond * 1000
+    milliseconds, fraction = divmod(nanoseconds, 1_000_000)
+    random_bits = int.from_bytes(os.urandom(8), "big")
+    value = (
+        (milliseconds & 0xFFFF_FFFF_FFFF) << 80
+        | 0x7 << 76
+        | (fraction * 4096 // 1_000_000) << 64
+        | 0b10 << 62
+        | random_bits & 0x3FFF_FFFF_FFFF_FFFF
+    )
+    return uuid.UUID(int=value)
+
+
+def uuid7_floor(timestamp):
+    """uuid.UUID: Returns the smallest time-ordered UUID of the given time.
+
+    Every id generated by uuid7 at or after timestamp sorts at or after it, so it bounds
+    a primary key range seek on events created since then.
+    """
+    return uuid.UUID(int=uuid7(timestamp).int >> 64 << 64)
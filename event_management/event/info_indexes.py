@@ -0,0 +1,133 @@
+"""The module includes expression indexes on hot keys of Event.info.
+
+Keys listed in EVENT_INFO_INDEXED_KEYS get an index on ``info ->> key`` (``json_extract``
+cast to text on SQLite). Index and filter are built from the same InfoKeyText expression, so the SQL
+of a filter matches the indexed expression exactly and the planner can use the index.
+
+Events whose info is packed with a schema keep the indexed keys in the ``info`` column,
+sync_info_indexes copies newly indexed keys there from the packed info.
+"""
+
+import hashlib
+import re
+
+from django.conf import settings
+from django.db import connections, models, transaction
+from django.db.models import F, Func
+
+from rest_framework.exceptions import ValidationError
+
+from .info_schemas import project_info
+from .models import Event
+from .search import index_packed_events
+
+INDEX_PREFIX = "event_info_"
+
+# Names of the indexes sync_info_indexes manages, with the 8 character digest of earlier
+# releases, other indexes with the prefix such as the search index are left alone
+INDEX_NAME_PATTERN = re.compile(rf"{INDEX_PREFIX}\w*_[0-9a-f]{{6}}(?:[0-9a-f]{{2}})?")
+
+KEY_PATTERN = re.compile(r"\w+")
+
+
+class InfoKeyText(Func):
+    """Expression extracting a top-level key of Event.info as text.
+
+    The key is inlined as a literal because SQLite matches expression indexes only
+    against identical SQL, which a bound parameter is not. Keys are therefore
+    restricted to word characters.
+    """
+
+    output_field = models.TextField()
+
+    def __init__(self, key, **extra):
+        """Create expression for key."""
+        if not KEY_PATTERN.fullmatch(key):
+            raise ValueError(f"Info key {key!r} must contain only word characters.")
+        self.key = key
+        super().__init__(F("info"), **extra)
+
+    def as_sql(self, compiler, connection, **extra_context):
+        """Compile to the ``->>`` operator of PostgreSQL and MySQL."""
+        sql, params = compiler.compile(self.source_expressions[0])
+        return f"({sql} ->> '{self.key}')", params
+
+    def as_sqlite(self, compiler, connection, **extra_context):
+        """Compile to ``json_extract`` of SQLite cast to text, as ``->>`` returns numbers as text too."""
+        sql, params = compiler.compile(self.source_expressions[0])
+        return f"CAST(JSON_EXTRACT({sql}, '$.{self.key}') AS TEXT)", params
+
+
+def info_index_name(key):
+    """str: Returns index name of key, at most 30 characters long like the names Django checks."""
+    slug = re.sub(r"\W", "_", key.lower())[:12]
+    # The digest changed with the expression, sync_info_indexes replaces indexes of the untyped json_extract
+    digest = hashlib.md5(f"{key}:text".encode()).hexdigest()[:6]
+    return f"{INDEX_PREFIX}{slug}_{digest}"
+
+
+def info_indexes():
+    """list: Returns indexes declared by EVENT_INFO_INDEXED_KEYS setting."""
+    return [
+        models.Index(InfoKeyText(key), name=info_index_name(key)) for key in settings.EVENT_INFO_INDEXED_KEYS
+    ]
+
+
+def sync_info_indexes(using="default", dry_run=False):
+    """tuple: Returns names of created and dropped indexes after syncing them with the setting."""
+    connection = connections[using]
+    with connection.cursor() as cursor:
+        existing = {
+            name for name in connection.introspection.get_constraints(cursor, Event._meta.db_table)
+            if INDEX_NAME_PATTERN.fullmatch(name)
+        }
+    declared = {index.name: index for index in info_indexes()}
+    created = sorted(declared.keys() - existing)
+    dropped = sorted(existing - declared.keys())
+    if not dry_run and (created or dropped):
+        with connection.schema_editor() as schema_editor:
+            for name in created:
+                schema_editor.add_index(Event, declared[name])
+            for name in dropped:
+                schema_editor.remove_index(Event, models.Index(fields=["info"], name=name))
+        if created:
+            refresh_info_projections(using)
+    return created, dropped
+
+
+def refresh_info_projections(using="default", batch_size=1000):
+    """int: Returns number of packed events whose indexed keys were copied to the info column again."""
+    connection = connections[using]
+    info_field, pk_field = Event._meta.get_field("info"), Event._meta.pk
+    sql = f"UPDATE {Event._meta.db_table} SET {info_field.column} = %s WHERE {pk_field.column} = %s"
+    queryset = Event.objects.using(using).filter(info_packed__isnull=False).order_by("pk")
+    refreshed, batch = 0, list(queryset[:batch_size])
+    while batch:
+        params = [
+            (
+                info_field.get_db_prep_save(project_info(event.info, settings.EVENT_INFO_INDEXED_KEYS), connection),
+                pk_field.get_db_prep_value(event.pk, connection),
+            )
+            for event in batch
+        ]
+        with transaction.atomic(using=using), connection.cursor() as cursor:
+            cursor.executemany(sql, params)
+            # The update trigger of the search index only sees the projection
+            index_packed_events(batch, using)
+        refreshed += len(batch)
+        batch = list(queryset.filter(pk__gt=batch[-1].pk)[:batch_size])
+    return refreshed
+
+
+def filter_info(queryset, params):
+    """QuerySet: Returns events filtered by ``info__<key>`` parameters of indexed keys."""
+    for param, value in params.items():
+        if not param.startswith("info__"):
+            continue
+        key = param[len("info__"):]
+        if key not in settings.EVENT_INFO_INDEXED_KEYS:
+            keys = ", ".join(settings.EVENT_INFO_INDEXED_KEYS)
+            raise ValidationError({param: [f"Filtering is allowed only by indexed info keys: {keys}."]})
+        alias = f"info_{info_index_name(key)}"
+        queryset = queryset.alias(**{alias: InfoKeyText(key)}).filter(**{alias: value})
+    return queryset
@@ -0,0 +1,130 @@
+"""The module includes compact storage of Event.info with schemas of event types.
+
+An event type may have an active EventInfoSchema, an ordered list of the keys of its
+info payloads and their types. The serializers validate payloads of the event type
+against it once, when they are written, and the payloads are stored packed in
+``Event.info_packed`` instead of the JSON ``info`` column: only the values, in the order
+of the schema, as a JSON array that is compressed with zlib when it is longer than
+EVENT_INFO_COMPRESS_THRESHOLD bytes. Keys aren't repeated in every row, so a packed
+payload takes a fraction of the JSON text. Events are loaded with their info unpacked,
+so ``event.info`` and the serializers don't depend on how it is stored.
+
+Schemas are never changed, a new version is added instead, and every packed event keeps
+the version it was packed with. Payloads with keys the schema doesn't list, written by a
+path that doesn't validate them, are stored as JSON.
+
+The ``info`` column of a packed event keeps a projection of the keys listed in
+EVENT_INFO_INDEXED_KEYS, so ``info__<key>`` filters and their expression indexes find
+packed events too, and the search index gets the words of packed info from Python, see
+``event.search.index_packed_events``. Other lookups into info, ``values("info")`` and raw
+SQL see only that projection of packed events, EventQuerySet refuses such filters. Only
+SQLite packs info: on PostgreSQL the search index is an expression over the ``info``
+column and other databases search by scanning it, so info is always stored as JSON there.
+"""
+
+import functools
+import math
+import zlib
+
+from django.core.exceptions import ValidationError
+
+import orjson
+
+FIELD_TYPES = ("string", "integer", "number", "boolean", "object", "array", "any")
+
+# First byte of packed info, the rest is the JSON array of values, compressed or not
+PLAIN = b"\x00"
+COMPRESSED = b"\x01"
+
+
+def validate_schema_fields(fields):
+    """Schema fields should be a list of ``{"name", "type", "required"}`` objects with unique names."""
+    if not isinstance(fields, list) or not fields:
+        raise ValidationError("Schema fields should be a non-empty list.")
+    names = set()
+    for field in fields:
+        if not isinstance(field, dict) or not isinstance(field.get("name"), str) or not field["name"]:
+            raise ValidationError("Every schema field should be an object with a name.")
+        if set(field) - {"name", "type", "required"}:
+            raise ValidationError(f"Schema field {field['name']!r} may only have name, type and required.")
+        if field.get("type", "any") not in FIELD_TYPES:
+            raise ValidationError(f"Type of schema field {field['name']!r} should be one of: {', '.join(FIELD_TYPES)}.")
+        if not isinstance(field.get("required", True), bool):
+            raise ValidationError(f"Required of schema field {field['name']!r} should be a boolean.")
+        if field["name"] in names:
+            raise ValidationError(f"Schema field {field['name']!r} is listed twice.")
+        names.add(field["name"])
+
+
+def has_type(value, field_type):
+    """bool: Returns whether a JSON value has the type of a schema field."""
+    if field_type == "any":
+        return True
+    if field_type == "string":
+        return isinstance(value, str)
+    if field_type in ("integer", "number") and not isinstance(value, bool):
+        if isinstance(value, int):
+            return True
+        return field_type == "number" and isinstance(value, float) and math.isfinite(value)
+    return isinstance(value, {"boolean": bool, "object": dict, "array": list}.get(field_type, ()))
+
+
+def info_errors(fields, info):
+    """list: Returns reasons why info doesn't conform to the schema fields, empty when it does."""
+    if not isinstance(info, dict):
+        return ["Info should be an object."]
+    errors = [f"Key {key!r} isn't in the info schema." for key in info.keys() - {field["name"] for field in fields}]
+    for field in fields:
+        if field["name"] not in info:
+            if field.get("required", True):
+                errors.append(f"Key {field['name']!r} is required.")
+        elif not has_type(info[field["name"]], field.get("type", "any")):
+            errors.append(f"Key {field['name']!r} should be of type {field['type']}.")
+    return errors
+
+
+@functools.lru_cache(maxsize=1024)
+def name_set(names):
+    """frozenset: Returns names of the schema fields as a set."""
+    return frozenset(names)
+
+
+@functools.lru_cache(maxsize=4096)
+def present_names(names, mask):
+    """tuple: Returns names of the schema fields that aren't marked missing in the mask."""
+    return tuple(name for index, name in enumerate(names) if not mask >> index & 1)
+
+
+def pack_info(names, info, threshold):
+    """bytes: Returns info packed by the schema field names, None when it has other keys.
+
+    The array holds the values of the fields present in info, in the order of the
+    schema, followed by a mask of the missing fields, bit i for field i.
+    """
+    if not isinstance(info, dict) or not info.keys() <= name_set(names):
+        return None
+    mask = 0 if len(info) == len(names) else sum(1 << index for index, name in enumerate(names) if name not in info)
+    try:
+        data = orjson.dumps([*[info[name] for name in present_names(names, mask)], mask])
+    except orjson.JSONEncodeError:
+        # e.g. integers wider than 64 bits, the JSON column keeps them
+        return None
+    if len(data) > threshold:
+        compressed = zlib.compress(data)
+        if len(compressed) < len(data):
+            return COMPRESSED + compressed
+    return PLAIN + data
+
+
+def unpack_info(names, packed):
+    """dict: Returns info unpacked by the schema field names it was packed with."""
+    packed = memoryview(packed)
+    values = orjson.loads(zlib.decompress(packed[1:]) if packed[:1] == COMPRESSED else packed[1:])
+    mask = values.pop()
+    return dict(zip(present_names(names, mask), values))
+
+
+def project_info(info, keys):
+    """dict: Returns the keys of info that are filtered by, None when it has none of them."""
+    projection = {key: info[key] for key in keys if key in info}
+    return projection or None
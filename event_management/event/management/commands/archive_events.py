@@ -0,0 +1,31 @@
+"""Command for moving past events to the archive table."""
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from rest_framework.exceptions import ValidationError
+
+from event.archive import archive_events
+from event.filters import parse_timestamp
+
+
+class Command(BaseCommand):
+    """Move events older than the archive cutoff out of the Event table in batches."""
+
+    help = "Move events older than EVENT_ARCHIVE_AFTER_DAYS to the archive table."  # noqa: A003
+
+    def add_arguments(self, parser):
+        """Add archive options."""
+        parser.add_argument("--before", help="Archive events before this datetime, at most the archive cutoff")
+        parser.add_argument("--batch-size", type=int, default=settings.EVENT_ARCHIVE_BATCH_SIZE)
+        parser.add_argument("--database", default="default")
+        parser.add_argument("--dry-run", action="store_true", help="Only count events to archive")
+
+    def handle(self, *args, **options):
+        """Archive events."""
+        try:
+            before = parse_timestamp("before", options["before"]) if options["before"] else None
+        except ValidationError as exc:
+            raise CommandError(exc.detail)
+        count = archive_events(before, options["batch_size"], options["database"], options["dry_run"])
+        self.stdout.write(f"Events {'to archive' if options['dry_run'] else 'archived'}: {count}")
@@ -0,0 +1,59 @@
+"""Command for exporting events as NDJSON or CSV."""
+
+import sys
+
+from django.core.management.base import BaseCommand, CommandError
+
+from rest_framework.exceptions import ValidationError
+
+from event.archive import archived_events
+from event.export import EXPORT_FORMATS, export_events
+from event.filters import filter_events, filter_occurrences
+from event.models import ArchivedEvent, Event
+
+
+class Command(BaseCommand):
+    """Stream events to a file or stdout with constant memory use."""
+
+    help = "Export events as NDJSON or CSV, optionally gzip compressed."  # noqa: A003
+
+    def add_arguments(self, parser):
+        """Add export options."""
+        parser.add_argument("--format", choices=EXPORT_FORMATS, default="ndjson", dest="export_format")
+        parser.add_argument("--gzip", action="store_true", help="Compress output with gzip")
+        parser.add_argument("--output", help="File to write to, stdout by default")
+        parser.add_argument("--user", help="Username to filter by")
+        parser.add_argument("--event-type", help="Event type name to filter by")
+        parser.add_argument("--after", help="Export events with timestamp at or after this datetime")
+        parser.add_argument("--before", help="Export events with timestamp before this datetime")
+        parser.add_argument(
+            "--info", action="append", default=[], metavar="KEY=VALUE", help="Indexed info key to filter by"
+        )
+        parser.add_argument("--chunk-size", type=int, help="Rows fetched from the database at once")
+
+    def handle(self, *args, **options):
+        """Write exported events."""
+        params = {
+            "user": options["user"],
+            "event_type": options["event_type"],
+            "timestamp_after": options["after"],
+            "timestamp_before": options["before"],
+            **{f"info__{key}": value for key, _, value in (item.partition("=") for item in options["info"])},
+        }
+        try:
+            queryset = filter_events(Event.objects.filter(recurrence=""), params)
+            archive = archived_events(ArchivedEvent.objects.all(), params)
+            occurrences = filter_occurrences(Event.objects.select_related("user", "event_type"), params)
+        except ValidationError as exc:
+            raise CommandError(exc.detail)
+        chunks = export_events(
+            queryset, options["export_format"], options["gzip"], options["chunk_size"], archive, occurrences
+        )
+
+        output = open(options["output"], "wb") if options["output"] else sys.stdout.buffer
+        try:
+            for chunk in chunks:
+                output.write(chunk)
+        finally:
+            if options["output"]:
+                output.close()
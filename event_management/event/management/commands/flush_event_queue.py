@@ -0,0 +1,31 @@
+"""Command for committing events queued in write-behind mode."""
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from event.write_behind import EventQueueFlusher, get_event_queue
+
+
+class Command(BaseCommand):
+    """Run the write-behind flusher until interrupted or drain the queue once."""
+
+    help = "Commit events queued by write-behind mode in batches."  # noqa: A003
+
+    def add_arguments(self, parser):
+        """Add flusher options."""
+        parser.add_argument("--batch-size", type=int, default=settings.EVENT_QUEUE_BATCH_SIZE)
+        parser.add_argument("--interval-ms", type=int, default=settings.EVENT_QUEUE_FLUSH_INTERVAL_MS)
+        parser.add_argument("--once", action="store_true", help="Drain the queue and exit")
+
+    def handle(self, *args, **options):
+        """Flush queued events."""
+        flusher = EventQueueFlusher(get_event_queue(), options["batch_size"])
+        self.stdout.write(f"Queue depth on start: {flusher.queue.depth()}")
+        try:
+            if options["once"]:
+                flusher.flush()
+            else:
+                flusher.run(options["interval_ms"])
+        except KeyboardInterrupt:
+            pass
+        self.stdout.write(str(flusher.stats()))
@@ -0,0 +1,40 @@
+"""Command for rendering the OpenAPI schema and docs pages into static files."""
+
+import os
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.test import RequestFactory
+
+from drf_yasg.codecs import OpenAPICodecJson, OpenAPICodecYaml
+from drf_yasg.generators import OpenAPISchemaGenerator
+from drf_yasg.renderers import ReDocRenderer, SwaggerUIRenderer
+
+from event_management.yasg import api_info
+
+
+class Command(BaseCommand):
+    """Generate the schema once instead of walking all URLs and serializers on every docs request."""
+
+    help = "Render swagger.json, swagger.yaml and the Swagger UI and ReDoc pages into API_DOCS_ROOT."  # noqa: A003
+
+    def add_arguments(self, parser):
+        """Add output option."""
+        parser.add_argument("--output", default=settings.API_DOCS_ROOT, help="Directory to write files to")
+
+    def handle(self, *args, **options):
+        """Write schema and docs pages."""
+        schema = OpenAPISchemaGenerator(api_info).get_schema(request=None, public=True)
+        request = RequestFactory().get("/")
+        files = {
+            "swagger.json": OpenAPICodecJson(validators=[]).encode(schema),
+            "swagger.yaml": OpenAPICodecYaml(validators=[]).encode(schema),
+            "index.html": SwaggerUIRenderer().render(schema, renderer_context={"request": request}).encode(),
+            "redoc/index.html": ReDocRenderer().render(schema, renderer_context={"request": request}).encode(),
+        }
+        for name, content in files.items():
+            path = os.path.join(options["output"], name)
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            with open(path, "wb") as output:
+                output.write(content)
+            self.stdout.write(f"Wrote {path}")
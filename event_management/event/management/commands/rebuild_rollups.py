@@ -0,0 +1,31 @@
+"""Command for rebuilding event rollups from events."""
+
+from django.core.management.base import BaseCommand, CommandError
+
+from rest_framework.exceptions import ValidationError
+
+from event.filters import parse_timestamp
+from event.rollups import reconcile_rollups
+
+
+class Command(BaseCommand):
+    """Backfill event rollups and fix counts that drifted from the Event table."""
+
+    help = "Recompute event rollups from events and fix the rows that differ."  # noqa: A003
+
+    def add_arguments(self, parser):
+        """Add rebuild options."""
+        parser.add_argument("--since", help="Only rebuild buckets from the start of this datetime's day")
+        parser.add_argument("--database", default="default")
+        parser.add_argument("--dry-run", action="store_true", help="Only count rows that differ")
+
+    def handle(self, *args, **options):
+        """Rebuild rollups."""
+        try:
+            since = parse_timestamp("since", options["since"]) if options["since"] else None
+        except ValidationError as exc:
+            raise CommandError(exc.detail)
+        result = reconcile_rollups(since, options["database"], options["dry_run"])
+        self.stdout.write(
+            f"Rollup rows created: {result['created']}, updated: {result['updated']}, deleted: {result['deleted']}"
+        )
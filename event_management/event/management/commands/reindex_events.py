@@ -0,0 +1,21 @@
+"""Command for rebuilding the full-text index of Event.info."""
+
+from django.core.management.base import BaseCommand
+
+from event.search import rebuild_search_index
+
+
+class Command(BaseCommand):
+    """Index the info of all events again, in batches on SQLite."""
+
+    help = "Rebuild the full-text search index of event info."  # noqa: A003
+
+    def add_arguments(self, parser):
+        """Add reindex options."""
+        parser.add_argument("--database", default="default")
+        parser.add_argument("--batch-size", type=int, help="Events indexed in one transaction")
+
+    def handle(self, *args, **options):
+        """Rebuild the index."""
+        indexed = rebuild_search_index(options["batch_size"], options["database"])
+        self.stdout.write(f"Indexed {indexed} events.")
@@ -0,0 +1,41 @@
+"""Command for firing handlers of due events."""
+
+from django.core.management.base import BaseCommand, CommandError
+
+from event.dispatcher import EventDispatcher, LeaseLostError
+
+
+class Command(BaseCommand):
+    """Run the due-event dispatcher of one shard until interrupted or for one tick."""
+
+    help = (  # noqa: A003
+        "Call EVENT_DISPATCHER handlers with events when their time arrives. "
+        "Run one process per shard, all with the same --shards."
+    )
+
+    def add_arguments(self, parser):
+        """Add dispatcher options."""
+        parser.add_argument("--shard", type=int, default=0, help="Shard of events to fire, 0 by default")
+        parser.add_argument("--shards", type=int, default=1, help="Number of shards events are split into")
+        parser.add_argument("--once", action="store_true", help="Fire events that are due now and exit")
+
+    def handle(self, *args, **options):
+        """Dispatch due events."""
+        try:
+            dispatcher = EventDispatcher(shard=options["shard"], shards=options["shards"])
+        except ValueError as exc:
+            raise CommandError(exc)
+        try:
+            if options["once"]:
+                dispatcher.acquire()
+                try:
+                    dispatcher.tick()
+                finally:
+                    dispatcher.release()
+            else:
+                dispatcher.run()
+        except LeaseLostError as exc:
+            raise CommandError(exc)
+        except KeyboardInterrupt:
+            pass
+        self.stdout.write(str(dispatcher.stats()))
@@ -0,0 +1,26 @@
+"""Command for syncing indexes on Event.info keys with EVENT_INFO_INDEXED_KEYS."""
+
+from django.core.management.base import BaseCommand
+
+from event.info_indexes import sync_info_indexes
+
+
+class Command(BaseCommand):
+    """Create indexes of newly declared keys and drop indexes of removed ones."""
+
+    help = "Sync expression indexes on Event.info keys with EVENT_INFO_INDEXED_KEYS."  # noqa: A003
+
+    def add_arguments(self, parser):
+        """Add sync options."""
+        parser.add_argument("--database", default="default")
+        parser.add_argument("--dry-run", action="store_true", help="Only show what would change")
+
+    def handle(self, *args, **options):
+        """Sync indexes."""
+        created, dropped = sync_info_indexes(options["database"], options["dry_run"])
+        for name in created:
+            self.stdout.write(f"Create index {name}")
+        for name in dropped:
+            self.stdout.write(f"Drop index {name}")
+        if not created and not dropped:
+            self.stdout.write("Indexes are up to date.")
@@ -0,0 +1,45 @@
+# Generated by Django 4.1.6 on 2026-10-18 03:54
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+import event.validators
+import uuid
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='EventType',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('name', models.CharField(help_text='This field is required', max_length=256, unique=True, verbose_name='Name')),
+            ],
+            options={
+                'verbose_name_plural': 'Event Types',
+                'ordering': ['id'],
+            },
+        ),
+        migrations.CreateModel(
+            name='Event',
+            fields=[
+                ('id', models.UUIDField(default=uuid.uuid4, editable=False, primary_key=True, serialize=False, verbose_name='UUID')),
+                ('info', models.JSONField(help_text='This field is required', verbose_name='Event info')),
+                ('timestamp', models.DateTimeField(help_text='This field is required', validators=[event.validators.validate_datetime_is_future], verbose_name='Event datetime')),
+                ('created_at', models.DateTimeField(auto_now_add=True, verbose_name='Created at')),
+                ('event_type', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='events', to='event.eventtype', verbose_name='Event Type')),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='events', to=settings.AUTH_USER_MODEL, verbose_name='User')),
+            ],
+            options={
+                'verbose_name_plural': 'Events',
+                'ordering': ['id'],
+            },
+        ),
+    ]
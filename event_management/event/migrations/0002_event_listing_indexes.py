@@ -0,0 +1,25 @@
+# Generated by Django 4.1.6 on 2026-10-18 03:54
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('event', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='event',
+            index=models.Index(fields=['timestamp', 'id'], name='event_timestamp_id_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='event',
+            index=models.Index(fields=['user', 'timestamp', 'id'], name='event_user_timestamp_id_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='event',
+            index=models.Index(fields=['event_type', 'timestamp', 'id'], name='event_type_timestamp_id_idx'),
+        ),
+    ]
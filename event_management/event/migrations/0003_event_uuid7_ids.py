@@ -0,0 +1,45 @@
+# Generated by Django 4.1.6 on 2026-10-18 03:55
+
+from django.db import migrations, models, transaction
+import event.identifiers
+
+BATCH_SIZE = 1000
+
+
+def rewrite_random_ids(apps, schema_editor):
+    """Replace random uuid4 primary keys with time-ordered ones derived from created_at.
+
+    Rows are walked in primary key batches; rewritten rows get ids that are skipped
+    when the walk reaches them again, so the migration can be re-run after a failure.
+    """
+    Event = apps.get_model("event", "Event")
+    db_alias = schema_editor.connection.alias
+    last_pk = None
+    while True:
+        batch = Event.objects.using(db_alias).order_by("pk")
+        if last_pk is not None:
+            batch = batch.filter(pk__gt=last_pk)
+        rows = list(batch.values_list("pk", "created_at")[:BATCH_SIZE])
+        if not rows:
+            break
+        with transaction.atomic(using=db_alias):
+            for pk, created_at in rows:
+                if pk.version != 7:
+                    Event.objects.using(db_alias).filter(pk=pk).update(id=event.identifiers.uuid7(created_at))
+        last_pk = rows[-1][0]
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('event', '0002_event_listing_indexes'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='event',
+            name='id',
+            field=models.UUIDField(default=event.identifiers.uuid7, editable=False, primary_key=True, serialize=False, verbose_name='UUID'),
+        ),
+        migrations.RunPython(rewrite_random_ids, migrations.RunPython.noop, elidable=True),
+    ]
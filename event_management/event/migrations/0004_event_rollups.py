@@ -0,0 +1,39 @@
+# Generated by Django 4.1.6 on 2026-10-18 04:08
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ('event', '0003_event_uuid7_ids'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='EventRollup',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('period', models.CharField(choices=[('hour', 'Hour'), ('day', 'Day')], max_length=4, verbose_name='Period')),
+                ('bucket', models.DateTimeField(verbose_name='Bucket start')),
+                ('count', models.BigIntegerField(default=0, verbose_name='Count')),
+                ('event_type', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='rollups', to='event.eventtype', verbose_name='Event Type')),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='event_rollups', to=settings.AUTH_USER_MODEL, verbose_name='User')),
+            ],
+            options={
+                'verbose_name_plural': 'Event Rollups',
+                'ordering': ['period', 'bucket'],
+            },
+        ),
+        migrations.AddIndex(
+            model_name='eventrollup',
+            index=models.Index(fields=['user', 'period', 'bucket'], name='event_rollup_user_bucket_idx'),
+        ),
+        migrations.AddConstraint(
+            model_name='eventrollup',
+            constraint=models.UniqueConstraint(fields=('period', 'bucket', 'event_type', 'user'), name='event_rollup_unique_bucket'),
+        ),
+    ]
@@ -0,0 +1,44 @@
+# Generated by Django 4.1.6 on 2026-10-18 04:24
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ('event', '0004_event_rollups'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ArchivedEvent',
+            fields=[
+                ('id', models.UUIDField(editable=False, primary_key=True, serialize=False, verbose_name='UUID')),
+                ('info', models.JSONField(verbose_name='Event info')),
+                ('timestamp', models.DateTimeField(verbose_name='Event datetime')),
+                ('created_at', models.DateTimeField(verbose_name='Created at')),
+                ('archived_at', models.DateTimeField(auto_now_add=True, verbose_name='Archived at')),
+                ('event_type', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='archived_events', to='event.eventtype', verbose_name='Event Type')),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='archived_events', to=settings.AUTH_USER_MODEL, verbose_name='User')),
+            ],
+            options={
+                'verbose_name_plural': 'Archived Events',
+                'ordering': ['id'],
+            },
+        ),
+        migrations.AddIndex(
+            model_name='archivedevent',
+            index=models.Index(fields=['timestamp', 'id'], name='archived_timestamp_id_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='archivedevent',
+            index=models.Index(fields=['user', 'timestamp', 'id'], name='archived_user_timestamp_id_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='archivedevent',
+            index=models.Index(fields=['event_type', 'timestamp', 'id'], name='archived_type_timestamp_id_idx'),
+        ),
+    ]
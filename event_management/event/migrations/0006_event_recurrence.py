@@ -0,0 +1,32 @@
+# Generated by Django 4.1.6 on 2026-10-18 04:35
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('event', '0005_archived_events'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='event',
+            name='recurrence',
+            field=models.CharField(blank=True, default='', help_text='RRULE, e.g. FREQ=WEEKLY;COUNT=52', max_length=512, verbose_name='Recurrence rule'),
+        ),
+        migrations.AddField(
+            model_name='event',
+            name='recurrence_end',
+            field=models.DateTimeField(blank=True, editable=False, null=True, verbose_name='Last occurrence'),
+        ),
+        migrations.AddField(
+            model_name='event',
+            name='recurrence_exceptions',
+            field=models.JSONField(blank=True, default=list, verbose_name='Recurrence exceptions'),
+        ),
+        migrations.AddIndex(
+            model_name='event',
+            index=models.Index(condition=models.Q(('recurrence', ''), _negated=True), fields=['recurrence_end', 'timestamp'], name='event_series_end_idx'),
+        ),
+    ]
@@ -0,0 +1,33 @@
+# Generated by Django 4.1.6 on 2026-10-18 04:41
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('event', '0006_event_recurrence'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='DispatcherCheckpoint',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('shard', models.PositiveIntegerField(verbose_name='Shard')),
+                ('shards', models.PositiveIntegerField(verbose_name='Shards')),
+                ('timestamp', models.DateTimeField(verbose_name='Last fired event datetime')),
+                ('event_id', models.UUIDField(verbose_name='Last fired event UUID')),
+                ('owner', models.CharField(blank=True, max_length=256, verbose_name='Owner')),
+                ('lease_expires', models.DateTimeField(blank=True, null=True, verbose_name='Lease expires')),
+            ],
+            options={
+                'verbose_name_plural': 'Dispatcher Checkpoints',
+                'ordering': ['shards', 'shard'],
+            },
+        ),
+        migrations.AddConstraint(
+            model_name='dispatchercheckpoint',
+            constraint=models.UniqueConstraint(fields=('shard', 'shards'), name='dispatcher_checkpoint_unique_shard'),
+        ),
+    ]
@@ -0,0 +1,59 @@
+# Generated by Django 4.1.6 on 2026-10-18 05:02
+
+from django.db import migrations
+
+# The statements of event.search at the time of this migration, kept here so that later changes don't alter it
+INFO_TEXT_SQL = "(SELECT group_concat(atom, ' ') FROM json_tree({info}) WHERE type IN ('text', 'integer', 'real'))"
+
+SQLITE_CREATE = [
+    "CREATE VIRTUAL TABLE event_event_fts USING fts5(body)",
+    "CREATE TRIGGER event_event_fts_insert AFTER INSERT ON event_event BEGIN "
+    f"INSERT INTO event_event_fts (rowid, body) VALUES (NEW.rowid, {INFO_TEXT_SQL.format(info='NEW.info')}); END",
+    "CREATE TRIGGER event_event_fts_update AFTER UPDATE OF info ON event_event BEGIN "
+    f"INSERT OR REPLACE INTO event_event_fts (rowid, body) VALUES (NEW.rowid, {INFO_TEXT_SQL.format(info='NEW.info')}); "
+    "END",
+    "CREATE TRIGGER event_event_fts_delete AFTER DELETE ON event_event BEGIN "
+    "DELETE FROM event_event_fts WHERE rowid = OLD.rowid; END",
+    f"INSERT INTO event_event_fts (rowid, body) SELECT rowid, {INFO_TEXT_SQL.format(info='info')} FROM event_event",
+]
+
+SQLITE_DROP = [
+    "DROP TRIGGER IF EXISTS event_event_fts_insert",
+    "DROP TRIGGER IF EXISTS event_event_fts_update",
+    "DROP TRIGGER IF EXISTS event_event_fts_delete",
+    "DROP TABLE IF EXISTS event_event_fts",
+]
+
+POSTGRESQL_CREATE = [
+    "CREATE INDEX event_info_search_idx ON event_event "
+    "USING GIN (jsonb_to_tsvector('simple', info, '[\"string\", \"numeric\"]'))",
+]
+
+POSTGRESQL_DROP = ["DROP INDEX IF EXISTS event_info_search_idx"]
+
+
+def run(schema_editor, statements):
+    """Execute the statements of the vendor of the schema editor."""
+    for statement in statements.get(schema_editor.connection.vendor, []):
+        schema_editor.execute(statement)
+
+
+def create_search_index(apps, schema_editor):
+    """Create the full-text index of Event.info and its triggers and fill it."""
+    run(schema_editor, {"sqlite": SQLITE_CREATE, "postgresql": POSTGRESQL_CREATE})
+
+
+def drop_search_index(apps, schema_editor):
+    """Drop the full-text index of Event.info and its triggers."""
+    run(schema_editor, {"sqlite": SQLITE_DROP, "postgresql": POSTGRESQL_DROP})
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('event', '0007_dispatcher_checkpoint'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_search_index, drop_search_index),
+    ]
@@ -0,0 +1,92 @@
+# Generated by Django 4.1.6 on 2026-10-18 06:10
+
+from django.db import migrations, models
+import django.db.models.deletion
+import event.info_schemas
+import event.models
+
+# The statements of event.search at the time of this migration, kept here so that later changes don't alter it
+INFO_TEXT_SQL = "(SELECT group_concat(atom, ' ') FROM json_tree({info}) WHERE type IN ('text', 'integer', 'real'))"
+
+SQLITE_CREATE = [
+    "CREATE VIRTUAL TABLE event_event_fts USING fts5(body)",
+    "CREATE TRIGGER event_event_fts_insert AFTER INSERT ON event_event BEGIN "
+    f"INSERT INTO event_event_fts (rowid, body) VALUES (NEW.rowid, {INFO_TEXT_SQL.format(info='NEW.info')}); END",
+    "CREATE TRIGGER event_event_fts_update AFTER UPDATE OF info ON event_event BEGIN "
+    f"INSERT OR REPLACE INTO event_event_fts (rowid, body) VALUES (NEW.rowid, {INFO_TEXT_SQL.format(info='NEW.info')}); "
+    "END",
+    "CREATE TRIGGER event_event_fts_delete AFTER DELETE ON event_event BEGIN "
+    "DELETE FROM event_event_fts WHERE rowid = OLD.rowid; END",
+    f"INSERT INTO event_event_fts (rowid, body) SELECT rowid, {INFO_TEXT_SQL.format(info='info')} FROM event_event",
+]
+
+SQLITE_DROP = [
+    "DROP TRIGGER IF EXISTS event_event_fts_insert",
+    "DROP TRIGGER IF EXISTS event_event_fts_update",
+    "DROP TRIGGER IF EXISTS event_event_fts_delete",
+    "DROP TABLE IF EXISTS event_event_fts",
+]
+
+
+def drop_sqlite_search_index(apps, schema_editor):
+    """Drop the full-text index triggers of Event.info, SQLite drops them when the table is rebuilt."""
+    if schema_editor.connection.vendor == "sqlite":
+        for statement in SQLITE_DROP:
+            schema_editor.execute(statement)
+
+
+def create_sqlite_search_index(apps, schema_editor):
+    """Create the full-text index of Event.info on the rebuilt table and fill it."""
+    if schema_editor.connection.vendor == "sqlite":
+        for statement in SQLITE_CREATE:
+            schema_editor.execute(statement)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('event', '0008_event_search'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='EventInfoSchema',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('version', models.PositiveIntegerField(verbose_name='Version')),
+                ('fields', models.JSONField(validators=[event.info_schemas.validate_schema_fields], verbose_name='Fields')),
+                ('created_at', models.DateTimeField(auto_now_add=True, verbose_name='Created at')),
+                ('event_type', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='info_schemas', to='event.eventtype', verbose_name='Event Type')),
+            ],
+            options={
+                'verbose_name_plural': 'Event Info Schemas',
+                'ordering': ['event_type', 'version'],
+            },
+        ),
+        migrations.AddConstraint(
+            model_name='eventinfoschema',
+            constraint=models.UniqueConstraint(fields=('event_type', 'version'), name='event_info_schema_unique_version'),
+        ),
+        migrations.AddField(
+            model_name='eventtype',
+            name='info_schema',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='+', to='event.eventinfoschema', verbose_name='Info schema'),
+        ),
+        migrations.RunPython(drop_sqlite_search_index, create_sqlite_search_index),
+        migrations.AlterField(
+            model_name='event',
+            name='info',
+            field=event.models.InfoField(help_text='This field is required', null=True, verbose_name='Event info'),
+        ),
+        migrations.AddField(
+            model_name='event',
+            name='info_schema',
+            field=models.ForeignKey(db_index=False, editable=False, null=True, on_delete=django.db.models.deletion.RESTRICT, related_name='events', to='event.eventinfoschema', verbose_name='Info schema'),
+        ),
+        migrations.AddField(
+            model_name='event',
+            name='info_packed',
+            field=models.BinaryField(null=True, verbose_name='Packed info'),
+        ),
+        migrations.RunPython(create_sqlite_search_index, drop_sqlite_search_index),
+    ]
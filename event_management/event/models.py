@@ -1,24 +1,158 @@
 """Module for all project models."""
 
-import uuid
-
+from django.conf import settings
 from django.contrib.auth import get_user_model
-from django.db import models
+from django.core.exceptions import FieldError, ValidationError
+from django.db import IntegrityError, connections, models, router, transaction
+from django.db.models.constants import LOOKUP_SEP
+from django.dispatch import Signal
+from django.utils.functional import cached_property
 from django.utils.translation import gettext as _
 
+from .cache import event_type_cache, info_schema_cache
+from .identifiers import uuid7
+from .info_schemas import info_errors, pack_info, project_info, unpack_info, validate_schema_fields
+from .recurrence import last_occurrence
 from .validators import validate_datetime_is_future
 
 User = get_user_model()
 
+# Sent with ``events`` and ``using`` after events were inserted without save(), e.g. by ingest
+events_created = Signal()
+
+
+def packs_info(using):
+    """bool: Returns whether info of events is packed with info schemas on the database.
+
+    Only the search index of SQLite gets the words of packed info, on PostgreSQL and other
+    databases info is searched in the ``info`` column, so it is always stored as JSON there.
+    """
+    return connections[using].vendor == "sqlite"
+
+
+def projected_info_lookups(args, kwargs):
+    """Yield lookups into info that see only the indexed keys of packed events, looking into Q objects."""
+    for child in [*args, *kwargs.items()]:
+        if isinstance(child, models.Q):
+            yield from projected_info_lookups(child.children, {})
+        elif isinstance(child, tuple):
+            name, *path = child[0].split(LOOKUP_SEP)
+            if name == "info" and path != ["isnull"] and not (path and path[0] in settings.EVENT_INFO_INDEXED_KEYS):
+                yield child[0]
+
+
+class EventTypeQuerySet(models.QuerySet):
+    """QuerySet with set-based helpers for event types."""
+
+    def resolve_names(self, names):
+        """dict: Map every name to its event type, creating all missing types together."""
+        names = set(names)
+        event_types = {event_type.name: event_type for event_type in self.filter(name__in=names)}
+        missing = names - event_types.keys()
+        if missing:
+            # Concurrent requests may insert the same names, so conflicts are ignored and the rows
+            # re-read from the database that was written to, not from a lagging replica.
+            self.bulk_create([self.model(name=name) for name in missing], ignore_conflicts=True)
+            created = self.filter(name__in=missing).using(self._db or router.db_for_write(self.model))
+            event_types.update((event_type.name, event_type) for event_type in created)
+        return event_types
+
+
+class EventQuerySet(models.QuerySet):
+    """QuerySet with bulk ingestion helpers for events.
+
+    Event types are resolved through event_type_cache, whose entries in other processes
+    may still hold an event type that was deleted. Foreign keys are checked when the
+    transaction commits, so create and ingest outside of a transaction catch the
+    IntegrityError, resolve the names of the event types again and retry once.
+
+    Where info is packed, see packs_info, the ``info`` column of packed events keeps only
+    the keys of EVENT_INFO_INDEXED_KEYS. Lookups into other keys or into the whole info would
+    miss packed events silently, so filter and exclude raise FieldError for them there.
+    ``values("info")`` and raw SQL read that column as well, load events to get their info.
+    """
+
+    def _filter_or_exclude(self, negate, args, kwargs):
+        """EventQuerySet: Returns filtered clone, lookups into info are limited to indexed keys where info is packed."""
+        if packs_info(self.db):
+            for lookup in projected_info_lookups(args, kwargs):
+                keys = ", ".join(settings.EVENT_INFO_INDEXED_KEYS)
+                raise FieldError(
+                    f"Cannot filter by {lookup}: the info column of events packed with an info schema "
+                    f"keeps only the indexed keys {keys}."
+                )
+        return super()._filter_or_exclude(negate, args, kwargs)
+
+    def create(self, **kwargs):
+        """Event: Returns created event."""
+        using = self._db or router.db_for_write(self.model)
+        if transaction.get_connection(using).in_atomic_block:
+            return super().create(**kwargs)
+        try:
+            with transaction.atomic(using=using):
+                return super().create(**kwargs)
+        except IntegrityError:
+            if not isinstance(kwargs.get("event_type"), EventType):
+                raise
+            name = kwargs["event_type"].name
+            event_type_cache.invalidate(name)
+            return super().create(**{**kwargs, "event_type": event_type_cache.resolve(name)})
+
+    def ingest(self, items, batch_size=None, ignore_conflicts=False, **defaults):
+        """list: Create events from validated data in batches.
+
+        Args:
+            items (list): Dicts of event fields where ``event_type`` is an event type name
+            batch_size (int): Number of rows per INSERT statement
+            ignore_conflicts (bool): Skip events whose id already exists
+            **defaults: Field values shared by all events, e.g. ``user``
+
+        Returns the created events, without the skipped ones when ignore_conflicts is set.
+        """
+        using = self._db or router.db_for_write(self.model)
+        if transaction.get_connection(using).in_atomic_block:
+            return self._ingest(items, using, batch_size, ignore_conflicts, defaults)
+        try:
+            return self._ingest(items, using, batch_size, ignore_conflicts, defaults)
+        except IntegrityError:
+            for name in {item["event_type"] for item in items}:
+                event_type_cache.invalidate(name)
+            return self._ingest(items, using, batch_size, ignore_conflicts, defaults)
+
+    def _ingest(self, items, using, batch_size, ignore_conflicts, defaults):
+        """list: Returns events created from validated data in one transaction."""
+        event_types = event_type_cache.resolve_many(item["event_type"] for item in items)
+        events = [
+            self.model(**{**defaults, **item, "event_type": event_types[item["event_type"]]}) for item in items
+        ]
+        for event in events:
+            event.pack_info(using)
+        with transaction.atomic(using=using):
+            if ignore_conflicts:
+                existing = set(
+                    self.using(using).filter(pk__in=[event.pk for event in events]).values_list("pk", flat=True)
+                )
+                events = [event for event in events if event.pk not in existing]
+            events = self.using(using).bulk_create(events, batch_size=batch_size, ignore_conflicts=ignore_conflicts)
+            events_created.send(sender=self.model, events=events, using=using)
+        return events
+
 
 class EventType(models.Model):
     """This class represents a basic Event Type (for an event system).
 
     Attributes:
         name (str): Name of the event type
+        info_schema (int): Schema info of new events is packed with, stored as JSON when empty
     """
 
     name = models.CharField(_("Name"), max_length=256, unique=True, help_text=_("This field is required"))
+    info_schema = models.ForeignKey(
+        "EventInfoSchema", related_name="+", on_delete=models.SET_NULL, null=True, blank=True,
+        verbose_name=_("Info schema"),
+    )
+
+    objects = EventTypeQuerySet.as_manager()
 
     class Meta:
         """This meta class stores verbose names and ordering data."""
@@ -30,38 +164,331 @@ class EventType(models.Model):
         """str: Returns instance name."""
         return self.name
 
+    def clean(self):
+        """Validate that the info schema belongs to the event type."""
+        super().clean()
+        if self.info_schema is not None and self.info_schema.event_type_id != self.pk:
+            raise ValidationError({"info_schema": _("Choose a schema of this event type.")})
+
+
+class EventInfoSchema(models.Model):
+    """This class represents one version of the schema of info payloads of an event type.
+
+    Schemas are never changed, events packed with a version are unpacked with it.
+
+    Attributes:
+        event_type (int): Represents event type id
+        version (int): Version number, counting up per event type
+        fields (json): Ordered list of ``{"name", "type", "required"}`` objects
+        created_at (datetime): Time of creation of the schema
+    """
+
+    event_type = models.ForeignKey(
+        EventType, related_name="info_schemas", on_delete=models.CASCADE, verbose_name=_("Event Type")
+    )
+    version = models.PositiveIntegerField(_("Version"))
+    fields = models.JSONField(_("Fields"), validators=[validate_schema_fields])
+    created_at = models.DateTimeField(auto_now_add=True, verbose_name=_("Created at"))
+
+    class Meta:
+        """This meta class stores verbose names, ordering data and constraints."""
+
+        ordering = ["event_type", "version"]
+        verbose_name_plural = _("Event Info Schemas")
+        constraints = [
+            models.UniqueConstraint(fields=["event_type", "version"], name="event_info_schema_unique_version"),
+        ]
+
+    def __str__(self) -> str:
+        """str: Returns class name, event type id and version."""
+        return f"{self.__class__.__name__} {self.event_type_id} v{self.version}"
+
+    @cached_property
+    def names(self):
+        """tuple: Returns field names in the order values are packed in."""
+        return tuple(field["name"] for field in self.fields)
+
+    def errors(self, info):
+        """list: Returns reasons why info doesn't conform to the schema, empty when it does."""
+        return info_errors(self.fields, info)
+
+    def pack(self, info):
+        """bytes: Returns info packed with the schema, None when it has keys the schema doesn't list."""
+        return pack_info(self.names, info, settings.EVENT_INFO_COMPRESS_THRESHOLD)
+
+    def unpack(self, packed):
+        """dict: Returns info packed with the schema."""
+        return unpack_info(self.names, packed)
+
+
+class InfoField(models.JSONField):
+    """JSONField of Event.info, saved as the projection of indexed keys when the info is stored packed."""
+
+    def pre_save(self, model_instance, add):
+        """Return the keys of EVENT_INFO_INDEXED_KEYS of packed info."""
+        if model_instance.info_packed is not None:
+            return project_info(model_instance.info, settings.EVENT_INFO_INDEXED_KEYS)
+        return super().pre_save(model_instance, add)
+
 
 class Event(models.Model):
     """This class represents a basic Event (for an event system).
 
     Attributes:
-        id (uuid4): Primary key type uuid4
+        id (uuid7): Time-ordered primary key
         user (int): User id who creates event
         event_type (int): Represents event type id
-        info (json): Some information about concrete event
-        timestamp (datetime): Event time and date
+        info (json): Some information about concrete event, stored as JSON or packed with its info schema
+            with only the indexed keys kept as JSON
+        timestamp (datetime): Event time and date, the first occurrence of a recurring event
         created_at (datetime): Time of creation of the event
+        recurrence (str): RRULE of a recurring event, empty for a single event
+        recurrence_exceptions (json): Occurrences of a recurring event that don't take place
+        recurrence_end (datetime): Last occurrence of a recurring event, null when it has no end
+        info_schema (int): Schema the info is packed with, null when it is stored as JSON
+        info_packed (bytes): Info packed with the schema
     """
 
     help_texts = {"required": _("This field is required")}
 
-    id = models.UUIDField("UUID", primary_key=True, default=uuid.uuid4, editable=False)     # noqa
+    id = models.UUIDField("UUID", primary_key=True, default=uuid7, editable=False)     # noqa
     user = models.ForeignKey(User, related_name="events", on_delete=models.CASCADE, verbose_name=_("User"))
     event_type = models.ForeignKey(
         EventType, related_name="events", on_delete=models.CASCADE, verbose_name=_("Event Type")
     )
-    info = models.JSONField(_("Event info"), help_text=help_texts["required"])
+    info = InfoField(_("Event info"), null=True, help_text=help_texts["required"])
     timestamp = models.DateTimeField(
         _("Event datetime"), help_text=help_texts["required"], validators=[validate_datetime_is_future]
     )
     created_at = models.DateTimeField(auto_now_add=True, verbose_name=_("Created at"))
+    recurrence = models.CharField(
+        _("Recurrence rule"), max_length=512, blank=True, default="", help_text=_("RRULE, e.g. FREQ=WEEKLY;COUNT=52")
+    )
+    recurrence_exceptions = models.JSONField(_("Recurrence exceptions"), blank=True, default=list)
+    recurrence_end = models.DateTimeField(_("Last occurrence"), null=True, blank=True, editable=False)
+    info_schema = models.ForeignKey(
+        EventInfoSchema, related_name="events", on_delete=models.RESTRICT, null=True, editable=False,
+        db_index=False, verbose_name=_("Info schema"),
+    )
+    info_packed = models.BinaryField(_("Packed info"), null=True)
+
+    objects = EventQuerySet.as_manager()
 
     class Meta:
-        """This meta class stores verbose names and ordering data."""
+        """This meta class stores verbose names, ordering data and indexes."""
 
         ordering = ["id"]
         verbose_name_plural = _("Events")
+        indexes = [
+            models.Index(fields=["timestamp", "id"], name="event_timestamp_id_idx"),
+            models.Index(fields=["user", "timestamp", "id"], name="event_user_timestamp_id_idx"),
+            models.Index(fields=["event_type", "timestamp", "id"], name="event_type_timestamp_id_idx"),
+            models.Index(
+                fields=["recurrence_end", "timestamp"], name="event_series_end_idx", condition=~models.Q(recurrence="")
+            ),
+        ]
+
+    def __str__(self) -> str:
+        """str: Returns class name and instance id."""
+        return f"{self.__class__.__name__} #{self.id}"
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        """Event: Returns event loaded from the database with its packed info unpacked."""
+        instance = super().from_db(db, field_names, values)
+        packed = instance.__dict__.get("info_packed")
+        if packed is not None:
+            instance.info = info_schema_cache.get(instance.info_schema_id).unpack(packed)
+        return instance
+
+    def pack_info(self, using=None):
+        """Pack info with the active schema of the event type, keep it as JSON when there is none or it can't be."""
+        using = using or router.db_for_write(type(self), instance=self)
+        schema = info_schema_cache.active(self.event_type_id) if packs_info(using) else None
+        self.info_packed = schema.pack(self.info) if schema is not None else None
+        self.info_schema = schema if self.info_packed is not None else None
+
+    def save(self, *args, **kwargs):
+        """Save the event with its info packed."""
+        self.pack_info(kwargs.get("using"))
+        update_fields = kwargs.get("update_fields")
+        if update_fields is not None and "info" in update_fields:
+            kwargs["update_fields"] = {*update_fields, "info_schema", "info_packed"}
+        super().save(*args, **kwargs)
+
+    def clean(self):
+        """Validate info with the active schema of the event type and the recurrence rule, store the last occurrence."""
+        super().clean()
+        schema = info_schema_cache.active(self.event_type_id) if self.event_type_id is not None else None
+        errors = schema.errors(self.info) if schema is not None else None
+        if errors:
+            raise ValidationError({"info": errors})
+        if not self.recurrence:
+            self.recurrence_end = None
+            return
+        if self.timestamp is None:
+            return
+        self.timestamp = self.timestamp.replace(microsecond=0)
+        try:
+            self.recurrence_end = last_occurrence(self.recurrence, self.timestamp)
+        except ValueError as exc:
+            raise ValidationError({"recurrence": str(exc)})
+
+
+class ArchivedEvent(models.Model):
+    """This class represents a past event moved out of the Event table by ``archive_events``.
+
+    Attributes:
+        id (uuid7): Primary key of the original event
+        user (int): User id who created event
+        event_type (int): Represents event type id
+        info (json): Some information about concrete event
+        timestamp (datetime): Event time and date
+        created_at (datetime): Time of creation of the event
+        archived_at (datetime): Time the event was archived
+    """
+
+    id = models.UUIDField("UUID", primary_key=True, editable=False)     # noqa
+    user = models.ForeignKey(User, related_name="archived_events", on_delete=models.CASCADE, verbose_name=_("User"))
+    event_type = models.ForeignKey(
+        EventType, related_name="archived_events", on_delete=models.CASCADE, verbose_name=_("Event Type")
+    )
+    info = models.JSONField(_("Event info"))
+    timestamp = models.DateTimeField(_("Event datetime"))
+    created_at = models.DateTimeField(_("Created at"))
+    archived_at = models.DateTimeField(auto_now_add=True, verbose_name=_("Archived at"))
+
+    # Only single events are archived, these keep archived events represented like events
+    recurrence = ""
+    recurrence_exceptions = ()
+    recurrence_end = None
+
+    class Meta:
+        """This meta class stores verbose names, ordering data and indexes."""
+
+        ordering = ["id"]
+        verbose_name_plural = _("Archived Events")
+        indexes = [
+            models.Index(fields=["timestamp", "id"], name="archived_timestamp_id_idx"),
+            models.Index(fields=["user", "timestamp", "id"], name="archived_user_timestamp_id_idx"),
+            models.Index(fields=["event_type", "timestamp", "id"], name="archived_type_timestamp_id_idx"),
+        ]
 
     def __str__(self) -> str:
         """str: Returns class name and instance id."""
         return f"{self.__class__.__name__} #{self.id}"
+
+
+class DispatcherCheckpoint(models.Model):
+    """This class represents progress and ownership of one shard of the due-event dispatcher.
+
+    Attributes:
+        shard (int): Shard number, events of users with ``user_id % shards == shard``
+        shards (int): Number of shards the events are split into
+        timestamp (datetime): Due time of the last fired event
+        event_id (uuid): Id of the last fired event
+        owner (str): Dispatcher process holding the shard
+        lease_expires (datetime): Time until which the owner holds the shard
+    """
+
+    shard = models.PositiveIntegerField(_("Shard"))
+    shards = models.PositiveIntegerField(_("Shards"))
+    timestamp = models.DateTimeField(_("Last fired event datetime"))
+    event_id = models.UUIDField(_("Last fired event UUID"))
+    owner = models.CharField(_("Owner"), max_length=256, blank=True)
+    lease_expires = models.DateTimeField(_("Lease expires"), null=True, blank=True)
+
+    class Meta:
+        """This meta class stores verbose names and constraints."""
+
+        ordering = ["shards", "shard"]
+        verbose_name_plural = _("Dispatcher Checkpoints")
+        constraints = [
+            models.UniqueConstraint(fields=["shard", "shards"], name="dispatcher_checkpoint_unique_shard"),
+        ]
+
+    def __str__(self) -> str:
+        """str: Returns class name and shard."""
+        return f"{self.__class__.__name__} {self.shard}/{self.shards}"
+
+
+class EventRollupQuerySet(models.QuerySet):
+    """QuerySet with incremental update helpers for event rollups."""
+
+    def add_counts(self, deltas):
+        """Add deltas to counts of rollup rows, creating missing rows.
+
+        Args:
+            deltas (dict): Maps ``(period, bucket, event_type_id, user_id)`` to the count to add
+        """
+        deltas = {key: delta for key, delta in deltas.items() if delta}
+        if not deltas:
+            return
+        using = self._db or router.db_for_write(self.model)
+        connection = connections[using]
+        if connection.vendor not in ("sqlite", "postgresql"):
+            with transaction.atomic(using=using):
+                for (period, bucket, event_type_id, user_id), delta in deltas.items():
+                    key = {"period": period, "bucket": bucket, "event_type_id": event_type_id, "user_id": user_id}
+                    if not self.using(using).filter(**key).update(count=models.F("count") + delta):
+                        self.using(using).create(**key, count=delta)
+            return
+
+        # One upsert statement adds to existing counts, so concurrent writers never lose increments
+        meta, quote = self.model._meta, connection.ops.quote_name
+        columns = [meta.get_field(name).column for name in ("period", "bucket", "event_type", "user", "count")]
+        table = quote(meta.db_table)
+        sql = (
+            f"INSERT INTO {table} ({', '.join(map(quote, columns))}) VALUES (%s, %s, %s, %s, %s) "
+            f"ON CONFLICT ({', '.join(map(quote, columns[:4]))}) "
+            f"DO UPDATE SET {quote('count')} = {table}.{quote('count')} + excluded.{quote('count')}"
+        )
+        bucket_field = meta.get_field("bucket")
+        params = [
+            (period, bucket_field.get_db_prep_value(bucket, connection), event_type_id, user_id, delta)
+            for (period, bucket, event_type_id, user_id), delta in deltas.items()
+        ]
+        with connection.cursor() as cursor:
+            cursor.executemany(sql, params)
+
+
+class EventRollup(models.Model):
+    """This class represents the number of events of one type and user in a time bucket.
+
+    Attributes:
+        period (str): Bucket length, ``hour`` or ``day``
+        bucket (datetime): Start of the bucket in UTC
+        event_type (int): Event type id
+        user (int): User id
+        count (int): Number of events with timestamp in the bucket
+    """
+
+    PERIOD_CHOICES = [("hour", _("Hour")), ("day", _("Day"))]
+
+    period = models.CharField(_("Period"), max_length=4, choices=PERIOD_CHOICES)
+    bucket = models.DateTimeField(_("Bucket start"))
+    event_type = models.ForeignKey(
+        EventType, related_name="rollups", on_delete=models.CASCADE, verbose_name=_("Event Type")
+    )
+    user = models.ForeignKey(User, related_name="event_rollups", on_delete=models.CASCADE, verbose_name=_("User"))
+    count = models.BigIntegerField(_("Count"), default=0)
+
+    objects = EventRollupQuerySet.as_manager()
+
+    class Meta:
+        """This meta class stores verbose names, constraints and indexes."""
+
+        ordering = ["period", "bucket"]
+        verbose_name_plural = _("Event Rollups")
+        constraints = [
+            models.UniqueConstraint(
+                fields=["period", "bucket", "event_type", "user"], name="event_rollup_unique_bucket"
+            ),
+        ]
+        indexes = [
+            models.Index(fields=["user", "period", "bucket"], name="event_rollup_user_bucket_idx"),
+        ]
+
+    def __str__(self) -> str:
+        """str: Returns class name, period and bucket."""
+        return f"{self.__class__.__name__} {self.period} {self.bucket.isoformat()}"
@@ -0,0 +1,146 @@
+"""The module includes project paginators."""
+
+import heapq
+import uuid
+from base64 import urlsafe_b64decode, urlsafe_b64encode
+from itertools import islice
+
+from django.conf import settings
+from django.db.models import Q
+from django.utils.dateparse import parse_datetime
+
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import BasePagination
+from rest_framework.response import Response
+from rest_framework.utils.urls import replace_query_param
+
+from .archive import archive_cutoff
+from .search import search_events
+
+
+def encode_cursor(event):
+    """str: Returns cursor holding the ``(timestamp, id)`` sort key of the given event."""
+    return urlsafe_b64encode(f"{event.timestamp.isoformat()}|{event.id}".encode("ascii")).decode("ascii")
+
+
+def parse_cursor(encoded):
+    """tuple: Returns ``(timestamp, id)`` held by the cursor, raises ValueError for an invalid one."""
+    timestamp, pk = urlsafe_b64decode(encoded.encode("ascii")).decode("ascii").split("|")
+    timestamp, pk = parse_datetime(timestamp), uuid.UUID(pk)
+    if timestamp is None:
+        raise ValueError("Invalid cursor timestamp")
+    return timestamp, pk
+
+
+class EventKeysetPagination(BasePagination):
+    """Keyset pagination over events ordered by ``(timestamp, id)``.
+
+    The cursor holds the sort key of the last row of a page, so the next page is
+    a range seek on the ``(..., timestamp, id)`` indexes instead of an OFFSET scan.
+    Archived events passed as ``archive`` are merged into the pages until the cursor
+    passes the archive cutoff. ``occurrences`` is called with the cursor position and
+    returns occurrences of recurring events after it, also merged into the pages.
+    """
+
+    cursor_query_param = "cursor"
+    page_size_query_param = "page_size"
+    invalid_cursor_message = "Invalid cursor"
+
+    def paginate_queryset(self, queryset, request, view=None, archive=None, occurrences=None):
+        """list: Returns one page of events after the requested cursor."""
+        self.request = request
+        self.page_size = self.get_page_size(request)
+        position = self.decode_cursor(request)
+        querysets = [queryset]
+        if archive is not None and (position is None or position[0] < archive_cutoff()):
+            querysets.append(archive)
+        if position is not None:
+            querysets = [self.seek(queryset, *position) for queryset in querysets]
+        pages = [queryset.order_by("timestamp", "id")[: self.page_size + 1] for queryset in querysets]
+        if occurrences is not None:
+            pages.append(list(islice(occurrences(position), self.page_size + 1)))
+        results = list(heapq.merge(*pages, key=lambda event: (event.timestamp, event.id)))[: self.page_size + 1]
+        self.has_next = len(results) > self.page_size
+        self.page = results[: self.page_size]
+        return self.page
+
+    @staticmethod
+    def seek(queryset, timestamp, pk):
+        """QuerySet: Returns events that sort after the given ``(timestamp, id)`` key."""
+        return queryset.filter(Q(timestamp__gt=timestamp) | Q(id__gt=pk), timestamp__gte=timestamp)
+
+    def get_page_size(self, request):
+        """int: Returns requested page size limited by EVENT_MAX_PAGE_SIZE setting."""
+        try:
+            page_size = int(request.query_params[self.page_size_query_param])
+        except (KeyError, ValueError):
+            return settings.EVENT_PAGE_SIZE
+        return min(max(page_size, 1), settings.EVENT_MAX_PAGE_SIZE)
+
+    def decode_cursor(self, request):
+        """tuple: Returns ``(timestamp, id)`` from the cursor query parameter or None."""
+        encoded = request.query_params.get(self.cursor_query_param)
+        if not encoded:
+            return None
+        try:
+            return parse_cursor(encoded)
+        except ValueError:
+            raise NotFound(self.invalid_cursor_message)
+
+    @staticmethod
+    def encode_cursor(event):
+        """str: Returns cursor pointing after the given event."""
+        return encode_cursor(event)
+
+    def get_next_link(self):
+        """str: Returns URL of the next page or None."""
+        if not self.has_next:
+            return None
+        url = self.request.build_absolute_uri()
+        return replace_query_param(url, self.cursor_query_param, self.encode_cursor(self.page[-1]))
+
+    def get_paginated_response(self, data):
+        """Response: Returns page of events with a link to the next page."""
+        return Response({"next": self.get_next_link(), "results": data})
+
+    def get_paginated_response_schema(self, schema):
+        """dict: Returns schema of the paginated response."""
+        return {
+            "type": "object",
+            "properties": {
+                "next": {"type": "string", "nullable": True, "format": "uri"},
+                "results": schema,
+            },
+        }
+
+
+class EventSearchPagination(EventKeysetPagination):
+    """Keyset pagination over search results ordered by ``(rank, id)``, best first.
+
+    The view provides the search query with ``get_search_query``.
+    """
+
+    def paginate_queryset(self, queryset, request, view=None):
+        """list: Returns one page of matching events after the requested cursor."""
+        self.request = request
+        self.page_size = self.get_page_size(request)
+        results = search_events(queryset, view.get_search_query(), self.page_size + 1, self.decode_cursor(request))
+        self.has_next = len(results) > self.page_size
+        self.page = results[: self.page_size]
+        return self.page
+
+    def decode_cursor(self, request):
+        """tuple: Returns ``(rank, id)`` from the cursor query parameter or None."""
+        encoded = request.query_params.get(self.cursor_query_param)
+        if not encoded:
+            return None
+        try:
+            rank, pk = urlsafe_b64decode(encoded.encode("ascii")).decode("ascii").split("|")
+            return float(rank), uuid.UUID(pk)
+        except ValueError:
+            raise NotFound(self.invalid_cursor_message)
+
+    @staticmethod
+    def encode_cursor(event):
+        """str: Returns cursor pointing after the given event."""
+        return urlsafe_b64encode(f"{event.search_rank!r}|{event.id}".encode("ascii")).decode("ascii")
@@ -0,0 +1,80 @@
+"""The module includes project parsers."""
+
+import codecs
+import csv
+import re
+
+from django.conf import settings
+
+from rest_framework.exceptions import ParseError
+from rest_framework.parsers import BaseParser, JSONParser
+from rest_framework.utils import json
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover
+    orjson = None
+
+# Integer literals out of the 64-bit range of orjson, which decodes them as floats
+WIDE_INTEGER = re.compile(r"\d{20}|-\d{19}")
+WIDE_INTEGER_BYTES = re.compile(WIDE_INTEGER.pattern.encode())
+
+
+def json_loads(data):
+    """Returns value decoded from JSON bytes or str, raises ValueError for invalid JSON.
+
+    Decodes with orjson when it is installed, documents that may hold an integer wider
+    than 64 bits, or just a long run of digits, are decoded with json to keep it exact.
+    """
+    if orjson is None or (WIDE_INTEGER if isinstance(data, str) else WIDE_INTEGER_BYTES).search(data):
+        return json.loads(data)
+    return orjson.loads(data)
+
+
+class ORJSONParser(JSONParser):
+    """JSON parser decoding with orjson when it is installed."""
+
+    def parse(self, stream, media_type=None, parser_context=None):
+        """Parse the incoming bytestream as JSON."""
+        if orjson is None:
+            return super().parse(stream, media_type, parser_context)
+        try:
+            return json_loads(stream.read())
+        except ValueError as exc:
+            raise ParseError(f"JSON parse error - {exc}")
+
+
+class NDJSONParser(BaseParser):
+    """Parser for newline delimited JSON, one object per line."""
+
+    media_type = "application/x-ndjson"
+
+    def parse(self, stream, media_type=None, parser_context=None):
+        """Parse the incoming bytestream as a list of JSON objects."""
+        parser_context = parser_context or {}
+        encoding = parser_context.get("encoding", settings.DEFAULT_CHARSET)
+        items = []
+        for number, line in enumerate(stream, start=1):
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                items.append(json_loads(line.decode(encoding)))
+            except ValueError as exc:
+                raise ParseError(f"NDJSON parse error on line {number} - {exc}")
+        return items
+
+
+class CSVParser(BaseParser):
+    """Parser for CSV with a header row, one object per row."""
+
+    media_type = "text/csv"
+
+    def parse(self, stream, media_type=None, parser_context=None):
+        """Parse the incoming bytestream as a list of dicts keyed by the header."""
+        parser_context = parser_context or {}
+        encoding = parser_context.get("encoding", settings.DEFAULT_CHARSET)
+        try:
+            return list(csv.DictReader(codecs.iterdecode(stream, encoding)))
+        except (csv.Error, UnicodeDecodeError) as exc:
+            raise ParseError(f"CSV parse error - {exc}")
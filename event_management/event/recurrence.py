@@ -0,0 +1,128 @@
+"""The module includes recurring events.
+
+A recurring event is stored as one row, a series, whose ``recurrence`` holds an RRULE
+(RFC 5545) starting at its ``timestamp``. Occurrences are never stored: they are expanded
+lazily, as generators, only within the time window a query asks for, skipping the
+occurrences listed in ``recurrence_exceptions``. ``recurrence_end`` holds the last
+occurrence of a bounded series and is indexed for series only, so a range query loads
+just the series that can have occurrences in its window.
+"""
+
+import copy
+import heapq
+import re
+from datetime import MAXYEAR, timezone
+from itertools import islice
+
+from django.conf import settings
+from django.db.models import Q
+from django.utils.dateparse import parse_datetime
+
+from dateutil.rrule import rrule, rrulestr
+
+BOUNDED_PATTERN = re.compile(r"\b(COUNT|UNTIL)=", re.IGNORECASE)
+
+# The Gregorian calendar, weekdays and leap years included, repeats every 400 years
+CALENDAR_CYCLE_YEARS = 400
+
+
+def build_rule(recurrence, dtstart):
+    """rrule: Returns rule parsed from an RRULE string, raises ValueError for an invalid one.
+
+    The start always comes from the event, so the string can't hold DTSTART or more rules.
+    Occurrences are computed in UTC, whatever the time zone of dtstart.
+    """
+    if "\n" in recurrence or "DTSTART" in recurrence.upper():
+        raise ValueError("Enter a single RRULE without DTSTART.")
+    try:
+        rule = rrulestr(recurrence, dtstart=dtstart.astimezone(timezone.utc))
+    except (ValueError, TypeError) as exc:
+        raise ValueError(f"Enter a valid RRULE - {exc}")
+    if not isinstance(rule, rrule):
+        raise ValueError("Enter a single RRULE without DTSTART.")
+    return rule
+
+
+def first_occurrence(rule, dtstart):
+    """datetime: Returns first occurrence of a rule, None when it has none within EVENT_RECURRENCE_SEARCH_YEARS.
+
+    dateutil looks for the next occurrence up to the year 9999, whatever COUNT or UNTIL,
+    so a rule that can never match, e.g. ``BYMONTH=2;BYMONTHDAY=30``, scans thousands of
+    years. The rule is searched with its start moved by whole calendar cycles, where its
+    occurrences fall on the same days, close enough to the year 9999 for the scan to end
+    after EVENT_RECURRENCE_SEARCH_YEARS, and less than a cycle more.
+
+    Args:
+        rule (rrule): Rule built by build_rule
+        dtstart (datetime): Start of the rule, in UTC
+    """
+    years = settings.EVENT_RECURRENCE_SEARCH_YEARS
+    shift = max(MAXYEAR - years - dtstart.year, 0) // CALENDAR_CYCLE_YEARS * CALENDAR_CYCLE_YEARS
+    probe = rule.replace(dtstart=dtstart.replace(year=dtstart.year + shift), count=None, until=None)
+    occurrence = next(iter(probe), None)
+    return occurrence.replace(year=occurrence.year - shift) if occurrence is not None else None
+
+
+def last_occurrence(recurrence, dtstart):
+    """datetime: Returns last occurrence of a bounded rule, None for an unbounded one.
+
+    Raises ValueError when the rule is invalid, has no occurrences within
+    EVENT_RECURRENCE_SEARCH_YEARS or more than EVENT_RECURRENCE_MAX_OCCURRENCES of them.
+    """
+    rule = build_rule(recurrence, dtstart)
+    if first_occurrence(rule, dtstart.astimezone(timezone.utc)) is None:
+        raise ValueError(
+            f"Recurrence rule has no occurrences within {settings.EVENT_RECURRENCE_SEARCH_YEARS} years of the start."
+        )
+    if not BOUNDED_PATTERN.search(recurrence):
+        return None
+    limit = settings.EVENT_RECURRENCE_MAX_OCCURRENCES
+    # The rule has occurrences, so the search ends at COUNT or the first one after UNTIL
+    occurrences = list(islice(rule, limit + 1))
+    if not occurrences:
+        raise ValueError("Recurrence rule has no occurrences before its UNTIL.")
+    if len(occurrences) > limit:
+        raise ValueError(f"Ensure the recurrence has no more than {limit} occurrences.")
+    return occurrences[-1]
+
+
+def iter_occurrences(event, after=None, before=None, position=None):
+    """Yield occurrences of a series from after up to before as copies of the event.
+
+    Args:
+        event (Event): Series to expand
+        after (datetime): Start of the window, inclusive
+        before (datetime): End of the window, exclusive
+        position (tuple): Keyset ``(timestamp, id)``, only occurrences sorting after it are yielded
+    """
+    rule = build_rule(event.recurrence, event.timestamp)
+    exceptions = {parse_datetime(value) for value in event.recurrence_exceptions}
+    if position is not None:
+        after = max(after, position[0]) if after is not None else position[0]
+    for timestamp in rule.xafter(after, inc=True) if after is not None else rule:
+        if before is not None and timestamp >= before:
+            return
+        if timestamp in exceptions or (position is not None and (timestamp, event.id) <= position):
+            continue
+        occurrence = copy.copy(event)
+        occurrence.timestamp = timestamp
+        yield occurrence
+
+
+def expand_series(queryset, after=None, before=None, position=None):
+    """iterator: Returns occurrences of the series in the queryset in ``(timestamp, id)`` order.
+
+    Only series that can have occurrences in the window are loaded, in one query.
+    """
+    lower = position[0] if position is not None else after
+    if after is not None and lower is not None:
+        lower = max(after, lower)
+    series = queryset.exclude(recurrence="").order_by()
+    if before is not None:
+        series = series.filter(timestamp__lt=before)
+    if lower is not None:
+        series = series.filter(Q(recurrence_end__isnull=True) | Q(recurrence_end__gte=lower))
+    return heapq.merge(
+        *(iter_occurrences(event, after, before, position) for event in series),
+        key=lambda occurrence: (occurrence.timestamp, occurrence.id),
+    )
@@ -0,0 +1,32 @@
+"""The module includes project renderers."""
+
+from rest_framework.renderers import JSONRenderer
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover
+    orjson = None
+
+
+class ORJSONRenderer(JSONRenderer):
+    """JSON renderer encoding with orjson when it is installed.
+
+    The output is the same as JSONRenderer's: datetimes and the other values orjson does
+    not encode natively go through DRF's JSONEncoder and line separators are escaped.
+    Indented output, e.g. for the browsable API, data orjson can't encode, such as
+    integers wider than 64 bits, and environments without orjson fall back to JSONRenderer.
+    """
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        """bytes: Returns data encoded as JSON."""
+        if orjson is None or data is None or self.get_indent(accepted_media_type, renderer_context or {}) is not None:
+            return super().render(data, accepted_media_type, renderer_context)
+        try:
+            content = orjson.dumps(
+                data,
+                default=self.encoder_class().default,
+                option=orjson.OPT_PASSTHROUGH_DATETIME | orjson.OPT_NON_STR_KEYS,
+            )
+        except (orjson.JSONEncodeError, TypeError):
+            return super().render(data, accepted_media_type, renderer_context)
+        return content.replace("\u2028".encode(), b"\\u2028").replace("\u2029".encode(), b"\\u2029")
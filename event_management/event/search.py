@@ -0,0 +1,190 @@
+"""The module includes full-text search over Event.info.
+
+Every text and number anywhere in ``info`` is searchable. On SQLite the words are kept in
+the ``event_event_fts`` FTS5 table, keyed by the rowid of the event and kept in sync by
+triggers on insert, update and delete, so bulk inserts and raw deletes are covered too.
+Triggers only see the indexed keys kept in the ``info`` column of events whose info is
+packed with a schema, their words are written by index_packed_events when the events are
+saved or ingested, and by rebuild_search_index. On PostgreSQL a GIN expression index on
+``jsonb_to_tsvector`` of ``info`` is maintained by the database itself. Both are created
+by migrations. Other databases have no index, events whose JSON text contains every word
+are found by a scan and rank the same.
+
+Results are ranked, best first, by ``bm25`` on SQLite and ``ts_rank`` on PostgreSQL, and
+paged by ``(rank, id)`` keyset. Ranks depend on the whole index, so pages fetched while
+events change may skip or repeat an event.
+
+VACUUM may renumber the rowids of the event table on SQLite, run ``reindex_events`` after it.
+"""
+
+import re
+
+from django.conf import settings
+from django.db import connections, models, transaction
+from django.db.models.functions import Cast
+
+from .cache import info_schema_cache
+from .models import Event
+
+SEARCH_TABLE = "event_event_fts"
+SEARCH_INDEX = "event_info_search_idx"
+
+TERM_PATTERN = re.compile(r"\w+")
+
+# Words of the text and number values of a JSON document, the same expression fills and rebuilds the index
+INFO_TEXT_SQL = "(SELECT group_concat(atom, ' ') FROM json_tree({info}) WHERE type IN ('text', 'integer', 'real'))"
+
+INFO_VECTOR_SQL = "jsonb_to_tsvector('simple', {info}, '[\"string\", \"numeric\"]')"
+
+
+def info_text(info):
+    """str: Returns words of the text and number values of info, the same as INFO_TEXT_SQL."""
+    if isinstance(info, dict):
+        info = info.values()
+    elif not isinstance(info, list):
+        return "" if isinstance(info, bool) or not isinstance(info, (str, int, float)) else str(info)
+    return " ".join(text for text in map(info_text, info) if text)
+
+
+def index_packed_events(events, using="default"):
+    """Write words of the packed info of events to the search index of SQLite."""
+    connection = connections[using]
+    events = [event for event in events if event.info_packed is not None]
+    if connection.vendor != "sqlite" or not events:
+        return
+    pk_field = Event._meta.pk
+    params = [(info_text(event.info), pk_field.get_db_prep_value(event.pk, connection)) for event in events]
+    with connection.cursor() as cursor:
+        cursor.executemany(
+            f"INSERT OR REPLACE INTO {SEARCH_TABLE} (rowid, body) SELECT rowid, %s FROM {Event._meta.db_table} "
+            f"WHERE id = %s",
+            params,
+        )
+
+
+def search_terms(query):
+    """list: Returns words of a search query, all of them must match."""
+    return TERM_PATTERN.findall(query.lower())
+
+
+def scan_event_ids(terms, limit, position=None, using="default"):
+    """list: Returns ``(0.0, id)`` of up to limit events whose JSON info contains all terms, in id order.
+
+    Used on databases without a search index, every match ranks the same. Info isn't packed
+    there, so the ``info`` column holds all of it.
+    """
+    queryset = Event.objects.using(using).alias(info_text=Cast("info", models.TextField())).order_by("pk")
+    for term in terms:
+        queryset = queryset.filter(info_text__icontains=term)
+    if position is not None:
+        queryset = queryset.filter(pk__gt=position[1])
+    return [(0.0, pk) for pk in queryset.values_list("pk", flat=True)[:limit]]
+
+
+def search_event_ids(query, limit, position=None, using="default"):
+    """list: Returns ``(rank, id)`` of up to limit events matching all words of the query, best first.
+
+    Args:
+        query (str): Search query
+        limit (int): Maximum number of events
+        position (tuple): Keyset ``(rank, id)``, only events ranked after it are returned
+        using (str): Database alias
+    """
+    terms = search_terms(query)
+    if not terms:
+        return []
+    connection = connections[using]
+    table, pk_field = Event._meta.db_table, Event._meta.pk
+    if connection.vendor == "sqlite":
+        # Quoted words can't be read as FTS5 operators, adjacent phrases must all match
+        rank, rank_params = f"bm25({SEARCH_TABLE})", []
+        sql = (
+            f"FROM {SEARCH_TABLE} JOIN {table} e ON e.rowid = {SEARCH_TABLE}.rowid WHERE {SEARCH_TABLE} MATCH %s"
+        )
+        params = [" ".join(f'"{term}"' for term in terms)]
+    elif connection.vendor == "postgresql":
+        vector = INFO_VECTOR_SQL.format(info="e.info")
+        rank, rank_params = f"-ts_rank({vector}, plainto_tsquery('simple', %s))", [" ".join(terms)]
+        sql, params = f"FROM {table} e WHERE {vector} @@ plainto_tsquery('simple', %s)", [" ".join(terms)]
+    else:
+        return scan_event_ids(terms, limit, position, using)
+    sql, params = f"SELECT {rank}, e.id {sql}", [*rank_params, *params]
+    if position is not None:
+        sql += f" AND ({rank} > %s OR ({rank} = %s AND e.id > %s))"
+        pk = pk_field.get_db_prep_value(position[1], connection)
+        params += [*rank_params, position[0], *rank_params, position[0], pk]
+    sql += f" ORDER BY {rank}, e.id LIMIT %s"
+    params += [*rank_params, limit]
+    with connection.cursor() as cursor:
+        cursor.execute(sql, params)
+        rows = cursor.fetchall()
+    return [(rank, pk_field.to_python(pk)) for rank, pk in rows]
+
+
+def search_events(queryset, query, limit, position=None):
+    """list: Returns up to limit events of the queryset matching the query, best first, with their ``search_rank``."""
+    ranked = search_event_ids(query, limit, position, queryset.db)
+    events = queryset.in_bulk([pk for _, pk in ranked])
+    results = []
+    for rank, pk in ranked:
+        if pk in events:
+            events[pk].search_rank = rank
+            results.append(events[pk])
+    return results
+
+
+def rebuild_search_index(batch_size=None, using="default"):
+    """int: Returns number of events indexed again.
+
+    On SQLite the index is rewritten in batches of rowids, each in its own transaction,
+    and entries of events that no longer exist are dropped. Triggers keep indexing
+    concurrent writes. On PostgreSQL the index is rebuilt concurrently.
+    """
+    connection = connections[using]
+    table = Event._meta.db_table
+    if connection.vendor == "postgresql":
+        with connection.cursor() as cursor:
+            cursor.execute(f"REINDEX INDEX CONCURRENTLY {SEARCH_INDEX}")
+        return Event.objects.using(using).count()
+    if connection.vendor != "sqlite":
+        return 0
+
+    batch_size = batch_size or settings.EVENT_SEARCH_REINDEX_BATCH_SIZE
+    indexed, last_rowid = 0, 0
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f"SELECT max(coalesce((SELECT max(rowid) FROM {table}), 0), "
+            f"coalesce((SELECT max(rowid) FROM {SEARCH_TABLE}), 0))"
+        )
+        max_rowid = cursor.fetchone()[0]
+    while last_rowid < max_rowid:
+        with transaction.atomic(using=using), connection.cursor() as cursor:
+            cursor.execute(
+                f"SELECT rowid FROM {table} WHERE rowid > %s ORDER BY rowid LIMIT 1 OFFSET %s",
+                [last_rowid, batch_size - 1],
+            )
+            row = cursor.fetchone()
+            until = row[0] if row else max_rowid
+            cursor.execute(
+                f"INSERT OR REPLACE INTO {SEARCH_TABLE} (rowid, body) "
+                f"SELECT rowid, {INFO_TEXT_SQL.format(info='info')} FROM {table} WHERE rowid > %s AND rowid <= %s",
+                [last_rowid, until],
+            )
+            indexed += cursor.rowcount
+            cursor.execute(
+                f"SELECT rowid, info_schema_id, info_packed FROM {table} "
+                f"WHERE rowid > %s AND rowid <= %s AND info_packed IS NOT NULL",
+                [last_rowid, until],
+            )
+            packed = [
+                (rowid, info_text(info_schema_cache.get(schema_id).unpack(data)))
+                for rowid, schema_id, data in cursor.fetchall()
+            ]
+            cursor.executemany(f"INSERT OR REPLACE INTO {SEARCH_TABLE} (rowid, body) VALUES (%s, %s)", packed)
+            cursor.execute(
+                f"DELETE FROM {SEARCH_TABLE} WHERE rowid > %s AND rowid <= %s "
+                f"AND rowid NOT IN (SELECT rowid FROM {table} WHERE rowid > %s AND rowid <= %s)",
+                [last_rowid, until, last_rowid, until],
+            )
+        last_rowid = until
+    return indexed
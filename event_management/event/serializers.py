@@ -1,11 +1,66 @@
 """The module includes project serializers."""
 
+from django.utils import timezone
+
 from rest_framework import serializers
 
+from event_management.instrumentation import TimedSerializerMixin
+from event_management.metrics import ValidationMetricsMixin
+
+from .cache import event_type_cache, info_schema_cache
 from .models import Event, EventType
+from .recurrence import last_occurrence
+from .validators import validate_datetime_is_future
+
+
+def format_datetime(value):
+    """str: Returns datetime in the current time zone formatted as DRF's DateTimeField does."""
+    representation = timezone.localtime(value).isoformat()
+    return representation[:-6] + "Z" if representation.endswith("+00:00") else representation
+
+
+def validate_recurrence(attrs):
+    """dict: Returns attrs with the last occurrence of a recurring event and normalized exceptions."""
+    if not attrs.get("recurrence"):
+        attrs.pop("recurrence_exceptions", None)
+        return attrs
+    # RRULE occurrences have whole seconds, so does the first one
+    attrs["timestamp"] = attrs["timestamp"].replace(microsecond=0)
+    try:
+        attrs["recurrence_end"] = last_occurrence(attrs["recurrence"], attrs["timestamp"])
+    except ValueError as exc:
+        raise serializers.ValidationError({"recurrence": [str(exc)]})
+    exceptions = attrs.get("recurrence_exceptions") or []
+    try:
+        exceptions = serializers.ListField(child=serializers.DateTimeField()).run_validation(exceptions)
+    except serializers.ValidationError as exc:
+        raise serializers.ValidationError({"recurrence_exceptions": exc.detail})
+    attrs["recurrence_exceptions"] = sorted({format_datetime(value) for value in exceptions})
+    return attrs
+
 
+def validate_info(attrs, schemas=None):
+    """dict: Returns attrs after checking info with the active info schema of the event type.
 
-class EventSerializer(serializers.ModelSerializer):
+    Args:
+        attrs (dict): Validated data, ``event_type`` is an event type or its name
+        schemas (dict): Active schemas by event type name resolved for a whole batch, looked up when None
+    """
+    event_type = attrs.get("event_type")
+    if isinstance(event_type, EventType):
+        schema = info_schema_cache.active(event_type.pk)
+    elif schemas is not None:
+        schema = schemas.get(event_type)
+    else:
+        event_type_id = event_type_cache.lookup(event_type)
+        schema = info_schema_cache.active(event_type_id) if event_type_id is not None else None
+    errors = schema.errors(attrs.get("info")) if schema is not None else None
+    if errors:
+        raise serializers.ValidationError({"info": errors})
+    return attrs
+
+
+class EventSerializer(TimedSerializerMixin, ValidationMetricsMixin, serializers.ModelSerializer):
     """Serializer for Event Model."""
 
     event_type = serializers.CharField(max_length=256, required=True)
@@ -14,16 +69,85 @@ class EventSerializer(serializers.ModelSerializer):
         """Class with a model and model fields for serialization."""
 
         model = Event
-        fields = "__all__"
+        exclude = ("info_schema", "info_packed")
         read_only_fields = ("id", "user", "created_at")
+        extra_kwargs = {"info": {"required": True, "allow_null": False}}
 
     def validate_event_type(self, name):
         """Get existing event type or create new."""
-        event_type, _ = EventType.objects.get_or_create(name=name)
-        return event_type
+        return event_type_cache.resolve(name)
+
+    def validate(self, attrs):
+        """Validate info with the info schema and recurrence rule."""
+        return validate_recurrence(validate_info(attrs))
 
     def to_representation(self, instance):
         """Change representation user from id to username."""
         data = super().to_representation(instance)
         data["user"] = instance.user.username
         return data
+
+
+class FastEventSerializer(TimedSerializerMixin, ValidationMetricsMixin, serializers.Serializer):
+    """Explicitly declared serializer for Event Model used by the API views.
+
+    Validates and represents events the same way as EventSerializer, but without building
+    fields from model introspection on every instantiation and with the representation
+    built directly from the instance. Represented events need their user and event type
+    loaded, e.g. with select_related.
+    """
+
+    id = serializers.UUIDField(read_only=True)  # noqa: A003
+    event_type = serializers.CharField(max_length=256)
+    info = serializers.JSONField()
+    timestamp = serializers.DateTimeField(validators=[validate_datetime_is_future])
+    created_at = serializers.DateTimeField(read_only=True)
+    user = serializers.CharField(read_only=True)
+    recurrence = serializers.CharField(max_length=512, required=False, allow_blank=True)
+    recurrence_exceptions = serializers.ListField(child=serializers.DateTimeField(), required=False)
+    recurrence_end = serializers.DateTimeField(read_only=True)
+
+    def validate_event_type(self, name):
+        """Get existing event type or create new."""
+        return event_type_cache.resolve(name)
+
+    def validate(self, attrs):
+        """Validate info with the info schema and recurrence rule."""
+        return validate_recurrence(validate_info(attrs))
+
+    def create(self, validated_data):
+        """Event: Returns created event."""
+        return Event.objects.create(**validated_data)
+
+    def to_representation(self, instance):
+        """dict: Returns event with its event type name and username."""
+        return {
+            "id": str(instance.id),
+            "event_type": instance.event_type.name,
+            "info": instance.info,
+            "timestamp": format_datetime(instance.timestamp),
+            "created_at": format_datetime(instance.created_at),
+            "user": instance.user.username,
+            "recurrence": instance.recurrence,
+            "recurrence_exceptions": list(instance.recurrence_exceptions),
+            "recurrence_end": format_datetime(instance.recurrence_end) if instance.recurrence_end else None,
+        }
+
+
+class FastEventIngestSerializer(FastEventSerializer):
+    """Explicitly declared serializer for one item of a bulk ingestion request.
+
+    Event types are resolved for the whole batch at once, so ``event_type`` stays a name here.
+    Their active info schemas are taken from the ``info_schemas`` context when a batch
+    resolved them together.
+    """
+
+    def validate_event_type(self, name):
+        """Keep event type name as is."""
+        return name
+
+    def validate(self, attrs):
+        """Validate info with the info schema, unless the caller checks it itself, and recurrence rule."""
+        if self.context.get("check_info", True):
+            attrs = validate_info(attrs, self.context.get("info_schemas"))
+        return validate_recurrence(attrs)
@@ -0,0 +1,131 @@
+"""Signal receivers of the event app."""
+
+from django.conf import settings
+from django.db import transaction
+from django.db.backends.signals import connection_created
+from django.db.models.signals import post_delete, post_migrate, post_save, pre_save
+from django.dispatch import receiver
+
+from event_management.instrumentation import install_query_recorder
+from event_management.metrics import record_events_created
+
+from .cache import event_type_cache, info_schema_cache
+from .feed import publish_events
+from .info_indexes import sync_info_indexes
+from .models import Event, EventRollup, EventType, events_created
+from .rollups import count_events, record_events, rollups_suppressed
+from .search import index_packed_events
+from .upcoming import invalidate_feeds
+
+
+@receiver(pre_save, sender=EventType)
+def remember_event_type_name(sender, instance, **kwargs):
+    """Keep the stored name of an event type that is about to be renamed."""
+    if not instance._state.adding:
+        instance._stored_name = sender.objects.filter(pk=instance.pk).values_list("name", flat=True).first()
+
+
+@receiver(post_save, sender=EventType)
+def invalidate_renamed_event_type(sender, instance, created, **kwargs):
+    """Drop the cached id of a renamed event type and its cached info schema."""
+    stored_name = getattr(instance, "_stored_name", None)
+    if stored_name is not None and stored_name != instance.name:
+        event_type_cache.invalidate(stored_name)
+    info_schema_cache.invalidate(instance.pk)
+
+
+@receiver(post_delete, sender=EventType)
+def invalidate_deleted_event_type(sender, instance, **kwargs):
+    """Drop the cached id of a deleted event type and its cached info schema."""
+    event_type_cache.invalidate(instance.name)
+    info_schema_cache.invalidate(instance.pk)
+
+
+@receiver(connection_created)
+def tune_sqlite_connection(sender, connection, **kwargs):
+    """Apply SQLITE_PRAGMAS to a new SQLite connection."""
+    if connection.vendor == "sqlite":
+        with connection.cursor() as cursor:
+            for name, value in settings.SQLITE_PRAGMAS.items():
+                cursor.execute(f"PRAGMA {name} = {value}")
+
+
+@receiver(connection_created)
+def record_connection_queries(sender, connection, **kwargs):
+    """Add queries of a new connection to the measurements of the current request."""
+    install_query_recorder(connection)
+
+
+@receiver(post_migrate)
+def create_info_indexes(sender, using, **kwargs):
+    """Create and drop indexes on Event.info keys to match EVENT_INFO_INDEXED_KEYS."""
+    if sender.label == "event":
+        sync_info_indexes(using)
+
+
+@receiver(pre_save, sender=Event)
+def remember_event_rollup_key(sender, instance, using, **kwargs):
+    """Keep the stored fields that place an event that is about to be updated in its rollups."""
+    if not instance._state.adding:
+        stored = sender.objects.using(using).filter(pk=instance.pk).values("timestamp", "event_type_id", "user_id")
+        instance._stored_event = sender(**stored[0]) if stored else None
+
+
+@receiver(post_save, sender=Event)
+def invalidate_saved_event_feeds(sender, instance, using, **kwargs):
+    """Drop the upcoming event feeds of the owner of a saved event, and of its previous owner, on commit."""
+    stored = getattr(instance, "_stored_event", None)
+    user_ids = [instance.user_id] + ([stored.user_id] if stored is not None else [])
+    transaction.on_commit(lambda: invalidate_feeds(user_ids), using)
+
+
+@receiver(post_save, sender=Event)
+def index_saved_event(sender, instance, using, **kwargs):
+    """Write words of the packed info of a saved event to the search index."""
+    index_packed_events([instance], using)
+
+
+@receiver(post_delete, sender=Event)
+def invalidate_deleted_event_feed(sender, instance, using, **kwargs):
+    """Drop the upcoming event feed of the owner of a deleted event on commit."""
+    transaction.on_commit(lambda: invalidate_feeds([instance.user_id]), using)
+
+
+@receiver(post_save, sender=Event)
+def count_saved_event(sender, instance, created, using, **kwargs):
+    """Add a created event to its rollups and move an updated one between them."""
+    if created:
+        transaction.on_commit(lambda: record_events_created([instance]), using)
+        publish_events([instance], using)
+    deltas = count_events([instance])
+    stored = getattr(instance, "_stored_event", None)
+    if not created and stored is None:
+        return
+    if not created:
+        deltas.subtract(count_events([stored]))
+        instance._stored_event = None
+    EventRollup.objects.using(using).add_counts(deltas)
+
+
+@receiver(post_delete, sender=Event)
+def count_deleted_event(sender, instance, using, origin=None, **kwargs):
+    """Subtract a deleted event from its rollups.
+
+    Events deleted in cascade with their user or event type are skipped, their rollups are deleted too,
+    and so are events deleted inside ``suppress_rollups()``.
+    """
+    if rollups_suppressed():
+        return
+    if isinstance(origin, Event) or getattr(origin, "model", None) is Event:
+        record_events([instance], -1, using)
+
+
+@receiver(events_created)
+def count_created_events(sender, events, using, **kwargs):
+    """Add events inserted in bulk to their rollups, search index and metrics."""
+    record_events(events, using=using)
+    index_packed_events(events, using)
+    transaction.on_commit(lambda: record_events_created(events), using)
+    publish_events(events, using)
+    user_ids = [event.user_id for event in events]
+    transaction.on_commit(lambda: invalidate_feeds(user_ids), using)
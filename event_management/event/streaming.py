@@ -0,0 +1,136 @@
+"""This module provides the Server-Sent Events stream of created events for the ASGI application.
+
+The stream is a plain ASGI application routed by ``event_management.asgi`` because a
+Django response can't be fed from the event loop. Subscribers authenticate with a token
+header, filter with ``user`` and ``event_type`` query parameters and resume after a
+disconnect with the standard ``Last-Event-ID`` header or a ``cursor`` query parameter
+holding the id of the last event received.
+"""
+
+import asyncio
+import io
+
+from django.conf import settings
+from django.core.handlers.asgi import ASGIRequest
+
+from rest_framework import status
+from rest_framework.exceptions import APIException
+
+from user.authentication import aauthenticate_token
+
+from .feed import FeedHub
+from .renderers import ORJSONRenderer
+
+STREAM_PATH = "/api/events/stream/"
+
+
+async def send_json(send, status_code, data, headers=()):
+    """Send a complete JSON response."""
+    body = ORJSONRenderer().render(data)
+    await send(
+        {
+            "type": "http.response.start",
+            "status": status_code,
+            "headers": [(b"content-type", b"application/json"), *headers],
+        }
+    )
+    await send({"type": "http.response.body", "body": body})
+
+
+def parse_cursor(request):
+    """int: Returns sequence number to resume after or None, raises ValueError for an invalid one."""
+    cursor = request.META.get("HTTP_LAST_EVENT_ID") or request.GET.get("cursor")
+    if not cursor:
+        return None
+    cursor = int(cursor)
+    if cursor < 0:
+        raise ValueError("Cursor must not be negative.")
+    return cursor
+
+
+def format_message(seq, payload):
+    """bytes: Returns one event of the stream."""
+    return f"id: {seq}\nevent: event\ndata: {payload}\n\n".encode()
+
+
+async def iter_messages(hub, subscription, cursor):
+    """Yield messages of events after the cursor, then of events delivered to the subscription."""
+    options = settings.EVENT_FEED
+    # Events appended before the subscription are read from the feed, the hub delivers the rest
+    while cursor is not None and cursor < subscription.position:
+        rows = await asyncio.to_thread(hub.feed.read, cursor, options["BATCH_SIZE"], subscription.position)
+        if not rows:
+            break
+        for seq, user, event_type, payload in rows:
+            if subscription.matches(user, event_type):
+                yield format_message(seq, payload)
+        cursor = rows[-1][0]
+    while not subscription.overflowed:
+        try:
+            seq, user, event_type, payload = await asyncio.wait_for(subscription.queue.get(), options["HEARTBEAT"])
+        except asyncio.TimeoutError:
+            yield b": keepalive\n\n"
+            continue
+        yield format_message(seq, payload)
+
+
+async def event_stream(scope, receive, send):
+    """ASGI application streaming created events as Server-Sent Events."""
+    if not settings.EVENT_FEED["ENABLED"]:
+        return await send_json(send, status.HTTP_404_NOT_FOUND, {"detail": "Not found."})
+    if scope["method"] != "GET":
+        return await send_json(
+            send, status.HTTP_405_METHOD_NOT_ALLOWED, {"detail": f'Method "{scope["method"]}" not allowed.'}
+        )
+    request = ASGIRequest(scope, io.BytesIO())
+    try:
+        await aauthenticate_token(request)
+    except APIException as exc:
+        headers = [(b"www-authenticate", b"Token")] if exc.status_code == status.HTTP_401_UNAUTHORIZED else []
+        return await send_json(send, exc.status_code, {"detail": exc.detail}, headers)
+    try:
+        cursor = parse_cursor(request)
+    except ValueError:
+        return await send_json(send, status.HTTP_400_BAD_REQUEST, {"cursor": ["Enter a valid cursor."]})
+
+    hub = FeedHub.get()
+    subscription = await hub.subscribe(request.GET.get("user"), request.GET.get("event_type"))
+    disconnected = asyncio.create_task(wait_for_disconnect(receive))
+    try:
+        await send(
+            {
+                "type": "http.response.start",
+                "status": status.HTTP_200_OK,
+                "headers": [
+                    (b"content-type", b"text/event-stream"),
+                    (b"cache-control", b"no-cache"),
+                    (b"x-accel-buffering", b"no"),
+                ],
+            }
+        )
+        await send({"type": "http.response.body", "body": b"retry: 3000\n\n", "more_body": True})
+        await send_messages(send, iter_messages(hub, subscription, cursor), disconnected)
+    finally:
+        hub.unsubscribe(subscription)
+        disconnected.cancel()
+
+
+async def send_messages(send, messages, disconnected):
+    """Send messages until the client disconnects or the subscription overflows."""
+    while True:
+        message = asyncio.ensure_future(anext(messages, None))
+        await asyncio.wait({message, disconnected}, return_when=asyncio.FIRST_COMPLETED)
+        if disconnected.done():
+            message.cancel()
+            return
+        if message.result() is None:
+            # A subscriber too slow to keep up reconnects and resumes from its last event
+            await send({"type": "http.response.body", "body": b""})
+            return
+        await send({"type": "http.response.body", "body": message.result(), "more_body": True})
+
+
+async def wait_for_disconnect(receive):
+    """Return when the client disconnects."""
+    while (await receive())["type"] != "http.disconnect":
+        pass
@@ -3,7 +3,8 @@
 EvenModelTest (Class EvenModelTest for testing Event model):
  - Test for creating event with valid data;
  - Test for creating event with past timestamp (exception raises);
- - Test for __str__ method.
+ - Test for __str__ method;
+ - Test for time-ordered primary keys.
 
 EvenSerializerTest (Class EvenSerializerTest for testing Event serializer):
  - Test for serializer with valid data;
@@ -17,20 +18,228 @@ EvenViewTest (Class EvenViewTest for testing Event view):
  - Test for creating event using GET method (status code 405);
  - Test for creating event with None some field (status code 400);
  - Test for creating event without data (status code 400).
+
+EventBulkViewTest (Class EventBulkViewTest for testing bulk Event view):
+ - Test for creating events from a JSON array (status code 201);
+ - Test for creating events from NDJSON (status code 201);
+ - Test for reporting invalid items by index (status code 207);
+ - Test for a batch without valid items (status code 400);
+ - Test for resolving event types with a constant number of queries.
+
+EventTypeCacheTest (Class EventTypeCacheTest for testing EventType cache):
+ - Test for resolving cached event type without queries;
+ - Test for resolving many names with one query per tier;
+ - Test for invalidating renamed event type;
+ - Test for invalidating deleted event type;
+ - Test for evicting least recently used entries;
+ - Test for the shared cache tier.
+
+EventTypeCacheStaleTest (Class EventTypeCacheStaleTest for testing writes with event types deleted by another process):
+ - Test for creating events with a cached event type deleted by another process (status code 201).
+
+EventListViewTest (Class EventListViewTest for testing Event list view):
+ - Test for listing events ordered by timestamp (status code 200);
+ - Test for following keyset cursors through all pages;
+ - Test for filtering events by user, event type and timestamp range;
+ - Test for listing with invalid cursor (status code 404);
+ - Test for listing with invalid timestamp filter (status code 400);
+ - Test for constant query count whatever the page size.
+
+EventExportTest (Class EventExportTest for testing Event export):
+ - Test for exporting events as NDJSON in one query per table;
+ - Test for exporting events as CSV;
+ - Test for exporting gzip compressed events;
+ - Test for exporting filtered events;
+ - Test for exporting with unknown format (status code 400);
+ - Test for export_events command.
+
+EventAsyncViewTest (Class EventAsyncViewTest for testing async Event view):
+ - Test for creating event (status code 201);
+ - Test for creating event by not authenticated user (status code 401);
+ - Test for creating event with invalid token (status code 401);
+ - Test for creating event with past timestamp (status code 400);
+ - Test for creating event using GET method (status code 405);
+ - Test for running every middleware on the event loop;
+ - Test for serving static files on the event loop.
+
+EventWriteBehindTest (Class EventWriteBehindTest for testing write-behind mode):
+ - Test for queueing event instead of creating it (status code 202);
+ - Test for flushing queued events in batches;
+ - Test for replaying events after a crash before acknowledgement;
+ - Test for flush_event_queue command.
+
+EventWriteBehindFailureTest (Class EventWriteBehindFailureTest for testing flushes of rows that can't be committed):
+ - Test for committing a failed batch row by row and moving bad rows to the dead letters.
+
+DatabaseRouterTest (Class DatabaseRouterTest for testing primary/replica routing):
+ - Test for routing event reads to replicas and writes to the primary;
+ - Test for leaving other apps on the default database;
+ - Test for pinning a client to the primary after a write;
+ - Test for applying SQLite pragmas to new connections.
+
+EventInfoIndexTest (Class EventInfoIndexTest for testing indexed Event.info filters):
+ - Test for filtering events by indexed info keys;
+ - Test for filtering events by a number in an indexed info key as text;
+ - Test for filtering by a key that isn't indexed (status code 400);
+ - Test for using the expression index in the query plan.
+
+EventInfoIndexSyncTest (Class EventInfoIndexSyncTest for testing sync of Event.info indexes):
+ - Test for sync_info_indexes command.
+
+EventRollupTest (Class EventRollupTest for testing Event rollups):
+ - Test for counting created events in hour and day buckets;
+ - Test for counting events created in bulk once despite replays;
+ - Test for moving updated events and subtracting deleted ones;
+ - Test for deleting a user with counted events;
+ - Test for counting events by bucket and event type (status code 200);
+ - Test for counting events with unknown period (status code 400);
+ - Test for rebuild_rollups command.
+
+RequestTimingMiddlewareTest (Class RequestTimingMiddlewareTest for testing request instrumentation):
+ - Test for Server-Timing header and log line of a sampled request;
+ - Test for flagging requests over the query budget;
+ - Test for skipping measurements of unsampled requests.
+
+MetricsTest (Class MetricsTest for testing Prometheus metrics):
+ - Test for request, event, validation and cache metrics;
+ - Test for counting every query of a request once for both middlewares;
+ - Test for limiting event type label values;
+ - Test for aggregating metrics of several processes.
+
+ApiDocsTest (Class ApiDocsTest for testing pre-generated API docs):
+ - Test for serving generated schemas and docs pages with ETag;
+ - Test for not importing drf_yasg in API workers and rendering docs until they are generated.
+
+FastEventSerializerTest (Class FastEventSerializerTest for testing the declared Event serializer):
+ - Test for representing events like EventSerializer;
+ - Test for validating data like EventSerializer;
+ - Test for creating event with a new event type;
+ - Test for rendering like JSONRenderer, integers wider than 64 bits included;
+ - Test for parsing invalid JSON and integers wider than 64 bits.
+
+UpcomingEventsTest (Class UpcomingEventsTest for testing the upcoming events feed):
+ - Test for listing the next events of the user (status code 200);
+ - Test for serving repeated polling without queries;
+ - Test for dropping the feed when the user creates an event;
+ - Test for dropping events that have started from a cached feed;
+ - Test for listing with invalid limit (status code 400).
+
+EventArchiveTest (Class EventArchiveTest for testing archival of past events):
+ - Test for moving events older than the cutoff in batches;
+ - Test for listing hot and archived events in one order across pages;
+ - Test for skipping the archive when the range starts after the cutoff;
+ - Test for exporting archived events;
+ - Test for archive_events command and rollups of archived events.
+
+EventAdminTest (Class EventAdminTest for testing Event admin):
+ - Test for listing events with a bounded count and constant query count;
+ - Test for following keyset links through all pages;
+ - Test for filtering by event type name without listing event types;
+ - Test for listing with invalid cursor (redirect to error page);
+ - Test for autocomplete widgets of users and event types.
+
+RecurringEventTest (Class RecurringEventTest for testing recurring events):
+ - Test for creating a recurring event as one row (status code 201);
+ - Test for creating event with invalid recurrence (status code 400);
+ - Test for rejecting rules without occurrences in bounded time;
+ - Test for listing occurrences merged with single events across pages;
+ - Test for expanding unbounded events up to the horizon;
+ - Test for exporting occurrences;
+ - Test for listing occurrences in the upcoming events feed.
+
+EventDispatcherTest (Class EventDispatcherTest for testing the due-event dispatcher):
+ - Test for firing due events in order and saving the checkpoint;
+ - Test for firing events created after their window was loaded;
+ - Test for firing queued events flushed late and dropping events changed after they were loaded;
+ - Test for resuming from the checkpoint without firing events again;
+ - Test for splitting events between shards held by one process each;
+ - Test for firing occurrences of recurring events;
+ - Test for run_dispatcher command.
+
+EventStreamTest (Class EventStreamTest for testing the stream of created events):
+ - Test for appending created events to the change feed on commit;
+ - Test for streaming new events matching the filters;
+ - Test for resuming after the last received event;
+ - Test for reading the feed once for all subscribers;
+ - Test for stream errors (status codes 400, 401, 404 and 405).
+
+EventSearchTest (Class EventSearchTest for testing full-text search over Event.info):
+ - Test for searching words anywhere in info, best ranked first;
+ - Test for following keyset cursors through all pages;
+ - Test for keeping the index in sync on create, update and delete;
+ - Test for searching without words and with invalid cursor (status codes 400 and 404);
+ - Test for reindex_events command;
+ - Test for scanning info on databases without a search index.
+
+EventInfoSchemaTest (Class EventInfoSchemaTest for testing compact storage of Event.info):
+ - Test for packing and unpacking info with schema fields;
+ - Test for storing info of an event type with a schema packed;
+ - Test for validating info with the schema (status codes 400 and 207);
+ - Test for unpacking events with the schema version they were packed with;
+ - Test for keeping info that doesn't fit the schema as JSON;
+ - Test for filtering and searching packed info;
+ - Test for refusing lookups into info that packed events don't keep in the info column.
 """
 
+import asyncio
+import csv
+import gzip
+import io
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
 from datetime import timedelta
+from decimal import Decimal
+from unittest import mock
 
-from django.test import TestCase
+from django.conf import settings
+from django.core.cache import cache
+from django.core.exceptions import FieldError, ValidationError as DjangoValidationError
+from django.core.handlers.base import BaseHandler
+from django.core.management import CommandError, call_command
+from django.db import connection, transaction
+from django.db.models import Q, RestrictedError
+from django.http import HttpResponse
+from django.test import RequestFactory, TestCase, TransactionTestCase, override_settings
+from django.test.utils import CaptureQueriesContext
 from django.urls import reverse
 from django.utils import timezone
+from django.utils.dateparse import parse_datetime
 
 from rest_framework import status
 from rest_framework.authtoken.models import Token
-from rest_framework.exceptions import ErrorDetail, ValidationError
-from rest_framework.test import APITestCase
+from rest_framework.exceptions import ErrorDetail, ParseError, ValidationError
+from rest_framework.renderers import JSONRenderer
+from rest_framework.test import APITestCase, APITransactionTestCase
+
+from asgiref.sync import async_to_sync
+from prometheus_client import REGISTRY, generate_latest
 
-from . import factories, models, serializers
+from event_management.db import PrimaryReplicaRouter, ReplicaRoutingMiddleware, use_primary
+from event_management.instrumentation import RequestTimingMiddleware, record_query
+from event_management.metrics import OTHER_LABEL, event_type_label, get_registry
+from event_management.static import StaticFilesMiddleware
+
+from . import admin, factories, models, serializers
+from .archive import archive_cutoff, archive_events
+from .cache import EventTypeCache, LRUCache, event_type_cache, info_schema_cache
+from .dispatcher import EventDispatcher, LeaseLostError
+from .feed import FeedHub, get_change_feed, publish_events
+from .filters import filter_events
+from .identifiers import uuid7
+from .info_indexes import InfoKeyText, info_index_name, refresh_info_projections
+from .info_schemas import COMPRESSED, PLAIN, pack_info, unpack_info
+from .parsers import ORJSONParser, json_loads
+from .recurrence import last_occurrence
+from .renderers import ORJSONRenderer
+from .rollups import bucket_start
+from .search import SEARCH_TABLE, rebuild_search_index, scan_event_ids
+from .streaming import STREAM_PATH, event_stream
+from .upcoming import upcoming_events
+from .write_behind import EventQueue, EventQueueFlusher, enqueue_event, get_event_queue
 
 
 class EvenModelTest(TestCase):
@@ -38,6 +247,7 @@ class EvenModelTest(TestCase):
 
     def setUp(self):
         """Set needed info for tests."""
+        event_type_cache.clear()
         self.e_factory = factories.EventFactory
 
     def test_create_event_valid_data(self):
@@ -63,12 +273,23 @@ class EvenModelTest(TestCase):
         event = self.e_factory()
         self.assertEqual(str(event), f"{event.__class__.__name__} #{event.id}")
 
+    def test_create_event_time_ordered_ids(self):
+        """Test for time-ordered primary keys."""
+        events = [self.e_factory() for _ in range(5)]
+
+        self.assertEqual([event.id.version for event in events], [7] * 5)
+        self.assertEqual(list(models.Event.objects.all()), events)
+        created_at = events[0].created_at
+        milliseconds = int(created_at.timestamp()) * 1000 + created_at.microsecond // 1000
+        self.assertEqual(uuid7(created_at).bytes[:6], milliseconds.to_bytes(6, "big"))
+
 
 class EvenSerializerTest(TestCase):
     """Class EvenSerializerTest for testing Event serializer."""
 
     def setUp(self):
         """Set needed info for tests."""
+        event_type_cache.clear()
         self.user = factories.UserFactory()
         self.event_type = factories.EventTypeFactory()
         self.valid_data = {
@@ -126,6 +347,7 @@ class EvenViewTest(APITestCase):
 
     def setUp(self):
         """Set needed info for tests."""
+        event_type_cache.clear()
         self.create_event_url = "event:create-event"
         self.event_type = factories.EventTypeFactory()
         self.event_data = factories.EventFactory.build()
@@ -188,3 +410,2005 @@ class EvenViewTest(APITestCase):
                 "timestamp": [ErrorDetail(string="This field is required.", code="required")],
             },
         )
+
+
+class EventBulkViewTest(APITestCase):
+    """Class EventBulkViewTest for testing bulk Event view."""
+
+    def setUp(self):
+        """Set needed info for tests."""
+        event_type_cache.clear()
+        info_schema_cache.clear()
+        self.bulk_url = reverse("event:bulk-create-event")
+        self.user = factories.UserFactory()
+        self.event_type = factories.EventTypeFactory()
+        self.timestamp = timezone.now() + timedelta(days=1)
+        self.items = [
+            {"event_type": self.event_type.name, "info": {"n": 1}, "timestamp": self.timestamp.isoformat()},
+            {"event_type": "new type", "info": {"n": 2}, "timestamp": self.timestamp.isoformat()},
+        ]
+        self.token = Token.objects.create(user=self.user)
+        self.client.credentials(HTTP_AUTHORIZATION=f"Token {self.token.key}")
+
+    def test_bulk_create_json_array(self):
+        """Test for creating events from a JSON array (status code 201)."""
+        response = self.client.post(self.bulk_url, self.items, format="json")
+
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual([item["index"] for item in response.data["created"]], [0, 1])
+        self.assertEqual(response.data["errors"], [])
+        self.assertEqual(models.Event.objects.filter(user=self.user).count(), 2)
+        self.assertTrue(models.EventType.objects.filter(name="new type").exists())
+
+    def test_bulk_create_ndjson(self):
+        """Test for creating events from NDJSON (status code 201)."""
+        body = "\n".join(json.dumps(item) for item in self.items) + "\n"
+        response = self.client.post(self.bulk_url, body, content_type="application/x-ndjson")
+
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(models.Event.objects.count(), 2)
+
+    def test_bulk_create_reports_invalid_items(self):
+        """Test for reporting invalid items by index (status code 207)."""
+        past = (timezone.now() - timedelta(days=1)).isoformat()
+        items = [self.items[0], {**self.items[1], "timestamp": past}, {"info": {}}]
+        response = self.client.post(self.bulk_url, items, format="json")
+
+        self.assertEqual(response.status_code, status.HTTP_207_MULTI_STATUS)
+        self.assertEqual(len(response.data["created"]), 1)
+        self.assertEqual([error["index"] for error in response.data["errors"]], [1, 2])
+        self.assertEqual(
+            response.data["errors"][0]["errors"],
+            {"timestamp": [ErrorDetail(string="DateTime value should have future datetime.", code="invalid")]},
+        )
+        self.assertEqual(models.Event.objects.count(), 1)
+
+    def test_bulk_create_without_valid_items_fail(self):
+        """Test for a batch without valid items (status code 400)."""
+        response = self.client.post(self.bulk_url, [{"info": {}}], format="json")
+
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(response.data["created"], [])
+        self.assertEqual(models.Event.objects.count(), 0)
+
+    def test_bulk_create_query_count_is_constant(self):
+        """Test for resolving event types with a constant number of queries."""
+        items = [{**self.items[index % 2], "info": {"n": index}} for index in range(50)]
+        self.client.post(self.bulk_url, items[:2], format="json")
+
+        # savepoint, event insert, rollup upsert and release, the token and event types come from the caches
+        with self.assertNumQueries(4):
+            response = self.client.post(self.bulk_url, items, format="json")
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+
+        items = [{**self.items[0], "event_type": "unseen", "info": {"n": index}} for index in range(200)]
+        with CaptureQueriesContext(connection) as captured:
+            response = self.client.post(self.bulk_url, items, format="json")
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        # info schemas of the batch, event type select, insert and select and the info schema of the new type
+        self.assertEqual(len([query for query in captured if '"event_eventtype"' in query["sql"]]), 5)
+
+
+class EventTypeCacheTest(TestCase):
+    """Class EventTypeCacheTest for testing EventType cache."""
+
+    def setUp(self):
+        """Set needed info for tests."""
+        event_type_cache.clear()
+        self.event_type = factories.EventTypeFactory()
+
+    def test_resolve_cached_without_queries(self):
+        """Test for resolving cached event type without queries."""
+        self.assertEqual(event_type_cache.resolve(self.event_type.name), self.event_type)
+        with self.assertNumQueries(0):
+            event_type = event_type_cache.resolve(self.event_type.name)
+
+        self.assertEqual(event_type.pk, self.event_type.pk)
+        self.assertEqual(event_type.name, self.event_type.name)
+        self.assertEqual(event_type_cache.stats()["local_hits"], 1)
+        self.assertEqual(event_type_cache.stats()["misses"], 1)
+
+    def test_resolve_many(self):
+        """Test for resolving many names with one query per tier."""
+        names = [self.event_type.name, "first new", "second new"]
+        # lookup of all names, insert of missing, lookup of inserted
+        with self.assertNumQueries(3):
+            event_types = event_type_cache.resolve_many(names)
+
+        self.assertEqual(set(event_types), set(names))
+        self.assertEqual(models.EventType.objects.filter(name__in=names).count(), 3)
+        with self.assertNumQueries(0):
+            event_type_cache.resolve_many(names)
+
+    def test_invalidate_renamed(self):
+        """Test for invalidating renamed event type."""
+        old_name = self.event_type.name
+        event_type_cache.resolve(old_name)
+        self.event_type.name = "renamed"
+        self.event_type.save()
+
+        event_type = event_type_cache.resolve(old_name)
+        self.assertNotEqual(event_type.pk, self.event_type.pk)
+
+    def test_invalidate_deleted(self):
+        """Test for invalidating deleted event type."""
+        name = self.event_type.name
+        event_type_cache.resolve(name)
+        self.event_type.delete()
+
+        event_type = event_type_cache.resolve(name)
+        self.assertTrue(models.EventType.objects.filter(pk=event_type.pk).exists())
+
+    def test_lru_eviction(self):
+        """Test for evicting least recently used entries."""
+        cache = LRUCache(maxsize=2)
+        cache.set("a", 1)
+        cache.set("b", 2)
+        cache.get("a")
+        cache.set("c", 3)
+
+        self.assertEqual(cache.get("a"), 1)
+        self.assertIsNone(cache.get("b"))
+        self.assertEqual(len(cache), 2)
+
+    @override_settings(CACHES={"default": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache"}})
+    def test_shared_tier(self):
+        """Test for the shared cache tier."""
+        first, second = EventTypeCache(alias="default"), EventTypeCache(alias="default")
+        first.resolve(self.event_type.name)
+        with self.assertNumQueries(0):
+            event_type = second.resolve(self.event_type.name)
+
+        self.assertEqual(event_type.pk, self.event_type.pk)
+        self.assertEqual(second.stats()["shared_hits"], 1)
+        # another process renames the type, the entry second keeps locally is stale
+        models.EventType.objects.filter(pk=self.event_type.pk).update(name="renamed")
+        first.invalidate(self.event_type.name)
+        self.assertEqual(second.get_many([self.event_type.name]), {})
+        self.assertNotEqual(second.resolve(self.event_type.name).pk, self.event_type.pk)
+
+
+class EventTypeCacheStaleTest(APITransactionTestCase):
+    """Class EventTypeCacheStaleTest for testing writes with event types deleted by another process.
+
+    Foreign keys are checked on commit, so the writes run outside of a test transaction.
+    """
+
+    def setUp(self):
+        """Set needed info for tests."""
+        event_type_cache.clear()
+        self.user = factories.UserFactory()
+        self.token = Token.objects.create(user=self.user)
+        self.client.credentials(HTTP_AUTHORIZATION=f"Token {self.token.key}")
+
+    def stale_event_type(self, name):
+        """int: Returns id of an event type deleted while this process still has it cached."""
+        pk = event_type_cache.resolve(name).pk
+        models.EventType.objects.filter(pk=pk)._raw_delete("default")
+        return pk
+
+    def test_create_with_stale_event_type(self):
+        """Test for creating events with a cached event type deleted by another process (status code 201)."""
+        data = {"info": {}, "timestamp": (timezone.now() + timedelta(days=1)).isoformat()}
+        stale_pk = self.stale_event_type("gone")
+        response = self.client.post(reverse("event:create-event"), {**data, "event_type": "gone"}, format="json")
+
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        event = models.Event.objects.get(pk=response.json()["id"])
+        self.assertEqual(event.event_type.name, "gone")
+        self.assertNotEqual(event.event_type_id, stale_pk)
+
+        self.stale_event_type("bulk gone")
+        items = [{**data, "event_type": "bulk gone"}, {**data, "event_type": "gone"}]
+        response = self.client.post(reverse("event:bulk-create-event"), items, format="json")
+
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(models.Event.objects.filter(event_type__name="bulk gone").count(), 1)
+
+
+class EventListViewTest(APITestCase):
+    """Class EventListViewTest for testing Event list view."""
+
+    def setUp(self):
+        """Set needed info for tests."""
+        self.list_url = reverse("event:list-events")
+        self.user = factories.UserFactory()
+        self.event_type = factories.EventTypeFactory()
+        start = timezone.now() + timedelta(days=1)
+        self.events = [
+            factories.EventFactory(
+                user=self.user if index % 2 else factories.UserFactory(),
+                event_type=self.event_type,
+                timestamp=start + timedelta(hours=index // 2),
+            )
+            for index in range(10)
+        ]
+        self.events.sort(key=lambda event: (event.timestamp, event.id))
+        self.token = Token.objects.create(user=self.user)
+        self.client.credentials(HTTP_AUTHORIZATION=f"Token {self.token.key}")
+
+    def test_list_events(self):
+        """Test for listing events ordered by timestamp (status code 200)."""
+        response = self.client.get(self.list_url)
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertIsNone(response.data["next"])
+        self.assertEqual([item["id"] for item in response.data["results"]], [str(e.id) for e in self.events])
+        self.assertEqual(response.data["results"][0]["user"], self.events[0].user.username)
+        self.assertEqual(response.data["results"][0]["event_type"], self.event_type.name)
+
+    def test_list_events_pages(self):
+        """Test for following keyset cursors through all pages."""
+        ids, url = [], f"{self.list_url}?page_size=3"
+        while url:
+            response = self.client.get(url)
+            self.assertLessEqual(len(response.data["results"]), 3)
+            ids.extend(item["id"] for item in response.data["results"])
+            url = response.data["next"]
+
+        self.assertEqual(ids, [str(event.id) for event in self.events])
+
+    def test_list_events_filters(self):
+        """Test for filtering events by user, event type and timestamp range."""
+        after, before = self.events[2].timestamp, self.events[8].timestamp
+        expected = [e for e in self.events if e.user == self.user and after <= e.timestamp < before]
+        response = self.client.get(
+            self.list_url,
+            {
+                "user": self.user.username,
+                "event_type": self.event_type.name,
+                "timestamp_after": after.isoformat(),
+                "timestamp_before": before.isoformat(),
+            },
+        )
+
+        self.assertEqual([item["id"] for item in response.data["results"]], [str(e.id) for e in expected])
+        response = self.client.get(self.list_url, {"event_type": "no such event type"})
+        self.assertEqual(response.data["results"], [])
+
+    def test_list_events_invalid_cursor_fail(self):
+        """Test for listing with invalid cursor (status code 404)."""
+        response = self.client.get(self.list_url, {"cursor": "invalid"})
+
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+
+    def test_list_events_invalid_timestamp_fail(self):
+        """Test for listing with invalid timestamp filter (status code 400)."""
+        response = self.client.get(self.list_url, {"timestamp_after": "tomorrow"})
+
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(
+            response.data, {"timestamp_after": [ErrorDetail(string="Enter a valid datetime.", code="invalid")]}
+        )
+
+    def test_list_events_query_count(self):
+        """Test for constant query count whatever the page size."""
+        self.client.get(self.list_url, {"page_size": 1})
+        for page_size in (1, 5, 10):
+            with self.subTest(page_size=page_size):
+                # one joined page query per table, hot and archived, one for recurring events,
+                # the token comes from the cache
+                with self.assertNumQueries(3):
+                    response = self.client.get(self.list_url, {"page_size": page_size})
+                self.assertEqual(len(response.data["results"]), page_size)
+
+
+class EventExportTest(APITestCase):
+    """Class EventExportTest for testing Event export."""
+
+    def setUp(self):
+        """Set needed info for tests."""
+        self.export_url = reverse("event:export-events")
+        self.user = factories.UserFactory()
+        self.events = sorted(factories.EventFactory.create_batch(5), key=lambda event: (event.timestamp, event.id))
+        self.token = Token.objects.create(user=self.user)
+        self.client.credentials(HTTP_AUTHORIZATION=f"Token {self.token.key}")
+
+    def test_export_ndjson(self):
+        """Test for exporting events as NDJSON in one query per table."""
+        response = self.client.get(self.export_url)
+        with self.assertNumQueries(2):
+            rows = [json.loads(line) for line in b"".join(response.streaming_content).splitlines()]
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response["Content-Type"], "application/x-ndjson")
+        self.assertEqual([row["id"] for row in rows], [str(event.id) for event in self.events])
+        self.assertEqual(rows[0]["user"], self.events[0].user.username)
+        self.assertEqual(rows[0]["event_type"], self.events[0].event_type.name)
+        self.assertEqual(rows[0]["info"], self.events[0].info)
+        self.assertEqual(rows[0]["created_at"], self.events[0].created_at.isoformat())
+
+    def test_export_csv(self):
+        """Test for exporting events as CSV."""
+        response = self.client.get(self.export_url, {"output": "csv"})
+        rows = list(csv.DictReader(io.StringIO(b"".join(response.streaming_content).decode())))
+
+        self.assertEqual(response["Content-Type"], "text/csv")
+        self.assertEqual([row["id"] for row in rows], [str(event.id) for event in self.events])
+        self.assertEqual(json.loads(rows[0]["info"]), self.events[0].info)
+
+    def test_export_gzip(self):
+        """Test for exporting gzip compressed events."""
+        response = self.client.get(self.export_url, {"gzip": "1"})
+        lines = gzip.decompress(b"".join(response.streaming_content)).splitlines()
+
+        self.assertEqual(response["Content-Type"], "application/gzip")
+        self.assertIn('filename="events.ndjson.gz"', response["Content-Disposition"])
+        self.assertEqual(len(lines), len(self.events))
+
+    def test_export_filtered(self):
+        """Test for exporting filtered events."""
+        event = self.events[0]
+        response = self.client.get(self.export_url, {"event_type": event.event_type.name, "user": event.user.username})
+        rows = [json.loads(line) for line in b"".join(response.streaming_content).splitlines()]
+
+        self.assertEqual([row["id"] for row in rows], [str(event.id)])
+
+    def test_export_unknown_format_fail(self):
+        """Test for exporting with unknown format (status code 400)."""
+        response = self.client.get(self.export_url, {"output": "xml"})
+
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_export_events_command(self):
+        """Test for export_events command."""
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "events.csv.gz")
+            call_command("export_events", "--format", "csv", "--gzip", "--output", path, "--chunk-size", "2")
+            with gzip.open(path, "rt") as exported:
+                rows = list(csv.DictReader(exported))
+
+        self.assertEqual([row["id"] for row in rows], [str(event.id) for event in self.events])
+
+
+class EventAsyncViewTest(TestCase):
+    """Class EventAsyncViewTest for testing async Event view."""
+
+    def setUp(self):
+        """Set needed info for tests."""
+        event_type_cache.clear()
+        self.create_url = reverse("event:async-create-event")
+        self.user = factories.UserFactory()
+        self.event_type = factories.EventTypeFactory()
+        self.valid_data = {
+            "event_type": self.event_type.name,
+            "info": {"username": self.user.username},
+            "timestamp": (timezone.now() + timedelta(days=1)).isoformat(),
+        }
+        self.token = Token.objects.create(user=self.user)
+        # AsyncClient sends extra arguments as headers
+        self.headers = {"AUTHORIZATION": f"Token {self.token.key}"}
+
+    async def test_create_event(self):
+        """Test for creating event (status code 201)."""
+        response = await self.async_client.post(
+            self.create_url, self.valid_data, content_type="application/json", **self.headers,
+        )
+        data = response.json()
+
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(data["event_type"], self.event_type.name)
+        self.assertEqual(data["user"], self.user.username)
+        self.assertEqual(data["info"], self.valid_data["info"])
+        event = await models.Event.objects.select_related("user").aget(pk=data["id"])
+        self.assertEqual(event.user, self.user)
+
+    async def test_create_event_user_not_authenticated_error(self):
+        """Test for creating event by not authenticated user (status code 401)."""
+        response = await self.async_client.post(self.create_url, self.valid_data, content_type="application/json")
+
+        self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
+        self.assertEqual(response.json(), {"detail": "Authentication credentials were not provided."})
+
+    async def test_create_event_invalid_token_error(self):
+        """Test for creating event with invalid token (status code 401)."""
+        response = await self.async_client.post(
+            self.create_url, self.valid_data, content_type="application/json", AUTHORIZATION="Token invalid",
+        )
+
+        self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
+        self.assertEqual(response.json(), {"detail": "Invalid token."})
+
+    async def test_create_event_past_timestamp_fail(self):
+        """Test for creating event with past timestamp (status code 400)."""
+        data = {**self.valid_data, "timestamp": (timezone.now() - timedelta(days=1)).isoformat()}
+        response = await self.async_client.post(self.create_url, data, content_type="application/json", **self.headers)
+
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(response.json(), {"timestamp": ["DateTime value should have future datetime."]})
+
+    async def test_create_event_get_method_fail(self):
+        """Test for creating event using GET method (status code 405)."""
+        response = await self.async_client.get(self.create_url, **self.headers)
+
+        self.assertEqual(response.status_code, status.HTTP_405_METHOD_NOT_ALLOWED)
+
+    async def test_middleware_on_event_loop(self):
+        """Test for running every middleware on the event loop."""
+        # Django logs every middleware it has to adapt to a thread when DEBUG is on
+        with override_settings(DEBUG=True), self.assertNoLogs("django.request", "DEBUG"):
+            BaseHandler().load_middleware(is_async=True)
+
+        options = {"SAMPLE_RATE": 1.0, "QUERY_BUDGET": 20, "LATENCY_BUDGET_MS": 10_000, "SERVER_TIMING_HEADER": True}
+        with override_settings(INSTRUMENTATION=options):
+            with self.assertLogs("event_management.instrumentation", "INFO") as logs:
+                response = await self.async_client.post(
+                    self.create_url, self.valid_data, content_type="application/json", **self.headers,
+                )
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertGreater(json.loads(logs.records[0].getMessage())["queries"], 0)
+
+    async def test_static_files_on_event_loop(self):
+        """Test for serving static files on the event loop."""
+        async def get_response(request):
+            return HttpResponse("view")
+
+        with override_settings(WHITENOISE_USE_FINDERS=True, WHITENOISE_AUTOREFRESH=False):
+            middleware = StaticFilesMiddleware(get_response)
+        factory = RequestFactory()
+
+        response = await middleware(factory.get(f"{settings.STATIC_URL}admin/css/base.css"))
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response["Content-Type"], 'text/css; charset="utf-8"')
+        response = await middleware(factory.get("/api/events/"))
+        self.assertEqual(response.content, b"view")
+
+
+class EventWriteBehindTest(APITestCase):
+    """Class EventWriteBehindTest for testing write-behind mode."""
+
+    def setUp(self):
+        """Set needed info for tests."""
+        event_type_cache.clear()
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        settings_override = override_settings(
+            EVENT_WRITE_BEHIND=True, EVENT_QUEUE_PATH=os.path.join(directory.name, "queue.sqlite3")
+        )
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
+
+        self.create_url = reverse("event:create-event")
+        self.user = factories.UserFactory()
+        self.valid_data = {
+            "event_type": "queued type",
+            "info": {"username": self.user.username},
+            "timestamp": timezone.now() + timedelta(days=1),
+        }
+        self.token = Token.objects.create(user=self.user)
+        self.client.credentials(HTTP_AUTHORIZATION=f"Token {self.token.key}")
+
+    def test_create_event_queued(self):
+        """Test for queueing event instead of creating it (status code 202)."""
+        response = self.client.post(self.create_url, self.valid_data, format="json")
+
+        self.assertEqual(response.status_code, status.HTTP_202_ACCEPTED)
+        self.assertEqual(get_event_queue().depth(), 1)
+        self.assertFalse(models.Event.objects.exists())
+        self.assertFalse(models.EventType.objects.filter(name="queued type").exists())
+
+        EventQueueFlusher(get_event_queue(), batch_size=10).flush()
+        event = models.Event.objects.get()
+        self.assertEqual(event.id, response.data["id"])
+        self.assertEqual(event.user, self.user)
+        self.assertEqual(event.event_type.name, "queued type")
+        self.assertEqual(event.timestamp, self.valid_data["timestamp"])
+
+    def test_flush_batches(self):
+        """Test for flushing queued events in batches."""
+        for _ in range(5):
+            self.client.post(self.create_url, self.valid_data, format="json")
+        flusher = EventQueueFlusher(get_event_queue(), batch_size=2)
+
+        self.assertEqual(flusher.flush(), 5)
+        self.assertEqual(models.Event.objects.count(), 5)
+        self.assertEqual(flusher.stats()["queue_depth"], 0)
+        self.assertEqual(flusher.stats()["batches"], 3)
+
+    def test_flush_replay_after_crash(self):
+        """Test for replaying events after a crash before acknowledgement."""
+        response = self.client.post(self.create_url, self.valid_data, format="json")
+        queue = get_event_queue()
+        with mock.patch.object(EventQueue, "ack", side_effect=RuntimeError("crash")):
+            with self.assertRaises(RuntimeError):
+                EventQueueFlusher(queue, batch_size=10).flush()
+        self.assertEqual(queue.depth(), 1)
+
+        restarted = EventQueue(queue.path)
+        EventQueueFlusher(restarted, batch_size=10).flush()
+        self.assertEqual(restarted.depth(), 0)
+        self.assertEqual(list(models.Event.objects.values_list("id", flat=True)), [response.data["id"]])
+
+    def test_flush_event_queue_command(self):
+        """Test for flush_event_queue command."""
+        self.client.post(self.create_url, self.valid_data, format="json")
+        call_command("flush_event_queue", "--once", stdout=io.StringIO())
+
+        self.assertEqual(models.Event.objects.count(), 1)
+        self.assertEqual(get_event_queue().depth(), 0)
+
+
+class EventWriteBehindFailureTest(TransactionTestCase):
+    """Class EventWriteBehindFailureTest for testing flushes of rows that can't be committed.
+
+    Foreign keys are checked on commit, so the flushes run outside of a test transaction.
+    """
+
+    def setUp(self):
+        """Set needed info for tests."""
+        event_type_cache.clear()
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        settings_override = override_settings(
+            EVENT_WRITE_BEHIND=True, EVENT_QUEUE_PATH=os.path.join(directory.name, "queue.sqlite3")
+        )
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
+        self.user = factories.UserFactory()
+
+    def test_dead_letters(self):
+        """Test for committing a failed batch row by row and moving bad rows to the dead letters."""
+        deleted_user = factories.UserFactory()
+        data = {"info": {}, "timestamp": timezone.now() + timedelta(days=1)}
+        ids = [
+            enqueue_event({**data, "event_type": "kept"}, self.user),
+            enqueue_event({**data, "event_type": "kept"}, deleted_user),
+            enqueue_event({**data, "event_type": "gone"}, self.user),
+        ]
+        deleted_user.delete()
+        # an event type deleted by another process, whose id is still cached here
+        event_type_cache.resolve_many(["gone"])
+        models.EventType.objects.filter(name="gone")._raw_delete("default")
+        queue = get_event_queue()
+        self.assertGreater(queue.lag(), 0)
+        flusher = EventQueueFlusher(queue, batch_size=10)
+
+        with self.assertLogs("event.write_behind", "WARNING") as logs:
+            self.assertEqual(flusher.flush(), 3)
+        self.assertEqual(len(logs.records), 2)
+        self.assertEqual(set(models.Event.objects.values_list("id", flat=True)), {ids[0], ids[2]})
+        self.assertEqual(models.Event.objects.get(pk=ids[2]).event_type.name, "gone")
+        (seq, item, error), = queue.dead_letters()
+        self.assertEqual(item["id"], str(ids[1]))
+        self.assertIn("FOREIGN KEY", error)
+        self.assertEqual((queue.depth(), queue.lag(), flusher.stats()["dead"]), (0, 0.0, 1))
+
+        enqueue_event({**data, "event_type": "kept"}, self.user)
+        metrics = generate_latest(get_registry()).decode()
+        self.assertIn("event_queue_depth 1.0", metrics)
+        self.assertIn("event_queue_dead_letters 1.0", metrics)
+        self.assertIn("event_queue_lag_seconds", metrics)
+
+
+@override_settings(DATABASE_REPLICAS=["replica0"])
+class DatabaseRouterTest(TestCase):
+    """Class DatabaseRouterTest for testing primary/replica routing."""
+
+    def setUp(self):
+        """Set needed info for tests."""
+        self.router = PrimaryReplicaRouter()
+        self.factory = RequestFactory()
+
+    def request(self, write=False, token="key"):
+        """Run request through the middleware and return database used for reading events."""
+        routed = {}
+
+        def view(request):
+            if write:
+                self.router.db_for_write(models.Event)
+            routed["read"] = self.router.db_for_read(models.Event)
+            return HttpResponse()
+
+        ReplicaRoutingMiddleware(view)(self.factory.get("/", HTTP_AUTHORIZATION=f"Token {token}"))
+        return routed["read"]
+
+    def test_route_reads_and_writes(self):
+        """Test for routing event reads to replicas and writes to the primary."""
+        self.assertEqual(self.router.db_for_read(models.Event), "replica0")
+        self.assertEqual(self.router.db_for_write(models.Event), "default")
+        with use_primary():
+            self.assertEqual(self.router.db_for_read(models.Event), "default")
+
+    def test_route_other_apps(self):
+        """Test for leaving other apps on the default database."""
+        self.assertIsNone(self.router.db_for_read(models.User))
+
+    def test_pin_client_after_write(self):
+        """Test for pinning a client to the primary after a write."""
+        self.assertEqual(self.request(token="writer"), "replica0")
+        self.assertEqual(self.request(write=True, token="writer"), "default")
+        self.assertEqual(self.request(token="writer"), "default")
+        self.assertEqual(self.request(token="reader"), "replica0")
+
+    def test_sqlite_pragmas(self):
+        """Test for applying SQLite pragmas to new connections."""
+        with connection.cursor() as cursor:
+            cursor.execute("PRAGMA temp_store")
+            self.assertEqual(cursor.fetchone()[0], 2)
+
+
+class EventInfoIndexTest(APITestCase):
+    """Class EventInfoIndexTest for testing indexed Event.info filters."""
+
+    def setUp(self):
+        """Set needed info for tests."""
+        self.list_url = reverse("event:list-events")
+        self.user = factories.UserFactory()
+        self.token = Token.objects.create(user=self.user)
+        self.client.credentials(HTTP_AUTHORIZATION=f"Token {self.token.key}")
+        self.events = [
+            factories.EventFactory(info={"username": username, "source": source})
+            for username, source in (("alice", "web"), ("bob", "web"), ("bob", "mobile"), ("carol", 42))
+        ]
+
+    def test_filter_info(self):
+        """Test for filtering events by indexed info keys."""
+        response = self.client.get(self.list_url, {"info__username": "bob", "info__source": "web"})
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual([item["id"] for item in response.data["results"]], [str(self.events[1].id)])
+
+    def test_filter_info_number(self):
+        """Test for filtering events by a number in an indexed info key as text."""
+        response = self.client.get(self.list_url, {"info__source": "42"})
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual([item["id"] for item in response.data["results"]], [str(self.events[3].id)])
+
+    def test_filter_info_not_indexed_fail(self):
+        """Test for filtering by a key that isn't indexed (status code 400)."""
+        response = self.client.get(self.list_url, {"info__browser": "firefox"})
+
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn("info__browser", response.data)
+        with self.assertRaises(ValueError):
+            InfoKeyText("user name")
+
+    def test_filter_info_uses_index(self):
+        """Test for using the expression index in the query plan."""
+        plan = filter_events(models.Event.objects.all(), {"info__username": "bob"}).explain()
+
+        self.assertIn(info_index_name("username"), plan)
+        self.assertEqual(len(info_index_name("a_long_info_key_name")), 30)
+
+
+class EventInfoIndexSyncTest(TransactionTestCase):
+    """Class EventInfoIndexSyncTest for testing sync of Event.info indexes outside of a transaction."""
+
+    def test_sync_info_indexes_command(self):
+        """Test for sync_info_indexes command."""
+        with connection.cursor() as cursor:
+            cursor.execute("CREATE INDEX event_info_search_idx ON event_event (timestamp)")
+        out = io.StringIO()
+        call_command("sync_info_indexes", stdout=out)
+        self.assertEqual(out.getvalue(), "Indexes are up to date.\n")
+        with connection.cursor() as cursor:
+            cursor.execute("DROP INDEX event_info_search_idx")
+
+        with override_settings(EVENT_INFO_INDEXED_KEYS=["username", "country"]):
+            out = io.StringIO()
+            call_command("sync_info_indexes", "--dry-run", stdout=out)
+            self.assertEqual(
+                out.getvalue(),
+                f"Create index {info_index_name('country')}\nDrop index {info_index_name('source')}\n",
+            )
+            call_command("sync_info_indexes", stdout=io.StringIO())
+            with connection.cursor() as cursor:
+                names = connection.introspection.get_constraints(cursor, models.Event._meta.db_table)
+            self.assertIn(info_index_name("country"), names)
+            self.assertNotIn(info_index_name("source"), names)
+        call_command("sync_info_indexes", stdout=io.StringIO())
+
+
+class EventRollupTest(APITestCase):
+    """Class EventRollupTest for testing Event rollups."""
+
+    def setUp(self):
+        """Set needed info for tests."""
+        event_type_cache.clear()
+        self.stats_url = reverse("event:event-stats")
+        self.user = factories.UserFactory()
+        self.event_type = factories.EventTypeFactory()
+        self.token = Token.objects.create(user=self.user)
+        self.client.credentials(HTTP_AUTHORIZATION=f"Token {self.token.key}")
+        self.timestamp = (timezone.now() + timedelta(days=2)).replace(minute=10)
+
+    def counts(self, period="hour"):
+        """Return rollup counts of the period by bucket."""
+        rollups = models.EventRollup.objects.filter(period=period, count__gt=0)
+        return dict(rollups.values_list("bucket", "count"))
+
+    def test_count_created_events(self):
+        """Test for counting created events in hour and day buckets."""
+        data = {"event_type": self.event_type.name, "info": {}, "timestamp": self.timestamp.isoformat()}
+        self.client.post(reverse("event:create-event"), data, format="json")
+        factories.EventFactory(user=self.user, event_type=self.event_type, timestamp=self.timestamp)
+
+        self.assertEqual(self.counts(), {bucket_start(self.timestamp, "hour"): 2})
+        self.assertEqual(self.counts("day"), {bucket_start(self.timestamp, "day"): 2})
+
+    def test_count_bulk_created_events(self):
+        """Test for counting events created in bulk once despite replays."""
+        items = [
+            {"id": uuid7(), "event_type": self.event_type.name, "info": {}, "timestamp": self.timestamp}
+            for _ in range(3)
+        ]
+        models.Event.objects.ingest(items, user=self.user)
+        replayed = items + [{**items[0], "id": uuid7()}]
+        created = models.Event.objects.ingest(replayed, ignore_conflicts=True, user=self.user)
+
+        self.assertEqual(len(created), 1)
+        self.assertEqual(self.counts(), {bucket_start(self.timestamp, "hour"): 4})
+
+    def test_count_updated_and_deleted_events(self):
+        """Test for moving updated events and subtracting deleted ones."""
+        event = factories.EventFactory(user=self.user, event_type=self.event_type, timestamp=self.timestamp)
+        factories.EventFactory(user=self.user, event_type=self.event_type, timestamp=self.timestamp)
+        event.timestamp += timedelta(hours=1)
+        event.save()
+
+        self.assertEqual(
+            self.counts(), {bucket_start(self.timestamp, "hour"): 1, bucket_start(event.timestamp, "hour"): 1}
+        )
+        models.Event.objects.all().delete()
+        self.assertEqual(self.counts(), {})
+
+    def test_delete_user_with_events(self):
+        """Test for deleting a user with counted events."""
+        factories.EventFactory(user=self.user, event_type=self.event_type, timestamp=self.timestamp)
+        self.user.delete()
+
+        self.assertFalse(models.EventRollup.objects.exists())
+
+    def test_stats(self):
+        """Test for counting events by bucket and event type (status code 200)."""
+        other_type = factories.EventTypeFactory()
+        for offset, event_type in ((0, self.event_type), (0, self.event_type), (0, other_type), (1, other_type)):
+            factories.EventFactory(event_type=event_type, timestamp=self.timestamp + timedelta(hours=offset))
+        factories.EventFactory(user=self.user, event_type=self.event_type, timestamp=self.timestamp)
+        hour = bucket_start(self.timestamp, "hour")
+
+        before = hour + timedelta(hours=1)
+        response = self.client.get(
+            self.stats_url, {"timestamp_after": self.timestamp.isoformat(), "timestamp_before": before.isoformat()}
+        )
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(
+            response.data,
+            {
+                "period": "hour",
+                "results": [
+                    {"bucket": hour, "event_type": self.event_type.name, "count": 3},
+                    {"bucket": hour, "event_type": other_type.name, "count": 1},
+                ],
+            },
+        )
+        response = self.client.get(self.stats_url, {"period": "day", "user": self.user.username})
+        self.assertEqual(
+            response.data["results"],
+            [{"bucket": bucket_start(self.timestamp, "day"), "event_type": self.event_type.name, "count": 1}],
+        )
+
+    def test_stats_invalid_period_fail(self):
+        """Test for counting events with unknown period (status code 400)."""
+        response = self.client.get(self.stats_url, {"period": "week"})
+
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_rebuild_rollups_command(self):
+        """Test for rebuild_rollups command."""
+        events = [
+            factories.EventFactory(user=self.user, event_type=self.event_type, timestamp=self.timestamp)
+            for _ in range(3)
+        ]
+        # writes bypassing the ORM leave rollups behind
+        moved = self.timestamp + timedelta(days=1)
+        models.EventRollup.objects.all().delete()
+        models.Event.objects.filter(pk=events[0].pk).update(timestamp=moved)
+        expected = {bucket_start(self.timestamp, "hour"): 2, bucket_start(moved, "hour"): 1}
+
+        out = io.StringIO()
+        call_command("rebuild_rollups", "--dry-run", stdout=out)
+        self.assertEqual(out.getvalue(), "Rollup rows created: 4, updated: 0, deleted: 0\n")
+        self.assertEqual(self.counts(), {})
+        call_command("rebuild_rollups", stdout=io.StringIO())
+        self.assertEqual(self.counts(), expected)
+
+        models.EventRollup.objects.filter(period="hour").update(count=10)
+        out = io.StringIO()
+        call_command("rebuild_rollups", "--since", self.timestamp.isoformat(), stdout=out)
+        self.assertEqual(out.getvalue(), "Rollup rows created: 0, updated: 2, deleted: 0\n")
+        self.assertEqual(self.counts(), expected)
+
+
+class RequestTimingMiddlewareTest(APITestCase):
+    """Class RequestTimingMiddlewareTest for testing request instrumentation."""
+
+    logger_name = "event_management.instrumentation"
+
+    def setUp(self):
+        """Set needed info for tests."""
+        event_type_cache.clear()
+        self.create_url = reverse("event:create-event")
+        self.user = factories.UserFactory()
+        self.token = Token.objects.create(user=self.user)
+        self.client.credentials(HTTP_AUTHORIZATION=f"Token {self.token.key}")
+        self.data = {
+            "event_type": "timed",
+            "info": {},
+            "timestamp": (timezone.now() + timedelta(days=1)).isoformat(),
+        }
+
+    def options(self, **options):
+        """Return INSTRUMENTATION setting with given options changed."""
+        return {
+            "SAMPLE_RATE": 1.0,
+            "QUERY_BUDGET": 20,
+            "LATENCY_BUDGET_MS": 10_000,
+            "SERVER_TIMING_HEADER": True,
+            **options,
+        }
+
+    def test_sampled_request(self):
+        """Test for Server-Timing header and log line of a sampled request."""
+        with override_settings(INSTRUMENTATION=self.options()):
+            with self.assertLogs(self.logger_name, "INFO") as logs:
+                response = self.client.post(self.create_url, self.data, format="json")
+
+        metrics = [metric.split(";")[0] for metric in response["Server-Timing"].split(", ")]
+        self.assertEqual(metrics, ["total", "db", "auth", "serializer"])
+        record = json.loads(logs.records[0].getMessage())
+        self.assertEqual(logs.records[0].levelname, "INFO")
+        self.assertEqual(record["path"], self.create_url)
+        self.assertEqual(record["status"], status.HTTP_201_CREATED)
+        self.assertGreater(record["queries"], 0)
+        self.assertIn(f'desc="{record["queries"]} queries"', response["Server-Timing"])
+        self.assertNotIn("over_budget", record)
+
+    def test_request_over_budget(self):
+        """Test for flagging requests over the query budget."""
+        with override_settings(INSTRUMENTATION=self.options(QUERY_BUDGET=0, SERVER_TIMING_HEADER=False)):
+            with self.assertLogs(self.logger_name, "WARNING") as logs:
+                response = self.client.post(self.create_url, self.data, format="json")
+
+        self.assertNotIn("Server-Timing", response)
+        self.assertEqual(json.loads(logs.records[0].getMessage())["over_budget"], ["queries"])
+
+    def test_unsampled_request(self):
+        """Test for skipping measurements of unsampled requests."""
+        with override_settings(INSTRUMENTATION=self.options(SAMPLE_RATE=0.0)):
+            with self.assertNoLogs(self.logger_name):
+                response = self.client.post(self.create_url, self.data, format="json")
+            self.assertNotIn("Server-Timing", response)
+
+        with override_settings(INSTRUMENTATION=self.options(SAMPLE_RATE=0.0, LATENCY_BUDGET_MS=-1)):
+            with self.assertLogs(self.logger_name, "WARNING") as logs:
+                RequestTimingMiddleware(lambda request: HttpResponse())(RequestFactory().get("/"))
+        record = json.loads(logs.records[0].getMessage())
+        self.assertEqual((record["sampled"], record["over_budget"]), (False, ["latency"]))
+
+
+# Event type labels are limited per process and earlier tests create many event types
+@override_settings(METRICS_MAX_EVENT_TYPES=10000)
+class MetricsTest(APITestCase):
+    """Class MetricsTest for testing Prometheus metrics."""
+
+    def setUp(self):
+        """Set needed info for tests."""
+        event_type_cache.clear()
+        self.create_url = reverse("event:create-event")
+        self.user = factories.UserFactory()
+        self.token = Token.objects.create(user=self.user)
+        self.client.credentials(HTTP_AUTHORIZATION=f"Token {self.token.key}")
+
+    @staticmethod
+    def sample(name, **labels):
+        """Return current value of a metric sample, 0 if it wasn't observed yet."""
+        return REGISTRY.get_sample_value(name, labels) or 0
+
+    def test_metrics(self):
+        """Test for request, event, validation and cache metrics."""
+        failure_labels = {"serializer": "FastEventSerializer", "field": "timestamp", "code": "invalid"}
+        before = {
+            "created": self.sample("events_created_total", event_type="metered"),
+            "rejected": self.sample("event_past_timestamp_rejections_total"),
+            "failures": self.sample("validation_failures_total", **failure_labels),
+            "requests": self.sample(
+                "http_request_duration_seconds_count", view="event:create-event", method="POST"
+            ),
+            "misses": self.sample("cache_lookups_total", cache="event_type", result="miss"),
+        }
+        for days in (1, 2, -1):
+            timestamp = (timezone.now() + timedelta(days=days)).isoformat()
+            data = {"event_type": "metered", "info": {}, "timestamp": timestamp}
+            with self.captureOnCommitCallbacks(execute=True):
+                self.client.post(self.create_url, data, format="json")
+        with self.captureOnCommitCallbacks(execute=True), transaction.atomic():
+            # events rolled back aren't counted
+            factories.EventFactory(event_type=models.EventType.objects.get(name="metered"))
+            models.Event.objects.ingest([{**data, "timestamp": timezone.now()}], user=self.user)
+            transaction.set_rollback(True)
+
+        self.assertEqual(self.sample("events_created_total", event_type="metered") - before["created"], 2)
+        self.assertEqual(self.sample("event_past_timestamp_rejections_total") - before["rejected"], 1)
+        self.assertEqual(self.sample("validation_failures_total", **failure_labels) - before["failures"], 1)
+        self.assertEqual(
+            self.sample("http_request_duration_seconds_count", view="event:create-event", method="POST")
+            - before["requests"],
+            3,
+        )
+        self.assertEqual(self.sample("cache_lookups_total", cache="event_type", result="miss") - before["misses"], 1)
+
+        response = self.client.get(reverse("metrics"))
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertIn(b'events_created_total{event_type="metered"}', response.content)
+
+    def test_queries_counted_once(self):
+        """Test for counting every query of a request once for both middlewares."""
+        before = self.sample("http_request_db_queries_sum", view="event:create-event")
+        options = {"SAMPLE_RATE": 1.0, "QUERY_BUDGET": 20, "LATENCY_BUDGET_MS": 10_000, "SERVER_TIMING_HEADER": True}
+        data = {"event_type": "metered", "info": {}, "timestamp": (timezone.now() + timedelta(days=1)).isoformat()}
+        with override_settings(INSTRUMENTATION=options), CaptureQueriesContext(connection) as queries:
+            with self.assertLogs("event_management.instrumentation", "INFO") as logs:
+                self.client.post(self.create_url, data, format="json")
+
+        self.assertEqual(connection.execute_wrappers.count(record_query), 1)
+        self.assertEqual(json.loads(logs.records[0].getMessage())["queries"], len(queries))
+        self.assertEqual(self.sample("http_request_db_queries_sum", view="event:create-event") - before, len(queries))
+
+    def test_event_type_label_limit(self):
+        """Test for limiting event type label values."""
+        with override_settings(METRICS_MAX_EVENT_TYPES=0):
+            self.assertEqual(event_type_label("never seen before"), OTHER_LABEL)
+        self.assertEqual(event_type_label("metered"), "metered")
+
+    def test_multiprocess_metrics(self):
+        """Test for aggregating metrics of several processes."""
+        script = (
+            "from prometheus_client import Counter; "
+            "Counter('events_created', 'Created events.', ['event_type']).labels('multi').inc(2)"
+        )
+        with tempfile.TemporaryDirectory() as directory:
+            with mock.patch.dict(os.environ, {"PROMETHEUS_MULTIPROC_DIR": directory}):
+                for _ in range(3):
+                    subprocess.run([sys.executable, "-c", script], check=True)
+                registry = get_registry()
+            self.assertEqual(registry.get_sample_value("events_created_total", {"event_type": "multi"}), 6)
+
+
+class ApiDocsTest(TestCase):
+    """Class ApiDocsTest for testing pre-generated API docs."""
+
+    def test_generated_docs(self):
+        """Test for serving generated schemas and docs pages with ETag."""
+        with tempfile.TemporaryDirectory() as directory:
+            call_command("generate_api_docs", "--output", directory, stdout=io.StringIO())
+            with override_settings(API_DOCS_ROOT=directory, WHITENOISE_ROOT=directory):
+                client = self.client_class()
+                response = client.get("/swagger.json")
+                self.assertEqual(response.status_code, status.HTTP_200_OK)
+                self.assertIn("/api/events/create/", json.loads(b"".join(response.streaming_content))["paths"])
+                not_modified = client.get("/swagger.json", HTTP_IF_NONE_MATCH=response["ETag"])
+                self.assertEqual(not_modified.status_code, status.HTTP_304_NOT_MODIFIED)
+                response = client.get("/swagger.yaml")
+                self.assertEqual(response.status_code, status.HTTP_200_OK)
+                self.assertIn(b"/api/events/create/:", b"".join(response.streaming_content))
+                for url in ("/", "/redoc/"):
+                    response = client.get(url)
+                    self.assertEqual(response.status_code, status.HTTP_200_OK)
+                    self.assertIn(b"/swagger.json", b"".join(response.streaming_content))
+
+    def test_urls_without_drf_yasg(self):
+        """Test for not importing drf_yasg in API workers and rendering docs until they are generated."""
+        script = (
+            "import sys, django; django.setup(); from django.test import Client; "
+            "status = Client().get('/swagger.yaml').status_code; "
+            "print(status, any(name.startswith('drf_yasg.') for name in sys.modules))"
+        )
+        with tempfile.TemporaryDirectory() as directory:
+            env = {
+                **os.environ,
+                "DJANGO_SETTINGS_MODULE": "event_management.settings",
+                "API_DOCS_DYNAMIC": "0",
+                "API_DOCS_ROOT": directory,
+            }
+            result = subprocess.run([sys.executable, "-c", script], env=env, capture_output=True, text=True, check=True)
+            self.assertEqual(result.stdout.strip(), "200 True")
+
+            call_command("generate_api_docs", "--output", directory, stdout=io.StringIO())
+            result = subprocess.run([sys.executable, "-c", script], env=env, capture_output=True, text=True, check=True)
+            self.assertEqual(result.stdout.strip(), "200 False")
+
+
+class FastEventSerializerTest(TestCase):
+    """Class FastEventSerializerTest for testing the declared Event serializer."""
+
+    def setUp(self):
+        """Set needed info for tests."""
+        event_type_cache.clear()
+        self.event_type = factories.EventTypeFactory()
+
+    def test_representation(self):
+        """Test for representing events like EventSerializer."""
+        events = [factories.EventFactory(event_type=self.event_type) for _ in range(3)]
+        events.append(factories.EventFactory(timestamp=timezone.now().replace(microsecond=0) + timedelta(days=1)))
+
+        for event in models.Event.objects.select_related("user", "event_type"):
+            with self.subTest(event=event):
+                self.assertEqual(
+                    serializers.FastEventSerializer(event).data, dict(serializers.EventSerializer(event).data)
+                )
+
+    def test_validation(self):
+        """Test for validating data like EventSerializer."""
+        future = (timezone.now() + timedelta(days=1)).isoformat()
+        past = (timezone.now() - timedelta(days=1)).isoformat()
+        cases = [
+            {"event_type": self.event_type.name, "info": {"a": 1}, "timestamp": future},
+            {"event_type": self.event_type.name, "info": {}, "timestamp": past},
+            {"event_type": self.event_type.name, "info": {}, "timestamp": "tomorrow"},
+            {"event_type": None, "info": None, "timestamp": None},
+            {"event_type": "x" * 257, "info": [], "timestamp": future},
+            {"event_type": "", "info": "text", "timestamp": future, "user": "ignored"},
+            {},
+        ]
+        for data in cases:
+            with self.subTest(data=data):
+                fast, model = serializers.FastEventSerializer(data=data), serializers.EventSerializer(data=data)
+                self.assertEqual(fast.is_valid(), model.is_valid())
+                self.assertEqual(fast.errors, model.errors)
+                if not fast.errors:
+                    self.assertEqual(fast.validated_data, model.validated_data)
+
+    def test_create_with_new_event_type(self):
+        """Test for creating event with a new event type."""
+        user = factories.UserFactory()
+        data = {"event_type": "brand new", "info": {}, "timestamp": (timezone.now() + timedelta(days=1)).isoformat()}
+        serializer = serializers.FastEventSerializer(data=data)
+        serializer.is_valid(raise_exception=True)
+        event = serializer.save(user=user)
+
+        self.assertEqual(event.event_type.name, "brand new")
+        self.assertEqual(serializer.data["user"], user.username)
+
+    def test_renderer(self):
+        """Test for rendering like JSONRenderer, integers wider than 64 bits included."""
+        data = {
+            "id": uuid7(),
+            "when": timezone.now(),
+            "day": timezone.now().date(),
+            "amount": Decimal("1.50"),
+            "text": "line\u2028separator ünïcode",
+            1: [ErrorDetail("error", code="invalid"), None, True, 1.5],
+        }
+        self.assertEqual(ORJSONRenderer().render(data), JSONRenderer().render(data))
+        self.assertEqual(
+            ORJSONRenderer().render(data, "application/json; indent=4"),
+            JSONRenderer().render(data, "application/json; indent=4"),
+        )
+        wide = {"wide": 2**64, "negative": -(2**63) - 1, "nested": [{"wide": 10**30}]}
+        self.assertEqual(ORJSONRenderer().render(wide), JSONRenderer().render(wide))
+
+    def test_parser_invalid_json_fail(self):
+        """Test for parsing invalid JSON and integers wider than 64 bits."""
+        self.assertEqual(ORJSONParser().parse(io.BytesIO(b'{"a": [1, 2.5]}')), {"a": [1, 2.5]})
+        with self.assertRaises(ParseError):
+            ORJSONParser().parse(io.BytesIO(b"{invalid"))
+        wide = b'{"wide": 18446744073709551616, "negative": -9223372036854775809, "max": 18446744073709551615}'
+        self.assertEqual(
+            ORJSONParser().parse(io.BytesIO(wide)),
+            {"wide": 2**64, "negative": -(2**63) - 1, "max": 2**64 - 1},
+        )
+        self.assertEqual(json_loads(wide.decode()), json_loads(wide))
+        with self.assertRaises(ParseError):
+            ORJSONParser().parse(io.BytesIO(b'{"wide": 18446744073709551616, "nan": NaN}'))
+
+
+class UpcomingEventsTest(APITestCase):
+    """Class UpcomingEventsTest for testing the upcoming events feed."""
+
+    def setUp(self):
+        """Set needed info for tests."""
+        event_type_cache.clear()
+        cache.clear()
+        self.upcoming_url = reverse("event:upcoming-events")
+        self.user = factories.UserFactory()
+        self.token = Token.objects.create(user=self.user)
+        self.client.credentials(HTTP_AUTHORIZATION=f"Token {self.token.key}")
+        self.now = timezone.now()
+        self.events = [
+            factories.EventFactory(user=self.user, timestamp=self.now + timedelta(hours=hours)) for hours in (3, 1, 2)
+        ]
+        factories.EventFactory(timestamp=self.now + timedelta(minutes=30))
+
+    def test_list_upcoming_events(self):
+        """Test for listing the next events of the user (status code 200)."""
+        response = self.client.get(self.upcoming_url, {"limit": 2})
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        ids = [event["id"] for event in response.json()["results"]]
+        self.assertEqual(ids, [str(self.events[1].id), str(self.events[2].id)])
+
+    def test_poll_without_queries(self):
+        """Test for serving repeated polling without queries."""
+        first = self.client.get(self.upcoming_url)
+        with self.assertNumQueries(0):
+            second = self.client.get(self.upcoming_url)
+
+        self.assertEqual(second.json(), first.json())
+        self.assertEqual(len(second.json()["results"]), 3)
+
+    def test_invalidate_on_create(self):
+        """Test for dropping the feed when the user creates an event."""
+        self.client.get(self.upcoming_url)
+        data = {"event_type": "soon", "info": {}, "timestamp": (self.now + timedelta(minutes=10)).isoformat()}
+        with self.captureOnCommitCallbacks(execute=True):
+            created = self.client.post(reverse("event:create-event"), data, format="json")
+        response = self.client.get(self.upcoming_url)
+
+        self.assertEqual(response.json()["results"][0]["id"], created.json()["id"])
+        self.assertEqual(len(response.json()["results"]), 4)
+
+    def test_drop_started_events(self):
+        """Test for dropping events that have started from a cached feed."""
+        upcoming_events(self.user.pk, 10)
+        later = self.now + timedelta(hours=1, minutes=30)
+        with mock.patch("event.upcoming.timezone.now", return_value=later), self.assertNumQueries(0):
+            events = upcoming_events(self.user.pk, 10)
+
+        self.assertEqual([event["id"] for event in events], [str(self.events[2].id), str(self.events[0].id)])
+
+    def test_list_invalid_limit(self):
+        """Test for listing with invalid limit (status code 400)."""
+        for limit in ("0", "abc", "1000"):
+            with self.subTest(limit=limit):
+                response = self.client.get(self.upcoming_url, {"limit": limit})
+                self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+
+@override_settings(EVENT_ARCHIVE_AFTER_DAYS=30)
+class EventArchiveTest(APITestCase):
+    """Class EventArchiveTest for testing archival of past events."""
+
+    def setUp(self):
+        """Set needed info for tests."""
+        event_type_cache.clear()
+        self.list_url = reverse("event:list-events")
+        self.user = factories.UserFactory()
+        self.token = Token.objects.create(user=self.user)
+        self.client.credentials(HTTP_AUTHORIZATION=f"Token {self.token.key}")
+        now = timezone.now()
+        self.events = [
+            factories.EventFactory(user=self.user, timestamp=now + timedelta(days=days)) for days in (-40, -35, -1, 1)
+        ]
+        models.EventRollup.objects.all().delete()
+        call_command("rebuild_rollups", stdout=io.StringIO())
+
+    def test_archive_events(self):
+        """Test for moving events older than the cutoff in batches."""
+        rollups = dict(models.EventRollup.objects.values_list("id", "count"))
+        with self.assertNumQueries(15):
+            # two batches of select, insert, delete and its select of the deleted rows for signals,
+            # and a final empty select, each in a savepoint
+            archived = archive_events(batch_size=1)
+
+        self.assertEqual(archived, 2)
+        self.assertEqual(
+            set(models.ArchivedEvent.objects.values_list("id", flat=True)), {self.events[0].id, self.events[1].id}
+        )
+        self.assertEqual(models.Event.objects.count(), 2)
+        archived_event = models.ArchivedEvent.objects.get(id=self.events[0].id)
+        self.assertEqual(archived_event.info, self.events[0].info)
+        self.assertEqual(archived_event.created_at, self.events[0].created_at)
+        self.assertEqual(dict(models.EventRollup.objects.values_list("id", "count")), rollups)
+
+    def test_list_archived_events(self):
+        """Test for listing hot and archived events in one order across pages."""
+        archive_events(cutoff=self.events[1].timestamp)
+        ids, url, params = [], self.list_url, {"page_size": 1}
+        while url:
+            response = self.client.get(url, params)
+            ids += [event["id"] for event in response.json()["results"]]
+            url, params = response.json()["next"], None
+
+        self.assertEqual(models.ArchivedEvent.objects.count(), 1)
+        self.assertEqual(ids, [str(event.id) for event in self.events])
+
+    def test_list_skips_archive(self):
+        """Test for skipping the archive when the range starts after the cutoff."""
+        archive_events()
+        self.client.get(self.list_url)
+        params = {"timestamp_after": (archive_cutoff() + timedelta(minutes=1)).isoformat()}
+        with self.assertNumQueries(2):
+            response = self.client.get(self.list_url, params)
+
+        ids = [event["id"] for event in response.json()["results"]]
+        self.assertEqual(ids, [str(self.events[2].id), str(self.events[3].id)])
+
+    def test_export_archived_events(self):
+        """Test for exporting archived events."""
+        archive_events()
+        response = self.client.get(reverse("event:export-events"))
+        rows = [json.loads(line) for line in b"".join(response.streaming_content).splitlines()]
+
+        self.assertEqual([row["id"] for row in rows], [str(event.id) for event in self.events])
+
+    def test_archive_events_command(self):
+        """Test for archive_events command and rollups of archived events."""
+        out = io.StringIO()
+        call_command("archive_events", "--dry-run", stdout=out)
+        call_command("archive_events", stdout=out)
+        call_command("rebuild_rollups", "--dry-run", stdout=out)
+
+        self.assertEqual(
+            out.getvalue().splitlines(),
+            ["Events to archive: 2", "Events archived: 2", "Rollup rows created: 0, updated: 0, deleted: 0"],
+        )
+
+
+class EventAdminTest(TestCase):
+    """Class EventAdminTest for testing Event admin."""
+
+    def setUp(self):
+        """Set needed info for tests."""
+        event_type_cache.clear()
+        self.changelist_url = reverse("admin:event_event_changelist")
+        self.client.force_login(factories.UserFactory(is_staff=True, is_superuser=True))
+        self.event_types = factories.EventTypeFactory.create_batch(2)
+        start = timezone.now() + timedelta(days=1)
+        self.events = [
+            factories.EventFactory(event_type=self.event_types[index % 2], timestamp=start + timedelta(hours=index))
+            for index in range(5)
+        ]
+
+    @override_settings(EVENT_ADMIN_COUNT_LIMIT=3)
+    def test_changelist(self):
+        """Test for listing events with a bounded count and constant query count."""
+        self.client.get(self.changelist_url)
+        with self.assertNumQueries(4):
+            # session, user, page joined with users and event types and the bounded count
+            response = self.client.get(self.changelist_url)
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.context["cl"].result_count, 3)
+        self.assertContains(response, "More than 3 Events")
+        self.assertEqual(
+            [event.id for event in response.context["cl"].result_list], [event.id for event in self.events[::-1]]
+        )
+
+    def test_changelist_keyset_pages(self):
+        """Test for following keyset links through all pages."""
+        ids, url = [], self.changelist_url
+        with mock.patch.object(admin.EventAdmin, "list_per_page", 2):
+            while url:
+                response = self.client.get(url)
+                changelist = response.context["cl"]
+                ids += [event.id for event in changelist.result_list]
+                url = changelist.next_url and self.changelist_url + changelist.next_url
+
+        self.assertEqual(ids, [event.id for event in self.events[::-1]])
+        self.assertContains(response, "First page")
+
+    def test_changelist_event_type_filter(self):
+        """Test for filtering by event type name without listing event types."""
+        name = self.event_types[1].name
+        params = {"event_type__name": name, "timestamp__gte": "2000-01-01T00:00:00Z"}
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(self.changelist_url, params)
+
+        ids = [event.id for event in response.context["cl"].result_list]
+        self.assertEqual(ids, [self.events[3].id, self.events[1].id])
+        self.assertContains(response, f'name="event_type__name" value="{name}"')
+        self.assertContains(response, 'type="hidden" name="timestamp__gte" value="2000-01-01T00:00:00Z"')
+        self.assertFalse(any('FROM "event_eventtype"' in query["sql"] for query in queries.captured_queries))
+
+    def test_changelist_invalid_cursor(self):
+        """Test for listing with invalid cursor (redirect to error page)."""
+        response = self.client.get(self.changelist_url, {"cursor": "invalid"})
+
+        self.assertRedirects(response, f"{self.changelist_url}?e=1", fetch_redirect_response=False)
+
+    def test_autocomplete_widgets(self):
+        """Test for autocomplete widgets of users and event types."""
+        response = self.client.get(reverse("admin:event_event_add"))
+
+        self.assertContains(response, 'data-ajax--url="/admin/autocomplete/"', count=2)
+        self.assertNotContains(response, f">{self.event_types[0].name}</option>")
+
+
+class RecurringEventTest(APITestCase):
+    """Class RecurringEventTest for testing recurring events."""
+
+    def setUp(self):
+        """Set needed info for tests."""
+        event_type_cache.clear()
+        cache.clear()
+        self.list_url = reverse("event:list-events")
+        self.user = factories.UserFactory()
+        self.token = Token.objects.create(user=self.user)
+        self.client.credentials(HTTP_AUTHORIZATION=f"Token {self.token.key}")
+        self.start = timezone.now().replace(microsecond=0) + timedelta(hours=1)
+        recurrence = "FREQ=DAILY;COUNT=5"
+        self.series = factories.EventFactory(
+            user=self.user,
+            timestamp=self.start,
+            recurrence=recurrence,
+            recurrence_exceptions=[(self.start + timedelta(days=2)).isoformat()],
+            recurrence_end=last_occurrence(recurrence, self.start),
+        )
+        self.single = factories.EventFactory(user=self.user, timestamp=self.start + timedelta(days=1, hours=1))
+        self.expected = [
+            (str(self.series.id), self.start),
+            (str(self.series.id), self.start + timedelta(days=1)),
+            (str(self.single.id), self.start + timedelta(days=1, hours=1)),
+            (str(self.series.id), self.start + timedelta(days=3)),
+            (str(self.series.id), self.start + timedelta(days=4)),
+        ]
+
+    def test_create_recurring_event(self):
+        """Test for creating a recurring event as one row (status code 201)."""
+        data = {
+            "event_type": "weekly",
+            "info": {},
+            "timestamp": self.start.isoformat(),
+            "recurrence": "FREQ=WEEKLY;COUNT=3",
+            "recurrence_exceptions": [(self.start + timedelta(weeks=1)).isoformat()],
+        }
+        response = self.client.post(reverse("event:create-event"), data, format="json")
+
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        event = models.Event.objects.get(id=response.json()["id"])
+        self.assertEqual(event.recurrence_end, self.start + timedelta(weeks=2))
+        self.assertEqual(parse_datetime(response.json()["recurrence_end"]), self.start + timedelta(weeks=2))
+        self.assertEqual(len(event.recurrence_exceptions), 1)
+
+    @override_settings(EVENT_RECURRENCE_MAX_OCCURRENCES=10)
+    def test_create_invalid_recurrence(self):
+        """Test for creating event with invalid recurrence (status code 400)."""
+        for recurrence in ("FREQ=SOMETIMES", "FREQ=DAILY;COUNT=11", "DTSTART:20300101T000000Z\nRRULE:FREQ=DAILY"):
+            with self.subTest(recurrence=recurrence):
+                data = {"event_type": "x", "info": {}, "timestamp": self.start.isoformat(), "recurrence": recurrence}
+                response = self.client.post(reverse("event:create-event"), data, format="json")
+
+                self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+                self.assertIn("recurrence", response.json())
+
+    def test_impossible_recurrence(self):
+        """Test for rejecting rules without occurrences in bounded time."""
+        start = parse_datetime("2023-01-01T00:00:00Z")
+        impossible = (
+            "FREQ=DAILY;BYMONTH=2;BYMONTHDAY=30",
+            "FREQ=SECONDLY;COUNT=3;BYMONTH=4;BYMONTHDAY=31",
+            "FREQ=YEARLY;INTERVAL=4;BYMONTH=2;BYMONTHDAY=29",
+        )
+        for recurrence in impossible:
+            with self.subTest(recurrence=recurrence):
+                started = time.perf_counter()
+                with self.assertRaisesRegex(ValueError, "no occurrences"):
+                    last_occurrence(recurrence, start)
+                self.assertLess(time.perf_counter() - started, 5)
+
+        data = {"event_type": "x", "info": {}, "timestamp": self.start.isoformat(), "recurrence": impossible[0]}
+        response = self.client.post(reverse("event:create-event"), data, format="json")
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn("recurrence", response.json())
+
+        leap_days = last_occurrence("FREQ=YEARLY;COUNT=2;BYMONTH=2;BYMONTHDAY=29", start)
+        self.assertEqual(leap_days, parse_datetime("2028-02-29T00:00:00Z"))
+        leap_start = parse_datetime("2024-01-01T00:00:00Z")
+        self.assertIsNone(last_occurrence("FREQ=YEARLY;INTERVAL=4;BYMONTH=2;BYMONTHDAY=29", leap_start))
+
+    def test_list_occurrences(self):
+        """Test for listing occurrences merged with single events across pages."""
+        occurrences, url = [], self.list_url + "?page_size=2"
+        while url:
+            response = self.client.get(url)
+            self.assertEqual(response.status_code, status.HTTP_200_OK)
+            occurrences += [(event["id"], parse_datetime(event["timestamp"])) for event in response.json()["results"]]
+            url = response.json()["next"]
+
+        self.assertEqual(occurrences, self.expected)
+        self.assertEqual(models.Event.objects.count(), 2)
+
+        params = {"timestamp_after": (self.start + timedelta(hours=12)).isoformat()}
+        response = self.client.get(self.list_url, params)
+        self.assertEqual(
+            [(event["id"], parse_datetime(event["timestamp"])) for event in response.json()["results"]],
+            self.expected[1:],
+        )
+
+    @override_settings(EVENT_RECURRENCE_HORIZON_DAYS=3)
+    def test_unbounded_horizon(self):
+        """Test for expanding unbounded events up to the horizon."""
+        models.Event.objects.all().delete()
+        series = factories.EventFactory(timestamp=self.start, recurrence="FREQ=DAILY")
+        response = self.client.get(self.list_url)
+
+        timestamps = [parse_datetime(event["timestamp"]) for event in response.json()["results"]]
+        self.assertEqual(timestamps, [self.start + timedelta(days=days) for days in range(3)])
+        self.assertTrue(all(event["id"] == str(series.id) for event in response.json()["results"]))
+
+    def test_export_occurrences(self):
+        """Test for exporting occurrences."""
+        response = self.client.get(reverse("event:export-events"))
+        rows = [json.loads(line) for line in b"".join(response.streaming_content).splitlines()]
+
+        self.assertEqual([(row["id"], parse_datetime(row["timestamp"])) for row in rows], self.expected)
+
+    def test_upcoming_occurrences(self):
+        """Test for listing occurrences in the upcoming events feed."""
+        response = self.client.get(reverse("event:upcoming-events"), {"limit": 3})
+
+        timestamps = [parse_datetime(event["timestamp"]) for event in response.json()["results"]]
+        self.assertEqual(timestamps, [timestamp for _, timestamp in self.expected[:3]])
+
+
+@override_settings(EVENT_DISPATCHER={**settings.EVENT_DISPATCHER, "LOOKAHEAD": 600, "CREATE_MARGIN": 600})
+class EventDispatcherTest(TestCase):
+    """Class EventDispatcherTest for testing the due-event dispatcher."""
+
+    def setUp(self):
+        """Set needed info for tests."""
+        self.now = timezone.now()
+        self.users = factories.UserFactory.create_batch(2)
+        self.events = [
+            factories.EventFactory(user=self.users[index % 2], timestamp=self.now + timedelta(minutes=minutes))
+            for index, minutes in enumerate((20, 10, 30))
+        ]
+        self.fired = []
+
+    def clock(self):
+        """datetime: Returns the time the dispatcher sees."""
+        return self.now
+
+    def get_dispatcher(self, **kwargs):
+        """EventDispatcher: Returns dispatcher recording fired events with the test clock."""
+        return EventDispatcher(handlers=[self.fired.append], clock=self.clock, **kwargs)
+
+    def test_fire_due_events(self):
+        """Test for firing due events in order and saving the checkpoint."""
+
+        def fail(event):
+            raise RuntimeError("handler failed")
+
+        dispatcher = self.get_dispatcher()
+        dispatcher.handlers.insert(0, fail)
+        dispatcher.acquire()
+        self.now += timedelta(minutes=15)
+        with self.assertLogs("event.dispatcher", "ERROR"):
+            self.assertEqual(dispatcher.tick(), 1)
+        self.now += timedelta(minutes=20)
+        with self.assertLogs("event.dispatcher", "ERROR"):
+            self.assertEqual(dispatcher.tick(), 2)
+
+        self.assertEqual([event.id for event in self.fired], [self.events[1].id, self.events[0].id, self.events[2].id])
+        self.assertEqual(dispatcher.failed, 3)
+        dispatcher.release()
+        checkpoint = models.DispatcherCheckpoint.objects.get()
+        self.assertEqual((checkpoint.timestamp, checkpoint.event_id), (self.events[2].timestamp, self.events[2].id))
+
+    def test_fire_created_events(self):
+        """Test for firing events created after their window was loaded."""
+        dispatcher = self.get_dispatcher()
+        dispatcher.acquire()
+        created = factories.EventFactory(timestamp=self.now + timedelta(minutes=5))
+        self.now += timedelta(minutes=6)
+        dispatcher.tick()
+
+        self.assertEqual([event.id for event in self.fired], [created.id])
+
+    @override_settings(EVENT_DISPATCHER={**settings.EVENT_DISPATCHER, "LOOKAHEAD": 900, "CREATE_MARGIN": 30})
+    def test_late_flush_and_changes(self):
+        """Test for firing queued events flushed late and dropping events changed after they were loaded."""
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        with override_settings(EVENT_QUEUE_PATH=os.path.join(directory.name, "queue.sqlite3")):
+            dispatcher = self.get_dispatcher()
+            dispatcher.acquire()
+            # the id is generated when the event is queued, long before the flush
+            queued_id = enqueue_event(
+                {"event_type": "queued", "info": {}, "timestamp": self.now + timedelta(minutes=12)}, self.users[0]
+            )
+            self.now += timedelta(minutes=6)
+            EventQueueFlusher(get_event_queue(), batch_size=10).flush()
+        self.assertEqual(dispatcher.tick(), 0)
+        self.assertEqual(dispatcher.stats()["scheduled"], 3)
+
+        models.Event.objects.filter(pk=self.events[1].pk).update(timestamp=self.now + timedelta(minutes=40))
+        self.events[0].delete()
+        self.now += timedelta(minutes=29)
+        dispatcher.tick()
+
+        self.assertEqual([event.id for event in self.fired], [queued_id, self.events[2].id])
+
+    def test_resume_from_checkpoint(self):
+        """Test for resuming from the checkpoint without firing events again."""
+        dispatcher = self.get_dispatcher()
+        dispatcher.acquire()
+        self.now += timedelta(minutes=25)
+        dispatcher.tick()
+        dispatcher.release()
+        self.now += timedelta(minutes=10)
+        restarted = self.get_dispatcher()
+        restarted.acquire()
+        restarted.tick()
+
+        self.assertEqual([event.id for event in self.fired], [self.events[1].id, self.events[0].id, self.events[2].id])
+
+    def test_shards(self):
+        """Test for splitting events between shards held by one process each."""
+        dispatchers = [self.get_dispatcher(shard=shard, shards=2) for shard in range(2)]
+        for dispatcher in dispatchers:
+            dispatcher.acquire()
+        with self.assertRaises(LeaseLostError):
+            self.get_dispatcher(shard=1, shards=2).acquire()
+        self.now += timedelta(minutes=35)
+        fired = [dispatcher.tick() for dispatcher in dispatchers]
+
+        self.assertEqual(sorted(event.id for event in self.fired), sorted(event.id for event in self.events))
+        self.assertEqual(sorted(fired), [1, 2])
+        for dispatcher in dispatchers:
+            users = {event.user_id for event in self.fired[: dispatcher.fired]}
+            self.assertTrue(all(user_id % 2 == dispatcher.shard for user_id in users))
+            self.fired = self.fired[dispatcher.fired:]
+
+    def test_fire_occurrences(self):
+        """Test for firing occurrences of recurring events."""
+        start = self.now.replace(microsecond=0) + timedelta(minutes=1)
+        series = factories.EventFactory(
+            timestamp=start, recurrence="FREQ=MINUTELY;INTERVAL=5", recurrence_exceptions=[
+                (start + timedelta(minutes=5)).isoformat()
+            ]
+        )
+        dispatcher = self.get_dispatcher()
+        dispatcher.acquire()
+        self.now += timedelta(minutes=12)
+        dispatcher.tick()
+
+        occurrences = [event.timestamp for event in self.fired if event.id == series.id]
+        self.assertEqual(occurrences, [start, start + timedelta(minutes=10)])
+
+    def test_run_dispatcher_command(self):
+        """Test for run_dispatcher command."""
+        models.DispatcherCheckpoint.objects.create(
+            shard=0, shards=1, timestamp=self.now - timedelta(hours=1), event_id=uuid7(self.now - timedelta(hours=1))
+        )
+        models.Event.objects.filter(pk=self.events[1].pk).update(timestamp=self.now - timedelta(minutes=1))
+        out = io.StringIO()
+        with self.assertLogs("event.dispatcher", "INFO") as logs:
+            call_command("run_dispatcher", "--once", stdout=out)
+
+        self.assertIn(str(self.events[1].id), logs.output[0])
+        self.assertIn("'fired': 1", out.getvalue())
+        with self.assertRaises(CommandError):
+            call_command("run_dispatcher", "--once", "--shard", "2", "--shards", "2")
+
+
+class EventStreamTest(APITestCase):
+    """Class EventStreamTest for testing the stream of created events."""
+
+    def setUp(self):
+        """Set needed info for tests."""
+        event_type_cache.clear()
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        options = {"ENABLED": True, "PATH": os.path.join(directory.name, "feed.sqlite3"), "POLL_INTERVAL": 60}
+        settings_override = override_settings(EVENT_FEED={**settings.EVENT_FEED, **options})
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
+        self.user = factories.UserFactory()
+        self.token = Token.objects.create(user=self.user)
+        self.client.credentials(HTTP_AUTHORIZATION=f"Token {self.token.key}")
+        self.feed = get_change_feed()
+
+    def append(self, *event_types):
+        """Append events of the event types to the feed from another thread, as another process does."""
+        items = [{"id": str(uuid7()), "user": self.user.username, "event_type": name} for name in event_types]
+        self.feed.append_many(items)
+        FeedHub.notify_all()
+        return items
+
+    async def stream(self, events=1, query="", headers=(), started=None, method="GET"):
+        """list: Returns status, headers and ``(id, data)`` of the first events streamed to a subscriber."""
+        scope = {
+            "type": "http",
+            "method": method,
+            "path": STREAM_PATH,
+            "query_string": query.encode(),
+            "headers": [(b"authorization", f"Token {self.token.key}".encode()), *headers],
+        }
+        disconnect, messages, body = asyncio.Event(), [], b""
+
+        async def receive():
+            await disconnect.wait()
+            return {"type": "http.disconnect"}
+
+        async def send(message):
+            nonlocal body
+            messages.append(message)
+            if message["type"] == "http.response.start" and started is not None:
+                await started(message)
+            body += message.get("body", b"")
+            if body.count(b"id: ") >= events or not message.get("more_body", True):
+                disconnect.set()
+
+        await asyncio.wait_for(event_stream(scope, receive, send), 5)
+        received = [
+            (int(block.split(b"\n")[0][4:]), json.loads(block.split(b"data: ")[1]))
+            for block in body.split(b"\n\n") if block.startswith(b"id: ")
+        ]
+        return messages[0]["status"], dict(messages[0]["headers"]), received
+
+    def test_publish_created_events(self):
+        """Test for appending created events to the change feed on commit."""
+        data = {"event_type": "single", "info": {}, "timestamp": (timezone.now() + timedelta(days=1)).isoformat()}
+        with self.captureOnCommitCallbacks(execute=True):
+            created = self.client.post(reverse("event:create-event"), data, format="json")
+        with self.captureOnCommitCallbacks(execute=True):
+            items = [{**data, "event_type": "bulk"}] * 2
+            bulk = self.client.post(reverse("event:bulk-create-event"), items, format="json")
+
+        rows = self.feed.read(0, 10)
+        self.assertEqual([row[0] for row in rows], [1, 2, 3])
+        self.assertEqual([row[2] for row in rows], ["single", "bulk", "bulk"])
+        self.assertEqual(json.loads(rows[0][3]), created.json())
+        self.assertEqual(
+            [json.loads(row[3])["id"] for row in rows[1:]], [item["id"] for item in bulk.json()["created"]]
+        )
+        factories.EventFactory()
+        events = list(models.Event.objects.all())
+        with self.assertNumQueries(2), self.captureOnCommitCallbacks():
+            # users and event types of all events at once
+            publish_events(events)
+
+    def test_stream_new_events(self):
+        """Test for streaming new events matching the filters."""
+        self.append("old")
+
+        async def started(message):
+            await asyncio.to_thread(self.append, "other", "match")
+
+        status_code, headers, received = async_to_sync(self.stream)(query="event_type=match", started=started)
+
+        self.assertEqual(status_code, status.HTTP_200_OK)
+        self.assertEqual(headers[b"content-type"], b"text/event-stream")
+        self.assertEqual([(seq, data["event_type"]) for seq, data in received], [(3, "match")])
+
+    def test_stream_resume(self):
+        """Test for resuming after the last received event."""
+        items = self.append("a", "b", "c")
+
+        for headers, query in (([(b"last-event-id", b"1")], ""), ((), "cursor=1")):
+            with self.subTest(query=query):
+                _, _, received = async_to_sync(self.stream)(events=2, query=query, headers=headers)
+                self.assertEqual(received, [(2, items[1]), (3, items[2])])
+
+    def test_fan_out(self):
+        """Test for reading the feed once for all subscribers."""
+
+        async def subscribe_all():
+            subscribers = [asyncio.create_task(self.stream()) for _ in range(5)]
+            while len(FeedHub.get().subscriptions) < 5:
+                await asyncio.sleep(0.01)
+            await asyncio.to_thread(self.append, "shared")
+            results = await asyncio.gather(*subscribers)
+            return results, FeedHub.get().reads
+
+        results, reads = async_to_sync(subscribe_all)()
+
+        self.assertTrue(all(received == [(1, mock.ANY)] for _, _, received in results))
+        self.assertEqual(reads, 2)
+
+    def test_stream_errors(self):
+        """Test for stream errors (status codes 400, 401, 404 and 405)."""
+        self.token.delete()
+        status_code, headers, _ = async_to_sync(self.stream)()
+        self.assertEqual(status_code, status.HTTP_401_UNAUTHORIZED)
+        self.assertEqual(headers[b"www-authenticate"], b"Token")
+
+        self.token = Token.objects.create(user=self.user)
+        self.assertEqual(async_to_sync(self.stream)(query="cursor=x")[0], status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(async_to_sync(self.stream)(method="POST")[0], status.HTTP_405_METHOD_NOT_ALLOWED)
+        with override_settings(EVENT_FEED={**settings.EVENT_FEED, "ENABLED": False}):
+            self.assertEqual(async_to_sync(self.stream)()[0], status.HTTP_404_NOT_FOUND)
+
+
+class EventSearchTest(APITestCase):
+    """Class EventSearchTest for testing full-text search over Event.info."""
+
+    def setUp(self):
+        """Set needed info for tests."""
+        self.search_url = reverse("event:search-events")
+        self.user = factories.UserFactory()
+        self.token = Token.objects.create(user=self.user)
+        self.client.credentials(HTTP_AUTHORIZATION=f"Token {self.token.key}")
+        infos = [
+            {"title": "Disk failure", "tags": ["disk", "storage"], "host": {"name": "db1"}},
+            {"title": "Network failure", "detail": "disk unaffected"},
+            {"title": "Deploy", "build": 1042},
+            {"note": "disk disk disk full"},
+        ]
+        self.events = [factories.EventFactory(info=info) for info in infos]
+
+    def search(self, query, **params):
+        """list: Returns ids of the events found."""
+        response = self.client.get(self.search_url, {"q": query, **params})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        return [event["id"] for event in response.json()["results"]]
+
+    def test_search_ranked(self):
+        """Test for searching words anywhere in info, best ranked first."""
+        self.search("warm")
+        # the matching ids and their events, the token comes from the cache
+        with self.assertNumQueries(2):
+            ids = self.search("disk")
+
+        self.assertEqual(ids[0], str(self.events[3].id))
+        self.assertEqual(set(ids), {str(self.events[index].id) for index in (0, 1, 3)})
+        self.assertEqual(self.search("DISK failure db1"), [str(self.events[0].id)])
+        self.assertEqual(self.search("1042"), [str(self.events[2].id)])
+        self.assertEqual(self.search('disk OR "deploy*'), [])
+
+    def test_search_pages(self):
+        """Test for following keyset cursors through all pages."""
+        ids, url = [], f"{self.search_url}?q=disk&page_size=1"
+        while url:
+            response = self.client.get(url)
+            ids += [event["id"] for event in response.json()["results"]]
+            url = response.json()["next"]
+
+        self.assertEqual(ids, self.search("disk"))
+
+    def test_index_in_sync(self):
+        """Test for keeping the index in sync on create, update and delete."""
+        event = self.events[2]
+        event.info = {"title": "Rollback"}
+        event.save()
+        self.assertEqual(self.search("deploy"), [])
+        self.assertEqual(self.search("rollback"), [str(event.id)])
+
+        event.delete()
+        models.Event.objects.filter(pk=self.events[3].pk)._raw_delete("default")
+        created = models.Event.objects.ingest(
+            [{"event_type": "bulk", "info": {"title": "rollback"}, "timestamp": timezone.now() + timedelta(days=1)}],
+            user=self.user,
+        )
+        self.assertEqual(self.search("rollback"), [str(created[0].id)])
+        self.assertEqual(set(self.search("disk")), {str(self.events[0].id), str(self.events[1].id)})
+
+    def test_search_invalid(self):
+        """Test for searching without words and with invalid cursor (status codes 400 and 404)."""
+        for query in ("", " *! "):
+            with self.subTest(query=query):
+                response = self.client.get(self.search_url, {"q": query})
+                self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+                self.assertIn("q", response.json())
+
+        response = self.client.get(self.search_url, {"q": "disk", "cursor": "invalid"})
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+
+    def test_reindex_events_command(self):
+        """Test for reindex_events command."""
+        with connection.cursor() as cursor:
+            cursor.execute(f"DELETE FROM {SEARCH_TABLE} WHERE rowid IN (SELECT min(rowid) FROM {SEARCH_TABLE})")
+            cursor.execute(f"INSERT INTO {SEARCH_TABLE} (rowid, body) VALUES (1000, 'disk orphan')")
+        out = io.StringIO()
+        call_command("reindex_events", "--batch-size", "3", stdout=out)
+
+        self.assertEqual(out.getvalue().strip(), "Indexed 4 events.")
+        self.assertEqual(set(self.search("disk")), {str(self.events[index].id) for index in (0, 1, 3)})
+
+    def test_scan_without_index(self):
+        """Test for scanning info on databases without a search index."""
+        expected = sorted(self.events[index].id for index in (0, 1, 3))
+        self.assertEqual(scan_event_ids(["disk"], 10), [(0.0, pk) for pk in expected])
+        self.assertEqual(scan_event_ids(["disk"], 1, (0.0, expected[0])), [(0.0, expected[1])])
+        self.assertEqual(scan_event_ids(["disk", "db1"], 10), [(0.0, self.events[0].id)])
+
+
+class EventInfoSchemaTest(APITestCase):
+    """Class EventInfoSchemaTest for testing compact storage of Event.info."""
+
+    def setUp(self):
+        """Set needed info for tests."""
+        event_type_cache.clear()
+        info_schema_cache.clear()
+        self.addCleanup(info_schema_cache.clear)
+        self.user = factories.UserFactory()
+        self.token = Token.objects.create(user=self.user)
+        self.client.credentials(HTTP_AUTHORIZATION=f"Token {self.token.key}")
+        self.event_type = factories.EventTypeFactory(name="page view")
+        self.fields = [
+            {"name": "username", "type": "string"},
+            {"name": "path", "type": "string"},
+            {"name": "duration", "type": "number", "required": False},
+        ]
+        self.schema = models.EventInfoSchema.objects.create(event_type=self.event_type, version=1, fields=self.fields)
+        self.event_type.info_schema = self.schema
+        self.event_type.save()
+        self.timestamp = timezone.now() + timedelta(days=1)
+        self.info = {"username": self.user.username, "path": "/products/1", "duration": 1.5}
+
+    def stored(self, event):
+        """tuple: Returns info, info schema id and packed info stored for the event."""
+        return models.Event.objects.filter(pk=event.pk).values_list("info", "info_schema", "info_packed").get()
+
+    def test_pack_unpack(self):
+        """Test for packing and unpacking info with schema fields."""
+        names = ("username", "path", "duration")
+        packed = pack_info(names, {"path": "/", "username": "ann"}, 256)
+
+        self.assertEqual(packed, PLAIN + b'["ann","/",4]')
+        self.assertEqual(unpack_info(names, packed), {"username": "ann", "path": "/"})
+        info = {"username": "ann", "path": "/" * 1000, "duration": None}
+        packed = pack_info(names, info, 256)
+        self.assertTrue(packed.startswith(COMPRESSED))
+        self.assertLess(len(packed), 100)
+        self.assertEqual(unpack_info(names, memoryview(packed)), info)
+        self.assertIsNone(pack_info(names, {"username": "ann", "referrer": "/"}, 256))
+        self.assertIsNone(pack_info(names, {"username": 2 ** 70}, 256))
+
+    def test_store_packed(self):
+        """Test for storing info of an event type with a schema packed."""
+        response = self.client.post(
+            reverse("event:create-event"),
+            {"event_type": self.event_type.name, "info": self.info, "timestamp": self.timestamp.isoformat()},
+            format="json",
+        )
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(response.json()["info"], self.info)
+        event = models.Event.objects.get(pk=response.json()["id"])
+        info, schema_id, packed = self.stored(event)
+
+        self.assertEqual(info, {"username": self.user.username})
+        self.assertEqual(schema_id, self.schema.pk)
+        self.assertLess(len(packed), len(json.dumps(self.info, separators=(",", ":"))) * 2 / 3)
+        self.assertEqual(event.info, self.info)
+        response = self.client.get(reverse("event:list-events"))
+        self.assertEqual(response.json()["results"][0]["info"], self.info)
+        response = self.client.get(reverse("event:export-events"))
+        self.assertEqual(json.loads(b"".join(response.streaming_content))["info"], self.info)
+
+        event.info = {**self.info, "path": "/cart"}
+        event.save(update_fields=["info"])
+        event.refresh_from_db()
+        self.assertEqual(event.info["path"], "/cart")
+        event.timestamp = timezone.now() - timedelta(days=40)
+        event.save()
+        archive_events()
+        self.assertEqual(models.ArchivedEvent.objects.get().info, event.info)
+
+    def test_validate_info(self):
+        """Test for validating info with the schema (status codes 400 and 207)."""
+        invalid = {"username": 1, "referrer": "/"}
+        response = self.client.post(
+            reverse("event:create-event"),
+            {"event_type": self.event_type.name, "info": invalid, "timestamp": self.timestamp.isoformat()},
+            format="json",
+        )
+
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(
+            sorted(response.json()["info"]),
+            [
+                "Key 'path' is required.",
+                "Key 'referrer' isn't in the info schema.",
+                "Key 'username' should be of type string.",
+            ],
+        )
+        items = [
+            {"event_type": self.event_type.name, "info": self.info, "timestamp": self.timestamp.isoformat()},
+            {"event_type": self.event_type.name, "info": invalid, "timestamp": self.timestamp.isoformat()},
+            {"event_type": "other", "info": invalid, "timestamp": self.timestamp.isoformat()},
+            {"event_type": f" {self.event_type.name} ", "info": invalid, "timestamp": self.timestamp.isoformat()},
+            {"event_type": 42, "info": invalid, "timestamp": self.timestamp.isoformat()},
+        ]
+        numbered = factories.EventTypeFactory(name="42")
+        numbered.info_schema = models.EventInfoSchema.objects.create(event_type=numbered, version=1, fields=self.fields)
+        numbered.save()
+        response = self.client.post(reverse("event:bulk-create-event"), items, format="json")
+        self.assertEqual(response.status_code, status.HTTP_207_MULTI_STATUS)
+        self.assertEqual([error["index"] for error in response.json()["errors"]], [1, 3, 4])
+        self.assertIsNotNone(self.stored(models.Event.objects.get(event_type=self.event_type))[2])
+
+        async def post_async():
+            return await self.async_client.post(
+                reverse("event:async-create-event"),
+                {"event_type": self.event_type.name, "info": invalid, "timestamp": self.timestamp.isoformat()},
+                content_type="application/json",
+                AUTHORIZATION=f"Token {self.token.key}",
+            )
+
+        response = async_to_sync(post_async)()
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn("info", response.json())
+
+    def test_schema_versions(self):
+        """Test for unpacking events with the schema version they were packed with."""
+        first = factories.EventFactory(event_type=self.event_type, info=self.info)
+        fields = [{"name": "path"}, {"name": "username"}, {"name": "referrer", "required": False}]
+        self.event_type.info_schema = models.EventInfoSchema.objects.create(
+            event_type=self.event_type, version=2, fields=fields
+        )
+        self.event_type.save()
+        second = factories.EventFactory(event_type=self.event_type, info={"path": "/", "username": "ann"})
+
+        self.assertEqual(self.stored(first)[1], self.schema.pk)
+        self.assertEqual(self.stored(second)[1], self.event_type.info_schema.pk)
+        info_schema_cache.clear()
+        with self.assertNumQueries(3):
+            # the events and both schema versions, which stay cached
+            events = list(models.Event.objects.order_by("created_at"))
+        self.assertEqual([event.info for event in events], [self.info, {"path": "/", "username": "ann"}])
+        with self.assertRaises(RestrictedError):
+            self.schema.delete()
+        self.event_type.delete()
+        self.assertFalse(models.EventInfoSchema.objects.exists())
+
+    def test_keep_json(self):
+        """Test for keeping info that doesn't fit the schema as JSON."""
+        info = {"username": "ann", "referrer": "/"}
+        events = models.Event.objects.ingest(
+            [{"event_type": self.event_type.name, "info": info, "timestamp": self.timestamp}], user=self.user
+        )
+
+        self.assertEqual(self.stored(events[0]), (info, None, None))
+        self.assertEqual(models.Event.objects.get().info, info)
+        schema = models.EventInfoSchema(event_type=self.event_type, version=3, fields=[{"name": "a", "type": "date"}])
+        with self.assertRaises(DjangoValidationError):
+            schema.full_clean()
+
+    def test_filter_and_search_packed(self):
+        """Test for filtering and searching packed info."""
+        cart = {**self.info, "path": "/cart"}
+        response = self.client.post(
+            reverse("event:create-event"),
+            {"event_type": self.event_type.name, "info": self.info, "timestamp": self.timestamp.isoformat()},
+            format="json",
+        )
+        events = [
+            models.Event.objects.get(pk=response.json()["id"]),
+            *models.Event.objects.ingest(
+                [{"event_type": self.event_type.name, "info": cart, "timestamp": self.timestamp}], user=self.user
+            ),
+        ]
+        factories.EventFactory(info={"username": "other", "path": "/products/1"})
+        ids = [str(event.id) for event in events]
+
+        self.assertTrue(all(self.stored(event)[2] for event in events))
+        response = self.client.get(reverse("event:list-events"), {"info__username": self.user.username})
+        self.assertEqual([item["id"] for item in response.json()["results"]], ids)
+
+        def search(query):
+            response = self.client.get(reverse("event:search-events"), {"q": query})
+            return sorted(event["id"] for event in response.json()["results"])
+
+        self.assertEqual(search(f"cart {self.user.username}"), ids[1:])
+        self.assertEqual(search(f"products {self.user.username}"), ids[:1])
+        self.assertEqual(search("1.5 cart"), ids[1:])
+        with connection.cursor() as cursor:
+            cursor.execute(f"DELETE FROM {SEARCH_TABLE}")
+        rebuild_search_index(batch_size=2)
+        self.assertEqual(search("cart"), ids[1:])
+
+        with override_settings(EVENT_INFO_INDEXED_KEYS=["username", "path"]):
+            self.assertEqual(refresh_info_projections(batch_size=1), 2)
+            self.assertEqual(self.stored(events[1])[0], {"username": self.user.username, "path": "/cart"})
+            response = self.client.get(reverse("event:list-events"), {"info__path": "/cart"})
+            self.assertEqual([item["id"] for item in response.json()["results"]], ids[1:])
+        self.assertEqual(search("cart"), ids[1:])
+
+    def test_lookups_packed(self):
+        """Test for refusing lookups into info that packed events don't keep in the info column."""
+        event = factories.EventFactory(event_type=self.event_type, info=self.info)
+
+        self.assertEqual(list(models.Event.objects.filter(info__username=self.user.username)), [event])
+        self.assertEqual(list(models.Event.objects.filter(Q(info__isnull=False))), [event])
+        for queryset in (
+            lambda: models.Event.objects.filter(info__path="/products/1"),
+            lambda: models.Event.objects.exclude(info__contains={"path": "/products/1"}),
+            lambda: models.Event.objects.filter(Q(user=self.user) | Q(info__duration__gt=1)),
+            lambda: models.Event.objects.filter(info=self.info),
+        ):
+            with self.assertRaisesMessage(FieldError, "keeps only the indexed keys username, source"):
+                queryset()
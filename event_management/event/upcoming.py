@@ -0,0 +1,60 @@
+"""The module includes the cached per-user feed of upcoming events.
+
+A user's feed caches the next UPCOMING_EVENTS["SIZE"] events, the ones with a timestamp
+after the time the feed was built. It is read from the event_user_timestamp_id_idx index.
+Events that have started since then are dropped when the feed is read, so it stays valid
+until it expires or one of the user's events is written. Signal receivers drop the feed
+when the write commits. Occurrences of the user's recurring events are merged in, up to
+EVENT_RECURRENCE_HORIZON_DAYS from now.
+"""
+
+import heapq
+from datetime import timedelta
+from itertools import islice
+
+from django.conf import settings
+from django.core.cache import caches
+from django.utils import timezone
+
+from .models import Event
+from .recurrence import expand_series
+from .serializers import FastEventSerializer
+
+KEY_PREFIX = "event:upcoming:"
+
+
+def get_feed_cache():
+    """BaseCache: Returns Django cache holding upcoming event feeds."""
+    return caches[settings.UPCOMING_EVENTS["ALIAS"]]
+
+
+def build_feed(user_id, now):
+    """list: Returns ``(timestamp, event)`` pairs of the next upcoming events of the user."""
+    size = settings.UPCOMING_EVENTS["SIZE"]
+    queryset = Event.objects.select_related("user", "event_type").filter(user_id=user_id)
+    single = queryset.filter(recurrence="", timestamp__gt=now).order_by("timestamp", "id")[:size]
+    horizon = now + timedelta(days=settings.EVENT_RECURRENCE_HORIZON_DAYS)
+    occurrences = (event for event in expand_series(queryset, now, horizon) if event.timestamp > now)
+    events = islice(heapq.merge(single, occurrences, key=lambda event: (event.timestamp, event.id)), size)
+    serializer = FastEventSerializer()
+    return [(event.timestamp, serializer.to_representation(event)) for event in events]
+
+
+def upcoming_events(user_id, limit):
+    """list: Returns represented next limit events of the user, served from the cache when possible."""
+    cache = get_feed_cache()
+    now = timezone.now()
+    feed = cache.get(f"{KEY_PREFIX}{user_id}")
+    if feed is not None:
+        upcoming = [event for timestamp, event in feed if timestamp > now]
+        # A full feed may hide later events once its first ones have started
+        if len(upcoming) >= limit or len(feed) < settings.UPCOMING_EVENTS["SIZE"]:
+            return upcoming[:limit]
+    feed = build_feed(user_id, now)
+    cache.set(f"{KEY_PREFIX}{user_id}", feed, settings.UPCOMING_EVENTS["TIMEOUT"])
+    return [event for _, event in feed[:limit]]
+
+
+def invalidate_feeds(user_ids):
+    """Drop the cached feeds of the users."""
+    get_feed_cache().delete_many([f"{KEY_PREFIX}{user_id}" for user_id in set(user_ids)])
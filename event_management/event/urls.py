@@ -2,10 +2,17 @@
 
 from django.urls import path
 
-from . import views
+from . import async_views, views
 
 app_name = "event"
 
 urlpatterns = [
+    path("", views.EventListAPIView.as_view(), name="list-events"),
     path("create/", views.EventCreateAPIView.as_view(), name="create-event"),
+    path("export/", views.EventExportAPIView.as_view(), name="export-events"),
+    path("search/", views.EventSearchAPIView.as_view(), name="search-events"),
+    path("upcoming/", views.UpcomingEventListAPIView.as_view(), name="upcoming-events"),
+    path("stats/", views.EventStatsAPIView.as_view(), name="event-stats"),
+    path("async/create/", async_views.EventCreateAsyncView.as_view(), name="async-create-event"),
+    path("bulk/", views.EventBulkCreateAPIView.as_view(), name="bulk-create-event"),
 ]
@@ -4,8 +4,11 @@ from django.utils import timezone
 
 from rest_framework.exceptions import ValidationError
 
+from event_management.metrics import PAST_TIMESTAMP_REJECTIONS
+
 
 def validate_datetime_is_future(value):
     """Datetime values should have future date."""
     if timezone.now() > value:
+        PAST_TIMESTAMP_REJECTIONS.inc()
         raise ValidationError("DateTime value should have future datetime.")
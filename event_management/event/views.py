@@ -1,24 +1,254 @@
 """This module provides all needed Event views."""
 
+from django.conf import settings
+from django.db.models import Sum
+from django.http import StreamingHttpResponse
+
 from rest_framework import status
-from rest_framework.generics import CreateAPIView
+from rest_framework.exceptions import ValidationError
+from rest_framework.generics import CreateAPIView, GenericAPIView, ListAPIView
 from rest_framework.permissions import IsAuthenticated
 from rest_framework.response import Response
+from rest_framework.views import APIView
+
+from .archive import archived_events
+from .cache import event_type_cache, info_schema_cache
+from .export import EXPORT_FORMATS, export_events
+from .filters import filter_events, filter_occurrences, parse_timestamp
+from .models import ArchivedEvent, Event, EventRollup
+from .pagination import EventKeysetPagination, EventSearchPagination
+from .parsers import NDJSONParser, ORJSONParser
+from .rollups import PERIODS, bucket_start
+from .search import search_terms
+from .serializers import FastEventIngestSerializer, FastEventSerializer
+from .upcoming import upcoming_events
+from .write_behind import enqueue_event
+
+
+class EventListAPIView(ListAPIView):
+    """This view is used for listing events.
+
+    Supports ``user``, ``event_type``, ``timestamp_after``, ``timestamp_before`` and
+    indexed ``info__<key>`` filters and keyset pagination ordered by ``(timestamp, id)``.
+    Archived events are included when the requested range starts before the archive cutoff.
+    Recurring events are listed as their occurrences within the requested range.
+    """
+
+    serializer_class = FastEventSerializer
+    permission_classes = (IsAuthenticated,)
+    pagination_class = EventKeysetPagination
+
+    def get_queryset(self):
+        """Return filtered single events joined with their users and event types."""
+        queryset = Event.objects.select_related("user", "event_type").filter(recurrence="")
+        return filter_events(queryset, self.request.query_params)
+
+    def get_archive_queryset(self):
+        """Return filtered archived events or None when the requested range doesn't reach them."""
+        return archived_events(ArchivedEvent.objects.select_related("user", "event_type"), self.request.query_params)
+
+    def get_occurrences(self, position):
+        """Return occurrences of filtered recurring events sorting after the keyset position."""
+        queryset = Event.objects.select_related("user", "event_type")
+        return filter_occurrences(queryset, self.request.query_params, position)
+
+    def paginate_queryset(self, queryset):
+        """Return one page of events merged with archived events and occurrences."""
+        return self.paginator.paginate_queryset(
+            queryset, self.request, view=self, archive=self.get_archive_queryset(), occurrences=self.get_occurrences
+        )
+
+
+class EventSearchAPIView(ListAPIView):
+    """This view is used for full-text search over event info.
+
+    Returns events with all words of ``q`` anywhere in their info, best ranked first,
+    with keyset pagination.
+    """
+
+    serializer_class = FastEventSerializer
+    permission_classes = (IsAuthenticated,)
+    pagination_class = EventSearchPagination
+
+    def get_queryset(self):
+        """Return events joined with their users and event types."""
+        return Event.objects.select_related("user", "event_type")
+
+    def get_search_query(self):
+        """Return the search query, raise ValidationError when it has no words."""
+        query = self.request.query_params.get("q", "")
+        if not search_terms(query):
+            raise ValidationError({"q": ["Enter at least one word to search for."]})
+        return query
+
+
+class EventExportAPIView(APIView):
+    """This view is used for streaming events as NDJSON or CSV.
+
+    Accepts the listing filters plus ``output`` (``ndjson`` or ``csv``) and ``gzip``.
+    """
+
+    permission_classes = (IsAuthenticated,)
+
+    def get(self, request, *args, **kwargs):
+        """Get method for exporting events."""
+        export_format = request.query_params.get("output", "ndjson")
+        if export_format not in EXPORT_FORMATS:
+            return Response(
+                {"output": [f"Choose one of: {', '.join(EXPORT_FORMATS)}."]}, status=status.HTTP_400_BAD_REQUEST
+            )
+        compress = request.query_params.get("gzip") in ("1", "true")
+        queryset = filter_events(Event.objects.filter(recurrence=""), request.query_params)
+        archive = archived_events(ArchivedEvent.objects.all(), request.query_params)
+        occurrences = filter_occurrences(Event.objects.select_related("user", "event_type"), request.query_params)
+
+        content_type, extension = EXPORT_FORMATS[export_format]
+        if compress:
+            content_type, extension = "application/gzip", f"{extension}.gz"
+        response = StreamingHttpResponse(
+            export_events(queryset, export_format, compress, archive=archive, occurrences=occurrences),
+            content_type=content_type,
+        )
+        response["Content-Disposition"] = f'attachment; filename="events.{extension}"'
+        return response
 
-from .serializers import EventSerializer
+
+class EventStatsAPIView(APIView):
+    """This view is used for counting events per bucket and event type.
+
+    Answers from EventRollup rows, so the cost depends on the number of buckets, not events.
+    Accepts ``period`` (``hour`` or ``day``), ``user``, ``event_type``, ``timestamp_after``
+    and ``timestamp_before``. The range is widened to whole buckets.
+    """
+
+    permission_classes = (IsAuthenticated,)
+
+    def get(self, request, *args, **kwargs):
+        """Get method for event counts."""
+        params = request.query_params
+        period = params.get("period", "hour")
+        if period not in PERIODS:
+            return Response({"period": [f"Choose one of: {', '.join(PERIODS)}."]}, status=status.HTTP_400_BAD_REQUEST)
+
+        queryset = EventRollup.objects.filter(period=period)
+        if params.get("user"):
+            queryset = queryset.filter(user__username=params["user"])
+        if params.get("event_type"):
+            queryset = queryset.filter(event_type__name=params["event_type"])
+        if params.get("timestamp_after"):
+            after = parse_timestamp("timestamp_after", params["timestamp_after"])
+            queryset = queryset.filter(bucket__gte=bucket_start(after, period))
+        if params.get("timestamp_before"):
+            queryset = queryset.filter(bucket__lt=parse_timestamp("timestamp_before", params["timestamp_before"]))
+
+        rows = (
+            queryset.values("bucket", "event_type__name")
+            .annotate(total=Sum("count"))
+            .filter(total__gt=0)
+            .order_by("bucket", "event_type__name")
+        )
+        results = [
+            {"bucket": row["bucket"], "event_type": row["event_type__name"], "count": row["total"]} for row in rows
+        ]
+        return Response({"period": period, "results": results})
+
+
+class UpcomingEventListAPIView(APIView):
+    """This view is used for listing the next events of the requesting user.
+
+    Accepts ``limit`` up to the cached feed size. Repeated polling is answered from the
+    cache until one of the user's events is created, changed or deleted.
+    """
+
+    permission_classes = (IsAuthenticated,)
+
+    def get(self, request, *args, **kwargs):
+        """Get method for upcoming events."""
+        options = settings.UPCOMING_EVENTS
+        limit = request.query_params.get("limit", str(options["DEFAULT_LIMIT"]))
+        if not limit.isdigit() or not 0 < int(limit) <= options["SIZE"]:
+            return Response(
+                {"limit": [f"Ensure this value is between 1 and {options['SIZE']}."]},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+        return Response({"results": upcoming_events(request.user.pk, int(limit))})
 
 
 class EventCreateAPIView(CreateAPIView):
     """This view is used for creating new event."""
 
-    serializer_class = EventSerializer
+    serializer_class = FastEventSerializer
     permission_classes = (IsAuthenticated,)
 
+    def get_serializer_class(self):
+        """Return serializer that leaves event type resolution to the flusher in write-behind mode."""
+        return FastEventIngestSerializer if settings.EVENT_WRITE_BEHIND else FastEventSerializer
+
     def post(self, request, *args, **kwargs):
-        """Post method for creating events."""
+        """Post method for creating events.
+
+        In write-behind mode the event is queued and only its pre-generated id is returned.
+        """
         serializer = self.get_serializer(data=request.data)
-        if serializer.is_valid():
-            serializer.save(user=request.user)
-            headers = self.get_success_headers(serializer.data)
-            return Response(serializer.data, status=status.HTTP_201_CREATED, headers=headers)
-        return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+        if not serializer.is_valid():
+            return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+        if settings.EVENT_WRITE_BEHIND:
+            event_id = enqueue_event(serializer.validated_data, request.user)
+            return Response({"id": event_id}, status=status.HTTP_202_ACCEPTED)
+        serializer.save(user=request.user)
+        headers = self.get_success_headers(serializer.data)
+        return Response(serializer.data, status=status.HTTP_201_CREATED, headers=headers)
+
+
+class EventBulkCreateAPIView(GenericAPIView):
+    """This view is used for creating many events in one request.
+
+    Accepts a JSON array or NDJSON body. Invalid items are reported by their index
+    and do not prevent the valid ones from being created.
+    """
+
+    serializer_class = FastEventIngestSerializer
+    permission_classes = (IsAuthenticated,)
+    parser_classes = (ORJSONParser, NDJSONParser)
+
+    def post(self, request, *args, **kwargs):
+        """Post method for creating events in bulk."""
+        items = request.data
+        if not isinstance(items, list):
+            return Response({"detail": "Expected a list of events."}, status=status.HTTP_400_BAD_REQUEST)
+        if len(items) > settings.EVENT_BULK_MAX_ITEMS:
+            return Response(
+                {"detail": f"Ensure there are no more than {settings.EVENT_BULK_MAX_ITEMS} events."},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+
+        # Info schemas of all event types of the batch are looked up in one query, by the names
+        # the serializer turns event types into: numbers become strings, whitespace is trimmed
+        names = {
+            str(item["event_type"]).strip()
+            for item in items
+            if isinstance(item, dict)
+            and isinstance(item.get("event_type"), (str, int, float))
+            and not isinstance(item["event_type"], bool)
+        }
+        info_schemas = info_schema_cache.active_by_names(names, event_type_cache.get_many(names))
+        context = {**self.get_serializer_context(), "info_schemas": info_schemas}
+        indexes, valid, errors = [], [], []
+        for index, item in enumerate(items):
+            serializer = self.get_serializer_class()(data=item, context=context)
+            if serializer.is_valid():
+                indexes.append(index)
+                valid.append(serializer.validated_data)
+            else:
+                errors.append({"index": index, "errors": serializer.errors})
+
+        events = Event.objects.ingest(valid, batch_size=settings.EVENT_BULK_BATCH_SIZE, user=request.user)
+        created = [{"index": index, "id": event.id} for index, event in zip(indexes, events)]
+
+        if not errors:
+            response_status = status.HTTP_201_CREATED
+        elif created:
+            response_status = status.HTTP_207_MULTI_STATUS
+        else:
+            response_status = status.HTTP_400_BAD_REQUEST
+        return Response({"created": created, "errors": errors}, status=response_status)
@@ -0,0 +1,283 @@
+"""The module includes the write-behind ingestion buffer for events.
+
+In write-behind mode a create request only validates the event and appends it to a
+durable local queue, a separate SQLite file in WAL mode. The ``flush_event_queue``
+command commits queued events in batches. Queued rows are removed only after their
+batch is committed and replays skip existing ids, so a crash at any point loses or
+duplicates nothing: the next flusher run picks up where the previous one stopped.
+
+A batch that fails because of the data of a row, e.g. a user deleted since the event was
+queued, is committed again row by row. Rows that still fail are moved to the
+``dead_event`` table of the queue file with their error, so one bad row never stops the
+flush. Queue depth, flush lag and the number of dead rows are exported to Prometheus.
+"""
+
+import json
+import logging
+import sqlite3
+import threading
+import time
+
+from django.conf import settings
+from django.core.exceptions import ValidationError
+from django.db import DataError, IntegrityError, transaction
+from django.utils.dateparse import parse_datetime
+
+from prometheus_client.core import GaugeMetricFamily
+
+from event_management.metrics import register_collector
+
+from .cache import event_type_cache
+from .models import Event
+
+logger = logging.getLogger(__name__)
+
+# Errors caused by the data of a row, others like a lost connection stop the flush and the batch is retried
+ROW_ERRORS = (IntegrityError, DataError, ValidationError, KeyError, TypeError, ValueError)
+
+
+class EventQueue:
+    """Durable FIFO queue of validated events stored in a SQLite file.
+
+    Attributes:
+        path (str): Path of the queue database file
+    """
+
+    def __init__(self, path):
+        """Create the queue file and table if they don't exist."""
+        self.path = str(path)
+        self._local = threading.local()
+        with self.connection:
+            self.connection.execute(
+                "CREATE TABLE IF NOT EXISTS queued_event "
+                "(seq INTEGER PRIMARY KEY AUTOINCREMENT, payload TEXT NOT NULL)"
+            )
+            self.connection.execute(
+                "CREATE TABLE IF NOT EXISTS dead_event "
+                "(seq INTEGER PRIMARY KEY, payload TEXT NOT NULL, error TEXT NOT NULL, failed_at REAL NOT NULL)"
+            )
+
+    @property
+    def connection(self):
+        """sqlite3.Connection: Returns connection of the current thread."""
+        connection = getattr(self._local, "connection", None)
+        if connection is None:
+            connection = sqlite3.connect(self.path, timeout=30)
+            connection.execute("PRAGMA journal_mode=WAL")
+            connection.execute("PRAGMA synchronous=FULL")
+            self._local.connection = connection
+        return connection
+
+    def put(self, item):
+        """Append one event to the queue."""
+        self.put_many([item])
+
+    def put_many(self, items):
+        """Append events to the queue in one transaction, each with the ``queued_at`` time."""
+        queued_at = time.time()
+        with self.connection:
+            self.connection.executemany(
+                "INSERT INTO queued_event (payload) VALUES (?)",
+                [(json.dumps({**item, "queued_at": queued_at}),) for item in items],
+            )
+
+    def peek(self, limit):
+        """list: Returns up to limit oldest ``(seq, item)`` pairs without removing them."""
+        rows = self.connection.execute(
+            "SELECT seq, payload FROM queued_event ORDER BY seq LIMIT ?", (limit,)
+        ).fetchall()
+        return [(seq, json.loads(payload)) for seq, payload in rows]
+
+    def ack(self, last_seq, dead=()):
+        """Remove events up to and including last_seq, moving dead ``(seq, item, error)`` rows to the dead letters."""
+        failed_at = time.time()
+        with self.connection:
+            self.connection.executemany(
+                "INSERT OR REPLACE INTO dead_event (seq, payload, error, failed_at) VALUES (?, ?, ?, ?)",
+                [(seq, json.dumps(item), error, failed_at) for seq, item, error in dead],
+            )
+            self.connection.execute("DELETE FROM queued_event WHERE seq <= ?", (last_seq,))
+
+    def depth(self):
+        """int: Returns number of queued events."""
+        return self.connection.execute("SELECT count(*) FROM queued_event").fetchone()[0]
+
+    def lag(self):
+        """float: Returns seconds the oldest queued event has been waiting, 0 when the queue is empty."""
+        row = self.connection.execute(
+            "SELECT json_extract(payload, '$.queued_at') FROM queued_event ORDER BY seq LIMIT 1"
+        ).fetchone()
+        return max(time.time() - row[0], 0.0) if row and row[0] is not None else 0.0
+
+    def dead_letters(self, limit=100):
+        """list: Returns up to limit oldest ``(seq, item, error)`` rows that couldn't be committed."""
+        rows = self.connection.execute(
+            "SELECT seq, payload, error FROM dead_event ORDER BY seq LIMIT ?", (limit,)
+        ).fetchall()
+        return [(seq, json.loads(payload), error) for seq, payload, error in rows]
+
+    def dead_depth(self):
+        """int: Returns number of rows that couldn't be committed."""
+        return self.connection.execute("SELECT count(*) FROM dead_event").fetchone()[0]
+
+
+_queues = {}
+_queues_lock = threading.Lock()
+
+
+def get_event_queue():
+    """EventQueue: Returns the queue configured by EVENT_QUEUE_PATH setting."""
+    path = str(settings.EVENT_QUEUE_PATH)
+    with _queues_lock:
+        if path not in _queues:
+            _queues[path] = EventQueue(path)
+        return _queues[path]
+
+
+def enqueue_event(validated_data, user):
+    """UUID: Returns pre-generated id of the event appended to the queue."""
+    event_id = Event._meta.pk.get_default()
+    recurrence_end = validated_data.get("recurrence_end")
+    get_event_queue().put(
+        {
+            "id": str(event_id),
+            "user_id": user.pk,
+            "event_type": validated_data["event_type"],
+            "info": validated_data["info"],
+            "timestamp": validated_data["timestamp"].isoformat(),
+            "recurrence": validated_data.get("recurrence", ""),
+            "recurrence_exceptions": validated_data.get("recurrence_exceptions", []),
+            "recurrence_end": recurrence_end.isoformat() if recurrence_end else None,
+        }
+    )
+    return event_id
+
+
+class EventQueueCollector:
+    """Prometheus collector of the depth, lag and dead rows of the queue, read on every scrape."""
+
+    def describe(self):
+        """list: Returns metric families without values."""
+        return list(self.families())
+
+    def collect(self):
+        """list: Returns metric families with values, none when write-behind mode is off."""
+        if not settings.EVENT_WRITE_BEHIND:
+            return []
+        queue = get_event_queue()
+        return list(self.families(queue.depth(), queue.lag(), queue.dead_depth()))
+
+    @staticmethod
+    def families(depth=None, lag=None, dead=None):
+        """Yield gauges of the queue."""
+        yield GaugeMetricFamily("event_queue_depth", "Events waiting in the write-behind queue.", value=depth)
+        yield GaugeMetricFamily(
+            "event_queue_lag_seconds", "Seconds the oldest event of the write-behind queue has waited.", value=lag
+        )
+        yield GaugeMetricFamily(
+            "event_queue_dead_letters", "Queued events that couldn't be committed.", value=dead
+        )
+
+
+register_collector(EventQueueCollector())
+
+
+def queued_fields(item):
+    """dict: Returns fields of a queued event as ingest takes them."""
+    return {
+        "id": item["id"],
+        "user_id": item["user_id"],
+        "event_type": item["event_type"],
+        "info": item["info"],
+        "timestamp": parse_datetime(item["timestamp"]),
+        "recurrence": item.get("recurrence", ""),
+        "recurrence_exceptions": item.get("recurrence_exceptions", []),
+        "recurrence_end": parse_datetime(item["recurrence_end"]) if item.get("recurrence_end") else None,
+    }
+
+
+class EventQueueFlusher:
+    """Commits queued events to the database in batches.
+
+    Attributes:
+        queue (EventQueue): Queue to flush
+        batch_size (int): Maximum number of events committed at once
+        flushed (int): Number of events committed or moved to the dead letters by this flusher
+        batches (int): Number of committed batches
+        dead (int): Number of events moved to the dead letters by this flusher
+        last_flush_ms (float): Duration of the last committed batch
+    """
+
+    def __init__(self, queue, batch_size):
+        """Create flusher of the queue."""
+        self.queue = queue
+        self.batch_size = batch_size
+        self.flushed = 0
+        self.batches = 0
+        self.dead = 0
+        self.last_flush_ms = 0.0
+
+    def flush_batch(self):
+        """int: Returns number of events committed or moved to the dead letters from the head of the queue."""
+        rows = self.queue.peek(self.batch_size)
+        if not rows:
+            return 0
+        started = time.perf_counter()
+        dead = []
+        try:
+            with transaction.atomic():
+                Event.objects.ingest([queued_fields(item) for _, item in rows], ignore_conflicts=True)
+        except ROW_ERRORS as exc:
+            logger.warning("Flushing %d events failed, committing them one by one: %s", len(rows), exc)
+            dead = self.flush_rows(rows)
+        self.queue.ack(rows[-1][0], dead)
+        self.last_flush_ms = (time.perf_counter() - started) * 1000
+        self.flushed += len(rows)
+        self.batches += 1
+        self.dead += len(dead)
+        logger.info(
+            "Flushed %d events in %.1f ms, queue depth %d", len(rows), self.last_flush_ms, self.queue.depth()
+        )
+        return len(rows)
+
+    def flush_rows(self, rows):
+        """list: Returns ``(seq, item, error)`` of the rows that fail when committed one by one."""
+        # The event type of a row may have been deleted by another process, resolve the names again
+        for name in {item.get("event_type") for _, item in rows}:
+            if isinstance(name, str):
+                event_type_cache.invalidate(name)
+        dead = []
+        for seq, item in rows:
+            try:
+                with transaction.atomic():
+                    Event.objects.ingest([queued_fields(item)], ignore_conflicts=True)
+            except ROW_ERRORS as exc:
+                logger.error("Moving queued event %s to the dead letters: %s", item.get("id"), exc)
+                dead.append((seq, item, str(exc)))
+        return dead
+
+    def flush(self):
+        """int: Returns number of events committed or moved to the dead letters until the queue was drained."""
+        total = 0
+        while True:
+            flushed = self.flush_batch()
+            total += flushed
+            if flushed < self.batch_size:
+                return total
+
+    def run(self, interval_ms, stop=None):
+        """Flush full batches as they fill up and the rest every interval_ms until stop is set."""
+        stop = stop or threading.Event()
+        while not stop.is_set():
+            if self.flush_batch() < self.batch_size:
+                stop.wait(interval_ms / 1000)
+
+    def stats(self):
+        """dict: Returns queue depth and flush metrics."""
+        return {
+            "queue_depth": self.queue.depth(),
+            "flushed": self.flushed,
+            "batches": self.batches,
+            "dead": self.dead,
+            "last_flush_ms": round(self.last_flush_ms, 3),
+        }
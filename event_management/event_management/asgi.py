@@ -2,6 +2,8 @@
 ASGI config for event_management project.
 
 It exposes the ASGI callable as a module-level variable named ``application``.
+Requests to the event stream are served by a plain ASGI application, all other
+requests by Django.
 
 For more information on this file, see
 https://docs.djangoproject.com/en/4.1/howto/deployment/asgi/
@@ -13,4 +15,14 @@ from django.core.asgi import get_asgi_application
 
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'event_management.settings')
 
-application = get_asgi_application()
+django_application = get_asgi_application()
+
+# Imported once Django is set up
+from event.streaming import STREAM_PATH, event_stream  # noqa: E402
+
+
+async def application(scope, receive, send):
+    """Route the event stream to its ASGI application and everything else to Django."""
+    if scope["type"] == "http" and scope["path"] == STREAM_PATH:
+        return await event_stream(scope, receive, send)
+    return await django_application(scope, receive, send)
@@ -0,0 +1,130 @@
+"""Database routing for EventManagement project.
+
+Reads of the event app go to the replicas listed in DATABASE_REPLICAS and writes go
+to the primary (``default``). A client that wrote during a request is pinned to the
+primary for REPLICA_STICKY_SECONDS so it reads its own writes despite replication lag.
+Clients are identified by their token or session cookie, so no query is needed to
+decide where to route.
+"""
+
+import hashlib
+import random
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from django.conf import settings
+from django.core.cache import caches
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+
+PIN_KEY_PREFIX = "db:pin:"
+
+_routing = ContextVar("routing", default=None)
+
+
+class RoutingState:
+    """Routing decisions of the current request.
+
+    Attributes:
+        primary (bool): Reads go to the primary
+        wrote (bool): The request wrote to the primary
+    """
+
+    def __init__(self, primary=False):
+        """Create state of a request."""
+        self.primary = primary
+        self.wrote = False
+
+
+@contextmanager
+def use_primary():
+    """Send all reads inside the block to the primary."""
+    state = RoutingState(primary=True)
+    token = _routing.set(state)
+    try:
+        yield state
+    finally:
+        _routing.reset(token)
+
+
+def get_client_key(request):
+    """str: Returns hashed token or session key identifying the client or None."""
+    credential = request.META.get("HTTP_AUTHORIZATION") or request.COOKIES.get(settings.SESSION_COOKIE_NAME)
+    return hashlib.sha256(credential.encode()).hexdigest() if credential else None
+
+
+class PrimaryReplicaRouter:
+    """Routes reads of the event app to replicas and all writes to the primary."""
+
+    route_app_labels = {"event"}
+
+    def db_for_read(self, model, **hints):
+        """Return a random replica unless the current request is pinned to the primary."""
+        if model._meta.app_label not in self.route_app_labels or not settings.DATABASE_REPLICAS:
+            return None
+        state = _routing.get()
+        if state is not None and state.primary:
+            return "default"
+        return random.choice(settings.DATABASE_REPLICAS)
+
+    def db_for_write(self, model, **hints):
+        """Return the primary and pin the rest of the request to it."""
+        state = _routing.get()
+        if state is not None:
+            state.primary = state.wrote = True
+        return "default"
+
+    def allow_relation(self, obj1, obj2, **hints):
+        """Allow relations, replicas hold the same data as the primary."""
+        return True
+
+
+class ReplicaRoutingMiddleware:
+    """Keeps routing state per request and pins clients that wrote to the primary."""
+
+    sync_capable = async_capable = True
+
+    def __init__(self, get_response):
+        """Create middleware in the mode of the handler it wraps."""
+        self.get_response = get_response
+        self.is_async = iscoroutinefunction(get_response)
+        if self.is_async:
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        """Route reads of a recently writing client to the primary."""
+        if self.is_async:
+            return self.__acall__(request)
+        if not settings.DATABASE_REPLICAS:
+            return self.get_response(request)
+
+        pins = caches[settings.REPLICA_PIN_CACHE_ALIAS]
+        client_key = get_client_key(request)
+        pinned = client_key is not None and pins.get(PIN_KEY_PREFIX + client_key, False)
+        state = RoutingState(primary=pinned)
+        token = _routing.set(state)
+        try:
+            response = self.get_response(request)
+        finally:
+            _routing.reset(token)
+        if state.wrote and client_key is not None:
+            pins.set(PIN_KEY_PREFIX + client_key, True, settings.REPLICA_STICKY_SECONDS)
+        return response
+
+    async def __acall__(self, request):
+        """Route reads of a recently writing client to the primary without blocking the event loop."""
+        if not settings.DATABASE_REPLICAS:
+            return await self.get_response(request)
+
+        pins = caches[settings.REPLICA_PIN_CACHE_ALIAS]
+        client_key = get_client_key(request)
+        pinned = client_key is not None and await pins.aget(PIN_KEY_PREFIX + client_key, False)
+        state = RoutingState(primary=pinned)
+        token = _routing.set(state)
+        try:
+            response = await self.get_response(request)
+        finally:
+            _routing.reset(token)
+        if state.wrote and client_key is not None:
+            await pins.aset(PIN_KEY_PREFIX + client_key, True, settings.REPLICA_STICKY_SECONDS)
+        return response
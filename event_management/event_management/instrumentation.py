@@ -0,0 +1,184 @@
+"""Per-request performance instrumentation for EventManagement project.
+
+RequestTimingMiddleware keeps the measurements of the current request in a context
+variable. Number and total time of database queries are recorded for every request by
+record_query, an execute wrapper installed once on every database connection, and are
+read by MetricsMiddleware through ``current_timings()``. A sampled share of requests is
+measured in detail: wall time, queries and named phases such as ``auth`` and
+``serializer`` recorded with ``timed()``. The measurements are sent back in a
+``Server-Timing`` header and logged as one JSON line. Requests over the query or latency
+budget in INSTRUMENTATION are logged as warnings, wall time is checked for every
+request, sampled or not.
+
+``timed()`` outside a sampled request costs one context variable lookup. Streamed
+response bodies are produced after the middleware returns and are not included. Under
+ASGI the middleware runs on the event loop, the context variable is copied into the
+threads async views run sync code in, so their queries and phases are measured too.
+"""
+
+import json
+import logging
+import random
+import time
+from collections import defaultdict
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from django.conf import settings
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+
+logger = logging.getLogger(__name__)
+
+_timings = ContextVar("timings", default=None)
+
+
+class RequestTimings:
+    """Measurements of one request.
+
+    Attributes:
+        sampled (bool): Phases are measured and the request is logged
+        queries (int): Number of executed database queries
+        db_seconds (float): Total time spent executing them
+        phases (dict): Maps phase name to seconds spent in it
+    """
+
+    def __init__(self, sampled=True):
+        """Create empty measurements."""
+        self.sampled = sampled
+        self.queries = 0
+        self.db_seconds = 0.0
+        self.phases = defaultdict(float)
+
+
+def current_timings():
+    """RequestTimings: Returns measurements of the current request, None outside RequestTimingMiddleware."""
+    return _timings.get()
+
+
+def record_query(execute, sql, params, many, context):
+    """Execute wrapper adding every query to the measurements of the current request."""
+    timings = _timings.get()
+    if timings is None:
+        return execute(sql, params, many, context)
+    started = time.perf_counter()
+    try:
+        return execute(sql, params, many, context)
+    finally:
+        timings.db_seconds += time.perf_counter() - started
+        timings.queries += 1
+
+
+def install_query_recorder(connection):
+    """Add record_query to the execute wrappers of a database connection once."""
+    if record_query not in connection.execute_wrappers:
+        connection.execute_wrappers.insert(0, record_query)
+
+
+@contextmanager
+def timed(name):
+    """Add time spent in the block to the named phase of the current sampled request."""
+    timings = _timings.get()
+    if timings is None or not timings.sampled:
+        yield
+        return
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        timings.phases[name] += time.perf_counter() - started
+
+
+class TimedSerializerMixin:
+    """Records validation and representation time of a serializer as the ``serializer`` phase."""
+
+    def is_valid(self, raise_exception=False):
+        """bool: Returns result of validation timed as the serializer phase."""
+        with timed("serializer"):
+            return super().is_valid(raise_exception=raise_exception)
+
+    def to_representation(self, instance):
+        """dict: Returns representation timed as the serializer phase."""
+        with timed("serializer"):
+            return super().to_representation(instance)
+
+
+def format_server_timing(total_ms, timings):
+    """str: Returns ``Server-Timing`` header value of the measurements."""
+    metrics = [f"total;dur={total_ms:.2f}", f'db;dur={timings.db_seconds * 1000:.2f};desc="{timings.queries} queries"']
+    metrics.extend(f"{name};dur={seconds * 1000:.2f}" for name, seconds in timings.phases.items())
+    return ", ".join(metrics)
+
+
+class RequestTimingMiddleware:
+    """Measures sampled requests and flags requests over the query or latency budget."""
+
+    sync_capable = async_capable = True
+
+    def __init__(self, get_response):
+        """Create middleware in the mode of the handler it wraps."""
+        self.get_response = get_response
+        self.is_async = iscoroutinefunction(get_response)
+        if self.is_async:
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        """Measure the request and log the result."""
+        if self.is_async:
+            return self.__acall__(request)
+        started = time.perf_counter()
+        timings = RequestTimings(sampled=random.random() < settings.INSTRUMENTATION["SAMPLE_RATE"])
+        token = _timings.set(timings)
+        try:
+            response = self.get_response(request)
+        finally:
+            _timings.reset(token)
+        return self.finish(request, response, started, timings)
+
+    async def __acall__(self, request):
+        """Measure the request and log the result, on the event loop."""
+        started = time.perf_counter()
+        timings = RequestTimings(sampled=random.random() < settings.INSTRUMENTATION["SAMPLE_RATE"])
+        token = _timings.set(timings)
+        try:
+            response = await self.get_response(request)
+        finally:
+            _timings.reset(token)
+        return self.finish(request, response, started, timings)
+
+    def finish(self, request, response, started, timings):
+        """HttpResponse: Returns response with the Server-Timing header of a sampled request, after logging it."""
+        options = settings.INSTRUMENTATION
+        total_ms = (time.perf_counter() - started) * 1000
+        if not timings.sampled:
+            if total_ms > options["LATENCY_BUDGET_MS"]:
+                self.log(request, response, total_ms, None, ["latency"])
+            return response
+
+        over_budget = []
+        if timings.queries > options["QUERY_BUDGET"]:
+            over_budget.append("queries")
+        if total_ms > options["LATENCY_BUDGET_MS"]:
+            over_budget.append("latency")
+        if options["SERVER_TIMING_HEADER"]:
+            response["Server-Timing"] = format_server_timing(total_ms, timings)
+        self.log(request, response, total_ms, timings, over_budget)
+        return response
+
+    @staticmethod
+    def log(request, response, total_ms, timings, over_budget):
+        """Log measurements as one JSON line, as a warning when the request is over budget."""
+        record = {
+            "method": request.method,
+            "path": request.path,
+            "status": response.status_code,
+            "total_ms": round(total_ms, 2),
+            "sampled": timings is not None,
+        }
+        if timings is not None:
+            record["queries"] = timings.queries
+            record["db_ms"] = round(timings.db_seconds * 1000, 2)
+            record.update((f"{name}_ms", round(seconds * 1000, 2)) for name, seconds in timings.phases.items())
+        if over_budget:
+            record["over_budget"] = over_budget
+        logger.log(logging.WARNING if over_budget else logging.INFO, json.dumps(record))
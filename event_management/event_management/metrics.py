@@ -0,0 +1,169 @@
+"""Prometheus metrics for EventManagement project.
+
+Metrics are plain prometheus_client counters and histograms, updated in-process
+without any shared lock. With several worker processes, set PROMETHEUS_MULTIPROC_DIR
+to an empty directory before the workers start: every process then writes its values
+to its own memory-mapped files there and ``/metrics`` aggregates the files of all
+processes, so any worker answers a scrape with totals for the whole server.
+``gunicorn.conf.py`` clears the directory on start and drops files of exited workers.
+
+Values that any process can read, like the depth of the write-behind queue, come from
+collectors added with register_collector and are read on every scrape instead.
+"""
+
+import os
+import threading
+import time
+
+from django.conf import settings
+from django.http import HttpResponse
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from rest_framework.exceptions import ValidationError
+
+from prometheus_client import CONTENT_TYPE_LATEST, REGISTRY, CollectorRegistry, Counter, Histogram, generate_latest
+from prometheus_client import multiprocess
+
+from .instrumentation import current_timings
+
+REQUEST_LATENCY = Histogram(
+    "http_request_duration_seconds", "Request latency by view.", ["view", "method"]
+)
+REQUEST_QUERIES = Histogram(
+    "http_request_db_queries",
+    "Database queries per request by view.",
+    ["view"],
+    buckets=(0, 1, 2, 3, 5, 10, 20, 50, 100, 200),
+)
+EVENTS_CREATED = Counter("events_created", "Created events by event type.", ["event_type"])
+VALIDATION_FAILURES = Counter(
+    "validation_failures", "Rejected fields by serializer, field and error code.", ["serializer", "field", "code"]
+)
+PAST_TIMESTAMP_REJECTIONS = Counter(
+    "event_past_timestamp_rejections", "Timestamps rejected by validate_datetime_is_future."
+)
+CACHE_LOOKUPS = Counter("cache_lookups", "Cache lookups by cache and result.", ["cache", "result"])
+EVENTS_DISPATCHED = Counter("events_dispatched", "Due events passed to dispatcher handlers by result.", ["result"])
+DISPATCH_LATENESS = Histogram(
+    "event_dispatch_lateness_seconds",
+    "Time between the due time of an event and its dispatch.",
+    buckets=(0.01, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60),
+)
+
+OTHER_LABEL = "other"
+
+_collectors = []
+
+_event_types = set()
+_event_types_lock = threading.Lock()
+
+
+def event_type_label(name):
+    """str: Returns label of an event type, ``other`` once METRICS_MAX_EVENT_TYPES names are in use.
+
+    Clients create event types freely, so the number of label values is bounded per process.
+    """
+    if name in _event_types:
+        return name
+    with _event_types_lock:
+        if len(_event_types) < settings.METRICS_MAX_EVENT_TYPES:
+            _event_types.add(name)
+            return name
+    return OTHER_LABEL
+
+
+def record_events_created(events):
+    """Count created events by event type, called once their transaction committed."""
+    counts = {}
+    for event in events:
+        label = event_type_label(event.event_type.name)
+        counts[label] = counts.get(label, 0) + 1
+    for label, count in counts.items():
+        EVENTS_CREATED.labels(label).inc(count)
+
+
+def record_validation_errors(serializer):
+    """Count fields rejected by a serializer by their first error code."""
+    name = type(serializer).__name__
+    for field, errors in serializer.errors.items():
+        error = errors[0] if isinstance(errors, list) and errors else None
+        VALIDATION_FAILURES.labels(name, field, getattr(error, "code", "invalid")).inc()
+
+
+class ValidationMetricsMixin:
+    """Counts fields rejected by a serializer in VALIDATION_FAILURES."""
+
+    def is_valid(self, raise_exception=False):
+        """bool: Returns result of validation after counting rejected fields."""
+        try:
+            valid = super().is_valid(raise_exception=raise_exception)
+        except ValidationError:
+            record_validation_errors(self)
+            raise
+        if not valid:
+            record_validation_errors(self)
+        return valid
+
+
+class MetricsMiddleware:
+    """Observes latency and query count of every request by the name of its view.
+
+    Queries are counted by RequestTimingMiddleware, which comes before it in MIDDLEWARE.
+    """
+
+    sync_capable = async_capable = True
+
+    def __init__(self, get_response):
+        """Create middleware in the mode of the handler it wraps."""
+        self.get_response = get_response
+        self.is_async = iscoroutinefunction(get_response)
+        if self.is_async:
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        """Observe the request."""
+        if self.is_async:
+            return self.__acall__(request)
+        started = time.perf_counter()
+        response = self.get_response(request)
+        self.observe(request, time.perf_counter() - started)
+        return response
+
+    async def __acall__(self, request):
+        """Observe the request on the event loop."""
+        started = time.perf_counter()
+        response = await self.get_response(request)
+        self.observe(request, time.perf_counter() - started)
+        return response
+
+    @staticmethod
+    def observe(request, elapsed):
+        """Observe latency and query count of the request."""
+        match = getattr(request, "resolver_match", None)
+        view = match.view_name if match is not None else "unresolved"
+        REQUEST_LATENCY.labels(view, request.method).observe(elapsed)
+        timings = current_timings()
+        if timings is not None:
+            REQUEST_QUERIES.labels(view).observe(timings.queries)
+
+
+def register_collector(collector):
+    """Add a collector read on every scrape, in single and multiprocess mode."""
+    _collectors.append(collector)
+    REGISTRY.register(collector)
+
+
+def get_registry():
+    """CollectorRegistry: Returns registry aggregating all processes in multiprocess mode."""
+    if not os.environ.get("PROMETHEUS_MULTIPROC_DIR"):
+        return REGISTRY
+    registry = CollectorRegistry()
+    multiprocess.MultiProcessCollector(registry)
+    for collector in _collectors:
+        registry.register(collector)
+    return registry
+
+
+def metrics_view(request):
+    """Return metrics in Prometheus text format."""
+    return HttpResponse(generate_latest(get_registry()), content_type=CONTENT_TYPE_LATEST)
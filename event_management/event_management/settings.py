@@ -41,6 +41,7 @@ INSTALLED_APPS = [
     "django.contrib.staticfiles",
     # my apps
     "event",
+    "user",
     # third apps
     "rest_framework",
     "rest_framework.authtoken",
@@ -48,12 +49,15 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    "event_management.instrumentation.RequestTimingMiddleware",
+    "event_management.metrics.MetricsMiddleware",
     "django.middleware.security.SecurityMiddleware",
-    "whitenoise.middleware.WhiteNoiseMiddleware",  # whitenoise
+    "event_management.static.StaticFilesMiddleware",  # whitenoise, also async
     "django.contrib.sessions.middleware.SessionMiddleware",
     "django.middleware.common.CommonMiddleware",
     "django.middleware.csrf.CsrfViewMiddleware",
     "django.contrib.auth.middleware.AuthenticationMiddleware",
+    "event_management.db.ReplicaRoutingMiddleware",
     "django.contrib.messages.middleware.MessageMiddleware",
     "django.middleware.clickjacking.XFrameOptionsMiddleware",
 ]
@@ -86,6 +90,43 @@ DATABASES = {
     "default": {
         "ENGINE": "django.db.backends.sqlite3",
         "NAME": BASE_DIR / "db.sqlite3",
+        "CONN_MAX_AGE": config("DB_CONN_MAX_AGE", default=600, cast=int),
+        "CONN_HEALTH_CHECKS": True,
+        "OPTIONS": {"timeout": 20},
+    }
+}
+
+# Read replicas, e.g. DATABASE_REPLICA_NAMES=replica.sqlite3 for a local stand-in
+DATABASE_REPLICAS = []
+
+for index, name in enumerate(config("DATABASE_REPLICA_NAMES", default="", cast=Csv())):
+    DATABASE_REPLICAS.append(f"replica{index}")
+    DATABASES[f"replica{index}"] = {**DATABASES["default"], "NAME": name, "TEST": {"MIRROR": "default"}}
+
+DATABASE_ROUTERS = ["event_management.db.PrimaryReplicaRouter"]
+
+# Seconds a client reads from the primary after writing to it
+REPLICA_STICKY_SECONDS = config("REPLICA_STICKY_SECONDS", default=5, cast=int)
+
+REPLICA_PIN_CACHE_ALIAS = "default"
+
+# Applied to every new SQLite connection
+SQLITE_PRAGMAS = {
+    "journal_mode": "WAL",
+    "synchronous": "NORMAL",
+    "cache_size": -20000,
+    "temp_store": "MEMORY",
+    "mmap_size": 268435456,
+}
+
+
+# Cache
+# https://docs.djangoproject.com/en/4.1/topics/cache/
+
+CACHES = {
+    "default": {
+        "BACKEND": config("CACHE_BACKEND", default="django.core.cache.backends.locmem.LocMemCache"),
+        "LOCATION": config("CACHE_LOCATION", default=""),
     }
 }
 
@@ -130,6 +171,17 @@ STATIC_ROOT = BASE_DIR / "staticfiles"
 
 STATICFILES_STORAGE = "django.contrib.staticfiles.storage.StaticFilesStorage"  # whitenoise
 
+# API schema and docs pages rendered by generate_api_docs, served by whitenoise at the site root.
+# Until the command has run the docs views render them on every request, like with API_DOCS_DYNAMIC.
+API_DOCS_ROOT = Path(config("API_DOCS_ROOT", default=str(BASE_DIR / "apidocs")))
+
+WHITENOISE_ROOT = API_DOCS_ROOT
+
+WHITENOISE_INDEX_FILE = True
+
+# Generate the schema on every request to the docs views instead, e.g. while developing the API
+API_DOCS_DYNAMIC = config("API_DOCS_DYNAMIC", default=False, cast=bool)
+
 # Default primary key field type
 # https://docs.djangoproject.com/en/4.1/ref/settings/#default-auto-field
 
@@ -138,10 +190,142 @@ DEFAULT_AUTO_FIELD = "django.db.models.BigAutoField"
 
 REST_FRAMEWORK = {
     "DEFAULT_AUTHENTICATION_CLASSES": [
-        "rest_framework.authentication.TokenAuthentication",
+        "user.authentication.CachedTokenAuthentication",
+    ],
+    # orjson based, they fall back to the json module when orjson isn't installed
+    "DEFAULT_RENDERER_CLASSES": [
+        "event.renderers.ORJSONRenderer",
+        "rest_framework.renderers.BrowsableAPIRenderer",
     ],
+    "DEFAULT_PARSER_CLASSES": [
+        "event.parsers.ORJSONParser",
+        "rest_framework.parsers.FormParser",
+        "rest_framework.parsers.MultiPartParser",
+    ],
+}
+
+# Event ingestion
+
+EVENT_BULK_BATCH_SIZE = config("EVENT_BULK_BATCH_SIZE", default=500, cast=int)
+
+EVENT_BULK_MAX_ITEMS = config("EVENT_BULK_MAX_ITEMS", default=10000, cast=int)
+
+EVENT_PAGE_SIZE = config("EVENT_PAGE_SIZE", default=100, cast=int)
+
+EVENT_MAX_PAGE_SIZE = config("EVENT_MAX_PAGE_SIZE", default=1000, cast=int)
+
+# Keys of Event.info that get an expression index and can be filtered by as info__<key>
+EVENT_INFO_INDEXED_KEYS = config("EVENT_INFO_INDEXED_KEYS", default="username,source", cast=Csv())
+
+# Info of event types with a schema is stored packed, compressed when longer than this many bytes
+EVENT_INFO_COMPRESS_THRESHOLD = config("EVENT_INFO_COMPRESS_THRESHOLD", default=256, cast=int)
+
+EVENT_EXPORT_CHUNK_SIZE = config("EVENT_EXPORT_CHUNK_SIZE", default=2000, cast=int)
+
+# Events indexed again in one transaction by reindex_events
+EVENT_SEARCH_REINDEX_BATCH_SIZE = config("EVENT_SEARCH_REINDEX_BATCH_SIZE", default=5000, cast=int)
+
+# Admin changelists of events count at most this many rows, larger counts are estimated
+EVENT_ADMIN_COUNT_LIMIT = config("EVENT_ADMIN_COUNT_LIMIT", default=10000, cast=int)
+
+# Recurring events: maximum occurrences of a bounded series and how far listings expand unbounded ones
+EVENT_RECURRENCE_MAX_OCCURRENCES = config("EVENT_RECURRENCE_MAX_OCCURRENCES", default=1000, cast=int)
+
+EVENT_RECURRENCE_HORIZON_DAYS = config("EVENT_RECURRENCE_HORIZON_DAYS", default=366, cast=int)
+
+# Rules without an occurrence this many years after the start of the event are rejected
+EVENT_RECURRENCE_SEARCH_YEARS = config("EVENT_RECURRENCE_SEARCH_YEARS", default=100, cast=int)
+
+# Events older than EVENT_ARCHIVE_AFTER_DAYS are moved to the archive table by archive_events,
+# the setting must not grow while the archive holds events newer than the new cutoff
+EVENT_ARCHIVE_AFTER_DAYS = config("EVENT_ARCHIVE_AFTER_DAYS", default=30, cast=int)
+
+EVENT_ARCHIVE_BATCH_SIZE = config("EVENT_ARCHIVE_BATCH_SIZE", default=1000, cast=int)
+
+# Write-behind mode: create requests are queued in EVENT_QUEUE_PATH and committed by flush_event_queue
+EVENT_WRITE_BEHIND = config("EVENT_WRITE_BEHIND", default=False, cast=bool)
+
+EVENT_QUEUE_PATH = config("EVENT_QUEUE_PATH", default=str(BASE_DIR / "event_queue.sqlite3"))
+
+EVENT_QUEUE_BATCH_SIZE = config("EVENT_QUEUE_BATCH_SIZE", default=500, cast=int)
+
+EVENT_QUEUE_FLUSH_INTERVAL_MS = config("EVENT_QUEUE_FLUSH_INTERVAL_MS", default=200, cast=int)
+
+# Due-event dispatcher: run_dispatcher calls HANDLERS (dotted paths) with every event when its time arrives.
+# Events due within LOOKAHEAD seconds are kept in memory and read again every POLL_INTERVAL seconds, events
+# written up to CREATE_MARGIN seconds after they were due are fired late and a shard is held for LEASE_TIMEOUT
+# seconds without renewal.
+EVENT_DISPATCHER = {
+    "HANDLERS": config("EVENT_DISPATCHER_HANDLERS", default="event.dispatcher.log_due_event", cast=Csv()),
+    "LOOKAHEAD": config("EVENT_DISPATCHER_LOOKAHEAD", default=300, cast=int),
+    "POLL_INTERVAL": config("EVENT_DISPATCHER_POLL_INTERVAL", default=1.0, cast=float),
+    "CREATE_MARGIN": config("EVENT_DISPATCHER_CREATE_MARGIN", default=30, cast=int),
+    "LEASE_TIMEOUT": config("EVENT_DISPATCHER_LEASE_TIMEOUT", default=30, cast=int),
+}
+
+# Change feed of created events streamed from /api/events/stream/ on the ASGI application, stored in PATH.
+# Every process reads new events once per POLL_INTERVAL seconds for all of its subscribers.
+EVENT_FEED = {
+    "ENABLED": config("EVENT_FEED_ENABLED", default=False, cast=bool),
+    "PATH": config("EVENT_FEED_PATH", default=str(BASE_DIR / "event_feed.sqlite3")),
+    "MAX_ROWS": config("EVENT_FEED_MAX_ROWS", default=100000, cast=int),
+    "BATCH_SIZE": config("EVENT_FEED_BATCH_SIZE", default=500, cast=int),
+    "POLL_INTERVAL": config("EVENT_FEED_POLL_INTERVAL", default=0.5, cast=float),
+    "QUEUE_SIZE": config("EVENT_FEED_QUEUE_SIZE", default=1000, cast=int),
+    "HEARTBEAT": config("EVENT_FEED_HEARTBEAT", default=15, cast=float),
 }
 
+# Cached feed of the next SIZE events of a user, dropped when the user's events change
+UPCOMING_EVENTS = {
+    "ALIAS": config("UPCOMING_EVENTS_CACHE_ALIAS", default="default"),
+    "SIZE": config("UPCOMING_EVENTS_SIZE", default=50, cast=int),
+    "DEFAULT_LIMIT": config("UPCOMING_EVENTS_DEFAULT_LIMIT", default=10, cast=int),
+    "TIMEOUT": config("UPCOMING_EVENTS_TIMEOUT", default=300, cast=int),
+}
+
+# ALIAS enables the shared tier, e.g. "default" with a file-based CACHE_BACKEND
+EVENT_TYPE_CACHE = {
+    "MAX_SIZE": config("EVENT_TYPE_CACHE_MAX_SIZE", default=1024, cast=int),
+    "TTL": config("EVENT_TYPE_CACHE_TTL", default=60, cast=int),
+    "ALIAS": config("EVENT_TYPE_CACHE_ALIAS", default=""),
+    "TIMEOUT": config("EVENT_TYPE_CACHE_TIMEOUT", default=3600, cast=int),
+}
+
+# Info schemas of event types, TTL bounds how long a replaced active schema is still used
+EVENT_INFO_SCHEMA_CACHE = {
+    "MAX_SIZE": config("EVENT_INFO_SCHEMA_CACHE_MAX_SIZE", default=1024, cast=int),
+    "TTL": config("EVENT_INFO_SCHEMA_CACHE_TTL", default=60, cast=int),
+}
+
+# Token authentication cache, ALIAS enables the shared tier
+
+TOKEN_CACHE = {
+    "MAX_SIZE": config("TOKEN_CACHE_MAX_SIZE", default=10000, cast=int),
+    "TTL": config("TOKEN_CACHE_TTL", default=30, cast=int),
+    "ALIAS": config("TOKEN_CACHE_ALIAS", default=""),
+    "TIMEOUT": config("TOKEN_CACHE_TIMEOUT", default=60, cast=int),
+}
+
+# Bulk user provisioning, WORKERS processes hash passwords (0 uses all CPUs)
+USER_PROVISIONING = {
+    "WORKERS": config("USER_PROVISIONING_WORKERS", default=0, cast=int),
+    "CHUNK_SIZE": config("USER_PROVISIONING_CHUNK_SIZE", default=16, cast=int),
+    "BATCH_SIZE": config("USER_PROVISIONING_BATCH_SIZE", default=500, cast=int),
+    "MAX_ITEMS": config("USER_PROVISIONING_MAX_ITEMS", default=1000, cast=int),
+}
+
+# Request instrumentation: share of requests measured in detail and budgets flagging slow requests
+INSTRUMENTATION = {
+    "SAMPLE_RATE": config("INSTRUMENTATION_SAMPLE_RATE", default=1.0, cast=float),
+    "QUERY_BUDGET": config("INSTRUMENTATION_QUERY_BUDGET", default=20, cast=int),
+    "LATENCY_BUDGET_MS": config("INSTRUMENTATION_LATENCY_BUDGET_MS", default=500, cast=float),
+    "SERVER_TIMING_HEADER": config("INSTRUMENTATION_SERVER_TIMING_HEADER", default=True, cast=bool),
+}
+
+# Prometheus metrics, set PROMETHEUS_MULTIPROC_DIR in the environment when running several workers
+# Event types beyond this number are counted under the "other" label
+METRICS_MAX_EVENT_TYPES = config("METRICS_MAX_EVENT_TYPES", default=100, cast=int)
+
 SWAGGER_SETTINGS = {
     "exclude_namespaces": [],  # List URL namespaces to ignore
     "USE_SESSION_AUTH": False,
@@ -155,8 +339,10 @@ SWAGGER_SETTINGS = {
     },
     "SUPPORTED_SUBMIT_METHODS": ["get", "put", "post", "delete", "patch"],
     "SHOW_REQUEST_HEADERS": True,
+    "SPEC_URL": "/swagger.json",
 }
 
 REDOC_SETTINGS = {
     "LAZY_RENDERING": False,
+    "SPEC_URL": "/swagger.json",
 }
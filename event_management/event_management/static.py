@@ -0,0 +1,39 @@
+"""Static file serving for EventManagement project.
+
+WhiteNoiseMiddleware is sync only, so under ASGI Django would run it, and with it every
+middleware and view below it, in a worker thread. StaticFilesMiddleware serves the same
+files and settings but also runs on the event loop: only static files are read in a
+thread, other requests are passed on without leaving the loop.
+"""
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction, sync_to_async
+from whitenoise.middleware import WhiteNoiseMiddleware
+
+
+class StaticFilesMiddleware(WhiteNoiseMiddleware):
+    """WhiteNoiseMiddleware serving static files under both WSGI and ASGI."""
+
+    sync_capable = async_capable = True
+
+    def __init__(self, get_response):
+        """Create middleware in the mode of the handler it wraps."""
+        super().__init__(get_response)
+        self.is_async = iscoroutinefunction(get_response)
+        if self.is_async:
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        """Serve a static file or pass the request on."""
+        if self.is_async:
+            return self.__acall__(request)
+        return super().__call__(request)
+
+    async def __acall__(self, request):
+        """Serve a static file in a thread or pass the request on."""
+        if self.autorefresh:
+            static_file = await sync_to_async(self.find_file)(request.path_info)
+        else:
+            static_file = self.files.get(request.path_info)
+        if static_file is not None:
+            return await sync_to_async(self.serve)(static_file, request)
+        return await self.get_response(request)
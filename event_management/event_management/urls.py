@@ -1,11 +1,14 @@
 """Event management URL Configuration."""
 
+import os
+
+from django.conf import settings
 from django.contrib import admin
 from django.urls import include, path
 
 from rest_framework.authtoken import views
 
-from .yasg import urlpatterns as doc_urls
+from .metrics import metrics_view
 
 
 urlpatterns = [
@@ -13,7 +16,12 @@ urlpatterns = [
     path("api/events/", include("event.urls")),
     path("api/users/", include("user.urls")),
     path("api-token-auth/", views.obtain_auth_token),
+    path("metrics", metrics_view, name="metrics"),
 ]
 
+if settings.API_DOCS_DYNAMIC or not os.path.exists(os.path.join(settings.API_DOCS_ROOT, "swagger.json")):
+    # Imported only here so that drf_yasg is not loaded by workers serving pre-generated docs,
+    # without them, e.g. in a checkout where generate_api_docs hasn't run, the views render the docs
+    from .yasg import urlpatterns as doc_urls
 
-urlpatterns += doc_urls
+    urlpatterns += doc_urls
@@ -1,22 +1,26 @@
-"""Module with URLs to the swagger and schema view."""
+"""Module with the API description and URLs to the dynamic swagger and schema views.
+
+The URLs are mounted with API_DOCS_DYNAMIC, e.g. while developing the API, and when
+API_DOCS_ROOT holds no generated docs. Otherwise the ``generate_api_docs`` command
+renders the schema and docs pages once into API_DOCS_ROOT, which whitenoise serves with
+ETag and 304 responses, and drf_yasg is never imported by the API workers.
+"""
 
 from django.urls import path, re_path
 
 from drf_yasg import openapi
 from drf_yasg.views import get_schema_view
 
-
-schema_view = get_schema_view(
-    openapi.Info(
-        title="Event Management Project",
-        default_version="v1",
-        description="The best site",
-        contact=openapi.Contact(email="example@gmail.com"),
-        license=openapi.License(name="BSD License"),
-    ),
-    public=True,
+api_info = openapi.Info(
+    title="Event Management Project",
+    default_version="v1",
+    description="The best site",
+    contact=openapi.Contact(email="example@gmail.com"),
+    license=openapi.License(name="BSD License"),
 )
 
+schema_view = get_schema_view(api_info, public=True)
+
 urlpatterns = [
     re_path(r"^swagger(?P<format>\.json|\.yaml)$", schema_view.without_ui(cache_timeout=0), name="schema-json"),
     path("", schema_view.with_ui("swagger", cache_timeout=0), name="schema-swagger-ui"),
@@ -0,0 +1,24 @@
+"""Gunicorn configuration keeping Prometheus multiprocess metrics consistent.
+
+Run ``PROMETHEUS_MULTIPROC_DIR=/tmp/metrics gunicorn -w 4 event_management.wsgi``
+from this directory.
+"""
+
+import os
+import shutil
+
+from prometheus_client import multiprocess
+
+
+def on_starting(server):
+    """Start with an empty metrics directory, values of a previous run would be added to new ones."""
+    path = os.environ.get("PROMETHEUS_MULTIPROC_DIR")
+    if path:
+        shutil.rmtree(path, ignore_errors=True)
+        os.makedirs(path)
+
+
+def child_exit(server, worker):
+    """Drop live gauge files of an exited worker, its counters stay in the totals."""
+    if os.environ.get("PROMETHEUS_MULTIPROC_DIR"):
+        multiprocess.mark_process_dead(worker.pid)
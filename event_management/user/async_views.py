@@ -0,0 +1,34 @@
+"""This module provides native async User views for ASGI deployments."""
+
+from django.contrib.auth.hashers import make_password
+from django.http import JsonResponse
+
+from asgiref.sync import sync_to_async
+from rest_framework import status
+
+from event.async_views import AsyncAPIView
+
+from .serializers import User, UserSerializer
+
+
+class UserCreateAsyncView(AsyncAPIView):
+    """This view is used for creating new user on the ASGI application.
+
+    Password hashing runs in a worker thread outside the thread that serializes ORM access.
+    """
+
+    async def post(self, request, *args, **kwargs):
+        """Post method for creating users."""
+        data = self.parse_json(request)
+        if data is None:
+            return JsonResponse({"detail": "JSON parse error."}, status=status.HTTP_400_BAD_REQUEST)
+
+        serializer = UserSerializer(data=data)
+        if not await sync_to_async(serializer.is_valid)():
+            return JsonResponse(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+        validated_data = dict(serializer.validated_data)
+        password = await sync_to_async(make_password, thread_sensitive=False)(validated_data.pop("password"))
+        validated_data["username"] = User.normalize_username(validated_data["username"])
+        validated_data["email"] = User.objects.normalize_email(validated_data.get("email", ""))
+        await User.objects.acreate(password=password, **validated_data)
+        return JsonResponse(serializer.data, status=status.HTTP_201_CREATED)
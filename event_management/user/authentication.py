@@ -0,0 +1,113 @@
+"""The module includes token authentication classes and helpers."""
+
+import hashlib
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.utils.translation import gettext as _
+
+from rest_framework import HTTP_HEADER_ENCODING
+from rest_framework.authentication import TokenAuthentication
+from rest_framework.authtoken.models import Token
+from rest_framework.exceptions import AuthenticationFailed, NotAuthenticated
+
+from event.cache import TwoTierCache
+from event_management.instrumentation import timed
+
+
+# User fields kept in the token cache, the others, e.g. the password hash, are loaded when they are accessed
+CACHED_USER_FIELDS = ("id", "username", "is_active")
+
+
+class TokenCache(TwoTierCache):
+    """Two-tier cache for token key to ``(user, token)`` resolution.
+
+    Keys of the shared tier are hashed so raw tokens are never written to the cache backend.
+    Only CACHED_USER_FIELDS and the token creation time are cached, every lookup builds new
+    user and token instances from them, so requests never share a mutable user.
+    """
+
+    name = "token"
+    key_prefix = "user:token:"
+
+    def make_key(self, key):
+        """str: Returns hashed key used in the shared tier."""
+        return self.key_prefix + hashlib.sha256(key.encode()).hexdigest()
+
+    def get_credentials(self, key):
+        """tuple: Returns new ``(user, token)`` built from the cached values or None when they aren't cached."""
+        values = self.get(key)
+        if values is None:
+            return None
+        user_values, created = values
+        user = get_user_model().from_db(None, CACHED_USER_FIELDS, user_values)
+        token = Token.from_db(None, ("key", "user_id", "created"), (key, user.pk, created))
+        token.user = user
+        return user, token
+
+    def set_credentials(self, key, credentials):
+        """Cache CACHED_USER_FIELDS of the user and the creation time of the token."""
+        user, token = credentials
+        self.set(key, (tuple(getattr(user, name) for name in CACHED_USER_FIELDS), token.created))
+
+
+token_cache = TokenCache.from_settings(settings.TOKEN_CACHE)
+
+
+class CachedTokenAuthentication(TokenAuthentication):
+    """Drop-in replacement of TokenAuthentication that caches token resolution.
+
+    Entries are invalidated when the token is deleted or regenerated and when its user
+    is deleted or saved with a change of the cached fields or the password, e.g. deactivated
+    in the admin.
+    """
+
+    def authenticate(self, request):
+        """tuple: Returns ``(user, token)`` or None, timed as the auth phase."""
+        with timed("auth"):
+            return super().authenticate(request)
+
+    def authenticate_credentials(self, key):
+        """tuple: Returns ``(user, token)`` from the cache or the database."""
+        credentials = token_cache.get_credentials(key)
+        if credentials is None:
+            credentials = super().authenticate_credentials(key)
+            token_cache.set_credentials(key, credentials)
+        return credentials
+
+
+def get_token_key(request):
+    """str: Returns token key from the Authorization header or None when there is no token."""
+    auth = request.META.get("HTTP_AUTHORIZATION", "").encode(HTTP_HEADER_ENCODING).split()
+    if not auth or auth[0].lower() != TokenAuthentication.keyword.lower().encode():
+        return None
+    if len(auth) != 2:
+        raise AuthenticationFailed(_("Invalid token header."))
+    try:
+        return auth[1].decode()
+    except UnicodeError:
+        raise AuthenticationFailed(_("Invalid token header. Token string should not contain invalid characters."))
+
+
+async def aauthenticate_token(request):
+    """User: Returns user authenticated by token without leaving the event loop.
+
+    Raises:
+        NotAuthenticated: The request has no token
+        AuthenticationFailed: The token is invalid or its user is inactive
+    """
+    with timed("auth"):
+        key = get_token_key(request)
+        if key is None:
+            raise NotAuthenticated()
+        credentials = token_cache.get_credentials(key)
+        if credentials is not None:
+            return credentials[0]
+        try:
+            token = await Token.objects.select_related("user").aget(key=key)
+        except Token.DoesNotExist:
+            raise AuthenticationFailed(_("Invalid token."))
+        if not token.user.is_active:
+            raise AuthenticationFailed(_("User inactive or deleted."))
+        token_cache.set_credentials(key, (token.user, token))
+        return token.user
@@ -0,0 +1,57 @@
+"""Command for provisioning users from CSV or NDJSON."""
+
+import csv
+import sys
+from itertools import islice
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from user.provisioning import PROVISION_FORMATS, provision_users, read_users
+
+
+class Command(BaseCommand):
+    """Create users in batches, hashing their passwords in a process pool."""
+
+    help = "Import users from a CSV or NDJSON file with username, password and optional profile fields."  # noqa: A003
+
+    def add_arguments(self, parser):
+        """Add import options."""
+        parser.add_argument("path", help="File to read, - for stdin")
+        parser.add_argument("--format", choices=PROVISION_FORMATS, dest="provision_format", help="By file extension")
+        parser.add_argument("--tokens", action="store_true", help="Create an auth token for every user")
+        parser.add_argument("--tokens-output", help="CSV file to write usernames and token keys to")
+        parser.add_argument("--workers", type=int, help="Hashing processes, all CPUs by default")
+        parser.add_argument("--batch-size", type=int, default=settings.USER_PROVISIONING["BATCH_SIZE"])
+
+    def handle(self, *args, **options):
+        """Import users."""
+        path = options["path"]
+        provision_format = options["provision_format"] or ("csv" if path.endswith(".csv") else "ndjson")
+        try:
+            stream = sys.stdin.buffer if path == "-" else open(path, "rb")
+        except OSError as exc:
+            raise CommandError(exc)
+        tokens_output = open(options["tokens_output"], "w", newline="") if options["tokens_output"] else None
+        token_writer = csv.writer(tokens_output) if tokens_output else None
+
+        created = failed = offset = 0
+        try:
+            items = read_users(stream, provision_format)
+            while batch := list(islice(items, options["batch_size"])):
+                users, errors = provision_users(batch, options["tokens"], options["workers"], options["batch_size"])
+                for error in errors:
+                    self.stderr.write(f"Item {offset + error['index']}: {error['errors']}")
+                if token_writer and options["tokens"]:
+                    token_writer.writerows((user.username, key) for _, user, key in users)
+                created += len(users)
+                failed += len(errors)
+                offset += len(batch)
+        except ValueError as exc:
+            raise CommandError(f"Parse error after item {offset}: {exc}")
+        finally:
+            if path != "-":
+                stream.close()
+            if tokens_output:
+                tokens_output.close()
+        self.stdout.write(f"Users created: {created}, failed: {failed}")
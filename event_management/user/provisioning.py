@@ -0,0 +1,183 @@
+"""The module includes bulk user provisioning.
+
+Password hashing dominates the cost of creating a user, so provision_users validates
+and hashes passwords in a process pool, started once per process and shared by all
+requests, and inserts the users with bulk_create. Field and uniqueness checks need no
+hashing and run in the calling process, with one query for all usernames. A username
+taken by another request after the check fails the insert, the users are then inserted
+one by one and the taken one is reported like the others.
+"""
+
+import csv
+import io
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+
+import django
+from django.apps import apps
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.contrib.auth.hashers import make_password
+from django.contrib.auth.password_validation import validate_password
+from django.contrib.auth.validators import UnicodeUsernameValidator
+from django.core.exceptions import ValidationError
+from django.db import IntegrityError, transaction
+
+from rest_framework import serializers
+from rest_framework.authtoken.models import Token
+
+from event.parsers import json_loads
+
+User = get_user_model()
+
+PROVISION_FORMATS = ("csv", "ndjson")
+
+PROFILE_FIELDS = ("username", "email", "first_name", "last_name")
+
+
+class UserProvisionSerializer(serializers.Serializer):
+    """Serializer validating one provisioned user without queries, uniqueness is checked in bulk."""
+
+    username = serializers.CharField(max_length=150, validators=[UnicodeUsernameValidator()])
+    password = serializers.CharField(max_length=128, write_only=True)
+    email = serializers.EmailField(required=False, allow_blank=True, default="")
+    first_name = serializers.CharField(max_length=150, required=False, allow_blank=True, default="")
+    last_name = serializers.CharField(max_length=150, required=False, allow_blank=True, default="")
+
+
+def read_users(stream, provision_format):
+    """iterator: Yields user dicts read from a binary CSV or NDJSON stream."""
+    text = io.TextIOWrapper(stream, encoding="utf-8", newline="")
+    if provision_format == "csv":
+        yield from csv.DictReader(text)
+        return
+    for line in text:
+        if line.strip():
+            yield json_loads(line)
+
+
+def _init_worker():
+    """Set up Django in a worker process that wasn't forked from a configured one."""
+    if not apps.ready:
+        django.setup()
+
+
+def hash_password(item):
+    """tuple: Returns password hash and None, or None and validation messages of one user."""
+    profile, password = item
+    try:
+        validate_password(password, User(**profile))
+    except ValidationError as exc:
+        return None, list(exc.messages)
+    return make_password(password), None
+
+
+_pools = {}
+_pools_lock = threading.Lock()
+
+
+def get_pool(workers):
+    """ProcessPoolExecutor: Returns pool of given number of worker processes, shared by the process."""
+    with _pools_lock:
+        if workers not in _pools:
+            _pools[workers] = ProcessPoolExecutor(workers, initializer=_init_worker)
+        return _pools[workers]
+
+
+def hash_passwords(items, workers=None, chunk_size=None):
+    """list: Returns hash_password results of ``(profile, password)`` items, computed in a process pool."""
+    options = settings.USER_PROVISIONING
+    workers = workers or options["WORKERS"] or os.cpu_count()
+    chunk_size = chunk_size or options["CHUNK_SIZE"]
+    if workers == 1 or len(items) <= 1:
+        return [hash_password(item) for item in items]
+    pool = get_pool(workers)
+    try:
+        return list(pool.map(hash_password, items, chunksize=chunk_size))
+    except BrokenProcessPool:
+        # A worker died, the next call starts a new pool
+        with _pools_lock:
+            if _pools.get(workers) is pool:
+                del _pools[workers]
+        raise
+
+
+def create_users(indexes, users, errors, batch_size):
+    """tuple: Returns indexes and users that were inserted, taken usernames are added to errors.
+
+    Users are inserted with bulk_create, when that fails because a username was taken
+    since it was checked they are inserted one by one, each in a savepoint.
+    """
+    try:
+        with transaction.atomic():
+            return indexes, User.objects.bulk_create(users, batch_size=batch_size)
+    except IntegrityError:
+        pass
+    unique_message = User._meta.get_field("username").error_messages["unique"]
+    created_indexes, created = [], []
+    for index, user in zip(indexes, users):
+        # Primary keys set by the failed batches were rolled back
+        user.pk = None
+        try:
+            with transaction.atomic():
+                User.objects.bulk_create([user])
+        except IntegrityError:
+            errors.append({"index": index, "errors": {"username": [unique_message]}})
+            continue
+        created_indexes.append(index)
+        created.append(user)
+    return created_indexes, created
+
+
+def provision_users(items, create_tokens=False, workers=None, batch_size=None):
+    """tuple: Returns created ``(index, user, token key)`` triples and errors of invalid items.
+
+    Invalid items are reported by their index as ``{"index": ..., "errors": ...}`` and
+    do not prevent the valid ones from being created.
+    """
+    valid, errors = {}, []
+    for index, item in enumerate(items):
+        serializer = UserProvisionSerializer(data=item)
+        if serializer.is_valid():
+            data = serializer.validated_data
+            data["username"] = User.normalize_username(data["username"])
+            data["email"] = User.objects.normalize_email(data["email"])
+            valid[index] = data
+        else:
+            errors.append({"index": index, "errors": serializer.errors})
+
+    usernames = [data["username"] for data in valid.values()]
+    taken = set(User.objects.filter(username__in=usernames).values_list("username", flat=True))
+    unique_message = User._meta.get_field("username").error_messages["unique"]
+    for index, data in list(valid.items()):
+        if data["username"] in taken:
+            errors.append({"index": index, "errors": {"username": [unique_message]}})
+            del valid[index]
+        taken.add(data["username"])
+
+    results = hash_passwords(
+        [({field: data[field] for field in PROFILE_FIELDS}, data["password"]) for data in valid.values()], workers
+    )
+    users, indexes = [], []
+    for (index, data), (password, messages) in zip(valid.items(), results):
+        if messages:
+            errors.append({"index": index, "errors": {"password": messages}})
+            continue
+        indexes.append(index)
+        users.append(User(password=password, **{field: data[field] for field in PROFILE_FIELDS}))
+
+    batch_size = batch_size or settings.USER_PROVISIONING["BATCH_SIZE"]
+    with transaction.atomic():
+        indexes, users = create_users(indexes, users, errors, batch_size)
+        if any(user.pk is None for user in users):
+            pks = dict(User.objects.filter(username__in=usernames).values_list("username", "pk"))
+            for user in users:
+                user.pk = pks[user.username]
+        tokens = [Token(user=user, key=Token.generate_key()) for user in users] if create_tokens else []
+        Token.objects.bulk_create(tokens, batch_size=batch_size)
+
+    keys = [token.key for token in tokens] or [None] * len(users)
+    errors.sort(key=lambda error: error["index"])
+    return list(zip(indexes, users, keys)), errors
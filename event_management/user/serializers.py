@@ -4,10 +4,13 @@ from django.contrib.auth import get_user_model
 
 from rest_framework import serializers
 
+from event_management.instrumentation import TimedSerializerMixin
+from event_management.metrics import ValidationMetricsMixin
+
 User = get_user_model()
 
 
-class UserSerializer(serializers.ModelSerializer):
+class UserSerializer(TimedSerializerMixin, ValidationMetricsMixin, serializers.ModelSerializer):
     """Serializer for User Model."""
 
     class Meta:
@@ -0,0 +1,38 @@
+"""Signal receivers of the user app."""
+
+from django.contrib.auth import get_user_model
+from django.db.models.signals import post_delete, post_save, pre_save
+from django.dispatch import receiver
+
+from rest_framework.authtoken.models import Token
+
+from .authentication import CACHED_USER_FIELDS, token_cache
+
+User = get_user_model()
+
+
+@receiver(post_delete, sender=Token)
+def invalidate_deleted_token(sender, instance, **kwargs):
+    """Drop the cached credentials of a deleted or regenerated token."""
+    token_cache.invalidate(instance.key)
+
+
+@receiver(pre_save, sender=User)
+def check_cached_user_fields(sender, instance, update_fields=None, raw=False, **kwargs):
+    """Mark a user whose cached fields or password are about to change, e.g. a deactivated one."""
+    fields = {*CACHED_USER_FIELDS, "password"}
+    if raw or instance._state.adding or (update_fields is not None and fields.isdisjoint(update_fields)):
+        # e.g. update_last_login saves only last_login
+        return
+    stored = User.objects.filter(pk=instance.pk).values(*fields).first()
+    instance._token_credentials_changed = stored is not None and any(
+        stored[name] != getattr(instance, name) for name in fields
+    )
+
+
+@receiver(post_save, sender=User)
+def invalidate_saved_user_tokens(sender, instance, created, **kwargs):
+    """Drop the cached credentials of a user whose cached fields or password changed."""
+    if instance.__dict__.pop("_token_credentials_changed", False):
+        for key in Token.objects.filter(user=instance).values_list("key", flat=True):
+            token_cache.invalidate(key)
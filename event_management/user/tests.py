@@ -0,0 +1,243 @@
+"""The module includes tests for user views.
+
+UserAsyncViewTest (Class UserAsyncViewTest for testing async User view):
+ - Test for creating user (status code 201);
+ - Test for creating user with existing username (status code 400).
+
+CachedTokenAuthenticationTest (Class CachedTokenAuthenticationTest for testing cached token authentication):
+ - Test for authenticating cached token without queries;
+ - Test for invalidating deleted token;
+ - Test for invalidating regenerated token;
+ - Test for invalidating deactivated user;
+ - Test for keeping cached credentials of a user saved without changes of cached fields.
+
+UserProvisioningTest (Class UserProvisioningTest for testing bulk user provisioning):
+ - Test for provisioning users with passwords hashed in a process pool;
+ - Test for reporting invalid, duplicate and weak-password items;
+ - Test for reporting a username taken after it was checked;
+ - Test for bulk creating users from CSV (status code 207);
+ - Test for bulk creating users by a non-admin user (status code 403);
+ - Test for importing users from NDJSON with import_users command.
+"""
+
+import json
+import tempfile
+from io import StringIO
+from pathlib import Path
+from unittest import mock
+
+from django.contrib.auth.models import update_last_login
+from django.core.management import call_command
+from django.test import TestCase, override_settings
+from django.urls import reverse
+
+from rest_framework import status
+from rest_framework.authtoken.models import Token
+from rest_framework.exceptions import AuthenticationFailed
+from rest_framework.test import APIRequestFactory
+
+from .authentication import CachedTokenAuthentication, token_cache
+from .provisioning import hash_passwords, provision_users
+from .serializers import User
+
+
+class UserAsyncViewTest(TestCase):
+    """Class UserAsyncViewTest for testing async User view."""
+
+    def setUp(self):
+        """Set needed info for tests."""
+        self.create_url = reverse("user:async-create-user")
+        self.valid_data = {"username": "new_user", "password": "0987654321", "email": "new_user@EXAMPLE.com"}
+
+    async def test_create_user(self):
+        """Test for creating user (status code 201)."""
+        response = await self.async_client.post(self.create_url, self.valid_data, content_type="application/json")
+
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertNotIn("password", response.json())
+        user = await User.objects.aget(username="new_user")
+        self.assertEqual(user.email, "new_user@example.com")
+        self.assertTrue(user.check_password("0987654321"))
+
+    async def test_create_user_existing_username_fail(self):
+        """Test for creating user with existing username (status code 400)."""
+        await User.objects.acreate(username="new_user")
+        response = await self.async_client.post(self.create_url, self.valid_data, content_type="application/json")
+
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(response.json(), {"username": ["A user with that username already exists."]})
+
+
+class CachedTokenAuthenticationTest(TestCase):
+    """Class CachedTokenAuthenticationTest for testing cached token authentication."""
+
+    def setUp(self):
+        """Set needed info for tests."""
+        token_cache.clear()
+        self.authentication = CachedTokenAuthentication()
+        self.user = User.objects.create_user(username="token_user", password="0987654321")
+        self.token = Token.objects.create(user=self.user)
+
+    def authenticate(self, key):
+        """Authenticate request with given token key."""
+        request = APIRequestFactory().get("/", HTTP_AUTHORIZATION=f"Token {key}")
+        return self.authentication.authenticate(request)
+
+    def test_authenticate_cached_token(self):
+        """Test for authenticating cached token without queries."""
+        self.assertEqual(self.authenticate(self.token.key), (self.user, self.token))
+        with self.assertNumQueries(0):
+            user, token = self.authenticate(self.token.key)
+
+        self.assertEqual(user, self.user)
+        self.assertEqual(token_cache.stats()["local_hits"], 1)
+        self.assertIsNot(user, self.authenticate(self.token.key)[0])
+        self.assertEqual((user.username, user.is_active, token.key), (self.user.username, True, self.token.key))
+        self.assertNotIn(self.user.password, str(token_cache.get(self.token.key)))
+        with self.assertNumQueries(1):
+            self.assertEqual(user.password, self.user.password)
+
+    def test_invalidate_deleted_token(self):
+        """Test for invalidating deleted token."""
+        self.authenticate(self.token.key)
+        self.token.delete()
+
+        with self.assertRaises(AuthenticationFailed):
+            self.authenticate(self.token.key)
+
+    def test_invalidate_regenerated_token(self):
+        """Test for invalidating regenerated token."""
+        self.authenticate(self.token.key)
+        self.token.delete()
+        new_token = Token.objects.create(user=self.user)
+
+        with self.assertRaises(AuthenticationFailed):
+            self.authenticate(self.token.key)
+        self.assertEqual(self.authenticate(new_token.key), (self.user, new_token))
+
+    def test_invalidate_deactivated_user(self):
+        """Test for invalidating deactivated user."""
+        self.authenticate(self.token.key)
+        self.user.is_active = False
+        self.user.save()
+
+        with self.assertRaises(AuthenticationFailed):
+            self.authenticate(self.token.key)
+
+    def test_keep_cached_user(self):
+        """Test for keeping cached credentials of a user saved without changes of cached fields."""
+        self.authenticate(self.token.key)
+        with self.assertNumQueries(1):
+            update_last_login(None, self.user)
+        self.user.first_name = "Ann"
+        self.user.save()
+
+        with self.assertNumQueries(0):
+            self.authenticate(self.token.key)
+        self.user.set_password("1234567890")
+        self.user.save()
+        with self.assertNumQueries(1):
+            self.authenticate(self.token.key)
+
+
+@override_settings(PASSWORD_HASHERS=["django.contrib.auth.hashers.MD5PasswordHasher"])
+class UserProvisioningTest(TestCase):
+    """Class UserProvisioningTest for testing bulk user provisioning."""
+
+    def setUp(self):
+        """Set needed info for tests."""
+        self.bulk_url = reverse("user:bulk-create-user")
+        self.admin = User.objects.create_superuser(username="admin", password="0987654321")
+        self.items = [
+            {"username": f"member_{number}", "password": f"s3cret-pass-{number}", "email": f"m{number}@EXAMPLE.com"}
+            for number in range(4)
+        ]
+
+    def test_provision_users(self):
+        """Test for provisioning users with passwords hashed in a process pool."""
+        created, errors = provision_users(self.items, create_tokens=True, workers=2)
+
+        self.assertEqual(errors, [])
+        self.assertEqual([index for index, _, _ in created], [0, 1, 2, 3])
+        user = User.objects.get(username="member_2")
+        self.assertEqual(user.email, "m2@example.com")
+        self.assertTrue(user.check_password("s3cret-pass-2"))
+        self.assertEqual(Token.objects.get(user=user).key, created[2][2])
+
+    def test_provision_users_errors(self):
+        """Test for reporting invalid, duplicate and weak-password items."""
+        items = self.items[:2] + [
+            {"username": "admin", "password": "s3cret-pass-x"},
+            {"username": "member_0", "password": "s3cret-pass-x"},
+            {"username": "bad name!", "password": "s3cret-pass-x"},
+            {"username": "weak", "password": "password"},
+        ]
+        created, errors = provision_users(items, workers=2)
+
+        self.assertEqual([(index, user.username, key) for index, user, key in created], [
+            (0, "member_0", None), (1, "member_1", None),
+        ])
+        self.assertEqual([error["index"] for error in errors], [2, 3, 4, 5])
+        self.assertEqual(errors[0]["errors"], {"username": ["A user with that username already exists."]})
+        self.assertIn("username", errors[2]["errors"])
+        self.assertIn("This password is too common.", errors[3]["errors"]["password"])
+        self.assertFalse(User.objects.filter(username="weak").exists())
+
+    def test_provision_users_race(self):
+        """Test for reporting a username taken after it was checked."""
+
+        def hash_and_take(items, workers=None):
+            """list: Returns hashes of the items after another request created member_1."""
+            User.objects.create_user(username="member_1", password="s3cret-pass-x")
+            return hash_passwords(items, workers)
+
+        with mock.patch("user.provisioning.hash_passwords", side_effect=hash_and_take):
+            created, errors = provision_users(self.items, create_tokens=True)
+
+        self.assertEqual([(index, user.username) for index, user, _ in created], [
+            (0, "member_0"), (2, "member_2"), (3, "member_3"),
+        ])
+        self.assertEqual(errors, [{"index": 1, "errors": {"username": ["A user with that username already exists."]}}])
+        self.assertEqual(Token.objects.filter(user__username__startswith="member_").count(), 3)
+        self.assertFalse(User.objects.get(username="member_1").check_password(self.items[1]["password"]))
+
+    def test_bulk_create_users_csv(self):
+        """Test for bulk creating users from CSV (status code 207)."""
+        token = Token.objects.create(user=self.admin)
+        body = "username,password,email\nmember_0,s3cret-pass-0,a@example.com\nadmin,s3cret-pass-1,\n"
+        response = self.client.post(
+            f"{self.bulk_url}?tokens=1", body, content_type="text/csv", HTTP_AUTHORIZATION=f"Token {token.key}"
+        )
+
+        self.assertEqual(response.status_code, status.HTTP_207_MULTI_STATUS)
+        created = response.json()["created"]
+        self.assertEqual(created[0]["username"], "member_0")
+        self.assertEqual(Token.objects.get(user__username="member_0").key, created[0]["token"])
+        self.assertEqual(response.json()["errors"][0]["index"], 1)
+
+    def test_bulk_create_users_non_admin_fail(self):
+        """Test for bulk creating users by a non-admin user (status code 403)."""
+        token = Token.objects.create(user=User.objects.create_user(username="member", password="0987654321"))
+        response = self.client.post(
+            self.bulk_url, self.items, content_type="application/json", HTTP_AUTHORIZATION=f"Token {token.key}"
+        )
+
+        self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
+        self.assertFalse(User.objects.filter(username="member_0").exists())
+
+    def test_import_users_command(self):
+        """Test for importing users from NDJSON with import_users command."""
+        with tempfile.TemporaryDirectory() as directory:
+            path = Path(directory) / "users.ndjson"
+            path.write_text("".join(json.dumps(item) + "\n" for item in self.items))
+            tokens_path = Path(directory) / "tokens.csv"
+            out = StringIO()
+            call_command(
+                "import_users", str(path), "--tokens", "--tokens-output", str(tokens_path), "--batch-size", "3",
+                stdout=out, stderr=StringIO(),
+            )
+            tokens = tokens_path.read_text().splitlines()
+
+        self.assertIn("Users created: 4, failed: 0", out.getvalue())
+        self.assertEqual(len(tokens), 4)
+        self.assertEqual(Token.objects.filter(user__username__startswith="member_").count(), 4)
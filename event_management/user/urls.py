@@ -2,10 +2,12 @@
 
 from django.urls import path
 
-from . import views
+from . import async_views, views
 
 app_name = "user"
 
 urlpatterns = [
     path("create/", views.UserCreateAPIView.as_view(), name="create-user"),
+    path("bulk/", views.UserBulkCreateAPIView.as_view(), name="bulk-create-user"),
+    path("async/create/", async_views.UserCreateAsyncView.as_view(), name="async-create-user"),
 ]
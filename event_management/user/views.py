@@ -1,9 +1,15 @@
 """This module provides all needed Event views."""
 
+from django.conf import settings
+
 from rest_framework import status
-from rest_framework.generics import CreateAPIView
+from rest_framework.generics import CreateAPIView, GenericAPIView
+from rest_framework.permissions import IsAdminUser
 from rest_framework.response import Response
 
+from event.parsers import CSVParser, NDJSONParser, ORJSONParser
+
+from .provisioning import UserProvisionSerializer, provision_users
 from .serializers import User, UserSerializer
 
 
@@ -20,3 +26,42 @@ class UserCreateAPIView(CreateAPIView):
             headers = self.get_success_headers(serializer.data)
             return Response(serializer.data, status=status.HTTP_201_CREATED, headers=headers)
         return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+
+
+class UserBulkCreateAPIView(GenericAPIView):
+    """This view is used by admins for creating many users in one request.
+
+    Accepts a JSON array, NDJSON or CSV body. Passwords are validated and hashed in a
+    process pool. Invalid items are reported by their index and do not prevent the valid
+    ones from being created. With ``?tokens=1`` an auth token is created for every user.
+    """
+
+    serializer_class = UserProvisionSerializer
+    permission_classes = (IsAdminUser,)
+    parser_classes = (ORJSONParser, NDJSONParser, CSVParser)
+
+    def post(self, request, *args, **kwargs):
+        """Post method for creating users in bulk."""
+        items = request.data
+        if not isinstance(items, list):
+            return Response({"detail": "Expected a list of users."}, status=status.HTTP_400_BAD_REQUEST)
+        max_items = settings.USER_PROVISIONING["MAX_ITEMS"]
+        if len(items) > max_items:
+            return Response(
+                {"detail": f"Ensure there are no more than {max_items} users."}, status=status.HTTP_400_BAD_REQUEST
+            )
+
+        create_tokens = request.query_params.get("tokens") in ("1", "true")
+        created, errors = provision_users(items, create_tokens=create_tokens)
+        created = [
+            {"index": index, "username": user.username, **({"token": key} if create_tokens else {})}
+            for index, user, key in created
+        ]
+
+        if not errors:
+            response_status = status.HTTP_201_CREATED
+        elif created:
+            response_status = status.HTTP_207_MULTI_STATUS
+        else:
+            response_status = status.HTTP_400_BAD_REQUEST
+        return Response({"created": created, "errors": errors}, status=response_status)